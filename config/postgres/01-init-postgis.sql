@@ -52,6 +52,8 @@ CREATE TABLE IF NOT EXISTS data.features (
 
 -- Create spatial index
 CREATE INDEX idx_features_geom ON data.features USING GIST(geom);
+-- Geography expression index: serves nearest-neighbor (<->) and ST_DWithin radius queries
+CREATE INDEX idx_features_geog ON data.features USING GIST((geom::geography));
 CREATE INDEX idx_features_category ON data.features(category);
 CREATE INDEX idx_features_properties ON data.features USING GIN(properties);
 
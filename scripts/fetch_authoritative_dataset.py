@@ -5,35 +5,69 @@ from __future__ import annotations
 
 import argparse
 import hashlib
+import http.client
 import json
 import pathlib
+import random
 import shutil
 import sys
+import time
+import urllib.error
 import urllib.parse
 import urllib.request
-from typing import Any
+from functools import lru_cache
+from typing import Any, BinaryIO
+
+try:
+    import orjson
+except ImportError:  # optional: pip install -e ".[speedups]"
+    orjson = None
 
 ROOT = pathlib.Path(__file__).resolve().parents[1]
 DEFAULT_MANIFEST = ROOT / "config" / "sample_data_manifest.json"
+# Matches a typical socket receive buffer so network reads stay large.
+READ_CHUNK_BYTES = 1024 * 1024
+# Local hashing reuses one buffer sized to typical disk readahead.
+HASH_BUFFER_BYTES = 8 * 1024 * 1024
+DOWNLOAD_ATTEMPTS = 4
+RETRY_BACKOFF_SECONDS = 1.0
+
+
+def _load_manifest(path: pathlib.Path) -> tuple[dict[str, Any], dict[str, dict[str, Any]]]:
+    """Return the parsed manifest and its datasets indexed by id.
 
+    Results are memoized on the file's mtime and size, so repeated lookups against an
+    unchanged manifest cost a single ``stat``.
+    """
+    stat = path.stat()
+    return _load_manifest_cached(str(path), stat.st_mtime_ns, stat.st_size)
 
-def _load_manifest(path: pathlib.Path) -> dict[str, Any]:
-    payload = json.loads(path.read_text(encoding="utf-8"))
+
+@lru_cache(maxsize=8)
+def _load_manifest_cached(
+    path: str, mtime_ns: int, size: int
+) -> tuple[dict[str, Any], dict[str, dict[str, Any]]]:
+    raw = pathlib.Path(path).read_bytes()
+    payload = orjson.loads(raw) if orjson is not None else json.loads(raw)
     if not isinstance(payload, dict):
         raise ValueError("Manifest root must be a JSON object.")
-    return payload
-
 
-def _resolve_dataset(manifest: dict[str, Any], dataset_id: str) -> dict[str, Any]:
-    datasets = manifest.get("datasets")
+    datasets = payload.get("datasets")
     if not isinstance(datasets, list):
         raise ValueError("Manifest must include a 'datasets' list.")
 
+    index: dict[str, dict[str, Any]] = {}
     for dataset in datasets:
-        if isinstance(dataset, dict) and str(dataset.get("id", "")).strip() == dataset_id:
-            return dataset
+        if isinstance(dataset, dict):
+            index.setdefault(str(dataset.get("id", "")).strip(), dataset)
+    return payload, index
+
 
-    raise ValueError(f"Dataset id '{dataset_id}' not found in manifest.")
+def _resolve_dataset(index: dict[str, dict[str, Any]], dataset_id: str) -> dict[str, Any]:
+    dataset = index.get(dataset_id)
+    if dataset is None:
+        raise ValueError(f"Dataset id '{dataset_id}' not found in manifest.")
+    return dataset
 
 
 def _resolve_local_path(local_relative_path: str) -> pathlib.Path:
@@ -44,14 +78,24 @@ def _resolve_local_path(local_relative_path: str) -> pathlib.Path:
 
 
 def _sha256(path: pathlib.Path) -> str:
-    hasher = hashlib.sha256()
-    with path.open("rb") as infile:
-        for chunk in iter(lambda: infile.read(1024 * 1024), b""):
-            hasher.update(chunk)
+    # hashlib.new routes through the OpenSSL EVP backend (SHA-NI where available).
+    hasher = hashlib.new("sha256", usedforsecurity=False)
+    _hash_file_into(path, hasher)
     return hasher.hexdigest()
 
 
-def _download(url: str, destination: pathlib.Path, *, timeout_seconds: int, allow_http: bool) -> None:
+def _hash_file_into(path: pathlib.Path, hasher: Any) -> None:
+    buffer = bytearray(HASH_BUFFER_BYTES)
+    view = memoryview(buffer)
+    with path.open("rb", buffering=0) as infile:
+        while size := infile.readinto(buffer):
+            hasher.update(view[:size])
+
+
+def _download_and_hash(
+    url: str, destination: pathlib.Path, *, timeout_seconds: int, allow_http: bool
+) -> str:
+    """Download ``url`` to ``destination`` and return the SHA-256 of the bytes written."""
     parsed = urllib.parse.urlparse(url)
     destination.parent.mkdir(parents=True, exist_ok=True)
 
@@ -59,8 +103,10 @@ def _download(url: str, destination: pathlib.Path, *, timeout_seconds: int, allo
         source_path = pathlib.Path(urllib.request.url2pathname(parsed.path))
         if not source_path.exists():
             raise ValueError(f"Source file does not exist: {source_path}")
+        # copyfile uses copy_file_range/sendfile (fcopyfile on macOS), so the copy itself
+        # never bounces through user space; only the verification read does.
         shutil.copyfile(source_path, destination)
-        return
+        return _sha256(destination)
 
     if parsed.scheme not in {"https", "http"}:
         raise ValueError(f"Unsupported URL scheme '{parsed.scheme}'.")
@@ -68,11 +114,82 @@ def _download(url: str, destination: pathlib.Path, *, timeout_seconds: int, allo
     if parsed.scheme == "http" and not allow_http:
         raise ValueError("HTTP downloads are disabled by default. Use --allow-http to override.")
 
-    with urllib.request.urlopen(url, timeout=timeout_seconds) as response, destination.open("wb") as out:
-        shutil.copyfileobj(response, out)
+    return _download_with_resume(url, destination, timeout_seconds=timeout_seconds)
+
 
+def _resume_validator(headers: Any) -> str | None:
+    # If-Range accepts a strong ETag or a Last-Modified date; weak ETags do not qualify.
+    etag = headers.get("ETag")
+    if etag and not etag.startswith("W/"):
+        return str(etag)
+    last_modified = headers.get("Last-Modified")
+    return str(last_modified) if last_modified else None
 
-def parse_args() -> argparse.Namespace:
+
+def _download_with_resume(url: str, destination: pathlib.Path, *, timeout_seconds: int) -> str:
+    """Stream ``url`` into ``destination`` via a ``.part`` file, resuming with HTTP Range.
+
+    A dropped connection retries with exponential backoff and jitter, continuing from the
+    bytes already on disk instead of starting the transfer over. The response's ETag or
+    Last-Modified is kept next to the ``.part`` file and sent as ``If-Range``, so a changed
+    upstream object is downloaded afresh rather than spliced onto stale bytes.
+    """
+    partial = destination.with_name(destination.name + ".part")
+    validator_path = destination.with_name(destination.name + ".part.validator")
+    for attempt in range(1, DOWNLOAD_ATTEMPTS + 1):
+        offset = partial.stat().st_size if partial.exists() else 0
+        validator = ""
+        if offset and validator_path.exists():
+            validator = validator_path.read_text(encoding="utf-8").strip()
+        if not validator:
+            # Without a validator there is no way to tell the bytes on disk are current.
+            offset = 0
+        request = urllib.request.Request(url)
+        if offset:
+            request.add_header("Range", f"bytes={offset}-")
+            request.add_header("If-Range", validator)
+        try:
+            with urllib.request.urlopen(request, timeout=timeout_seconds) as response:
+                if offset and response.status != 206:
+                    # The object changed (If-Range failed) or Range was ignored; the body
+                    # is the whole object, so start over from the first byte.
+                    offset = 0
+                if not offset:
+                    fresh_validator = _resume_validator(response.headers)
+                    if fresh_validator:
+                        validator_path.write_text(fresh_validator, encoding="utf-8")
+                    else:
+                        validator_path.unlink(missing_ok=True)
+                hasher = hashlib.new("sha256", usedforsecurity=False)
+                if offset:
+                    _hash_file_into(partial, hasher)
+                with partial.open("ab" if offset else "wb") as out:
+                    _copy_and_hash(response, out, hasher)
+        except urllib.error.HTTPError as exc:
+            if exc.code != 416 or not offset:
+                raise
+            # The partial file no longer lines up with the remote object.
+            partial.unlink()
+            validator_path.unlink(missing_ok=True)
+        except (http.client.IncompleteRead, urllib.error.URLError, OSError):
+            if attempt == DOWNLOAD_ATTEMPTS:
+                raise
+        else:
+            partial.replace(destination)
+            validator_path.unlink(missing_ok=True)
+            return hasher.hexdigest()
+        time.sleep(RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1) + random.uniform(0, 0.25))
+
+    raise ValueError(f"Download did not complete after {DOWNLOAD_ATTEMPTS} attempts: {url}")
+
+
+def _copy_and_hash(source: BinaryIO, out: BinaryIO, hasher: Any) -> None:
+    while chunk := source.read(READ_CHUNK_BYTES):
+        hasher.update(chunk)
+        out.write(chunk)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Fetch and verify one authoritative dataset.")
     parser.add_argument(
         "--dataset-id",
@@ -90,6 +207,11 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Re-download even if the local file already exists.",
     )
+    parser.add_argument(
+        "--force-verify",
+        action="store_true",
+        help="Hash an existing local file even when the manifest has no expected_sha256.",
+    )
     parser.add_argument(
         "--timeout-seconds",
         type=int,
@@ -101,15 +223,15 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Allow non-TLS HTTP sources (disabled by default).",
     )
-    return parser.parse_args()
+    return parser.parse_args(argv)
 
 
-def main() -> int:
-    args = parse_args()
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
 
     try:
-        manifest = _load_manifest(args.manifest)
-        dataset = _resolve_dataset(manifest, args.dataset_id)
+        _, datasets_by_id = _load_manifest(args.manifest)
+        dataset = _resolve_dataset(datasets_by_id, args.dataset_id)
 
         source_url = str(dataset.get("source_url", "")).strip()
         local_relative_path = str(dataset.get("local_relative_path", "")).strip()
@@ -119,8 +241,9 @@ def main() -> int:
             raise ValueError(f"Dataset '{args.dataset_id}' is missing local_relative_path.")
 
         local_path = _resolve_local_path(local_relative_path)
+        expected_sha = str(dataset.get("expected_sha256", "")).strip().lower()
         if args.force or not local_path.exists():
-            _download(
+            actual_sha = _download_and_hash(
                 source_url,
                 local_path,
                 timeout_seconds=args.timeout_seconds,
@@ -129,9 +252,11 @@ def main() -> int:
             print(f"Downloaded: {source_url} -> {local_path}")
         else:
             print(f"Using existing file: {local_path}")
-
-        actual_sha = _sha256(local_path)
-        expected_sha = str(dataset.get("expected_sha256", "")).strip().lower()
+            if not expected_sha and not args.force_verify:
+                # Nothing to compare against; skip a full read of the existing file.
+                print("sha256: (not computed; no expected hash to verify)")
+                return 0
+            actual_sha = _sha256(local_path)
 
         print(f"sha256: {actual_sha}")
         if expected_sha:
@@ -27,7 +27,7 @@ def _find_api_endpoints(api_text: str) -> list[tuple[str, str]]:
 
 
 def _find_structured_operations(api_text: str) -> list[str]:
-    pattern = re.compile(r'if op == "([^"]+)"')
+    pattern = re.compile(r'^\s+"([^"]+)": _op_\w+,$', flags=re.MULTILINE)
     return pattern.findall(api_text)
 
 
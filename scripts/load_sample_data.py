@@ -9,22 +9,33 @@ demonstrate the spatial toolchain without huge storage or bandwidth needs.
 from __future__ import annotations
 
 import argparse
-import copy
 import datetime as dt
+import http.client
 import json
 import logging
 import os
 import pathlib
+import random
 import shutil
 import subprocess
 import sys
+import time
+import urllib.error
 import urllib.parse
 import urllib.request
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
 from typing import Dict, Any
 
 import psycopg2
 from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
 
+try:
+    import orjson
+except ImportError:  # optional: pip install -e ".[speedups]"
+    orjson = None
+
 LOGGER = logging.getLogger("load_sample_data")
 
 DEFAULT_OSM_URL = (
@@ -32,12 +43,14 @@ DEFAULT_OSM_URL = (
 )
 DEFAULT_DATA_DIR = pathlib.Path(os.environ.get("DATA_DIR", "./data")).resolve()
 DEFAULT_STAC_DIR = DEFAULT_DATA_DIR / "stac"
+DOWNLOAD_ATTEMPTS = 4
+DOWNLOAD_CHUNK_BYTES = 1024 * 1024
 
-STAC_TEMPLATE = {
+STAC_TEMPLATE: Mapping[str, Any] = MappingProxyType({
     "type": "Feature",
     "stac_version": "1.0.0",
     "id": "osm-dc-sample",
-    "properties": {
+    "properties": MappingProxyType({
         "datetime": "2024-01-01T00:00:00Z",
         "start_datetime": "2024-01-01T00:00:00Z",
         "end_datetime": "2024-01-01T00:00:00Z",
@@ -61,7 +74,7 @@ STAC_TEMPLATE = {
             },
         ],
         "license": "ODbL-1.0",
-    },
+    }),
     "geometry": {
         "type": "Polygon",
         "coordinates": [
@@ -77,7 +90,7 @@ STAC_TEMPLATE = {
     "bbox": [-77.1198, 38.7916, -76.9094, 39.0004],
     "links": [],
     "assets": {},
-}
+})
 
 
 def parse_args() -> argparse.Namespace:
@@ -121,6 +134,23 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Skip STAC metadata generation.",
     )
+    parser.add_argument(
+        "--osm2pgsql-cache-mb",
+        type=int,
+        default=default_osm2pgsql_cache_mb(),
+        help="osm2pgsql node cache in MB (default: half of available memory, %(default)s).",
+    )
+    parser.add_argument(
+        "--flat-nodes",
+        type=pathlib.Path,
+        default=None,
+        help="Store node locations in this file (recommended for large extracts).",
+    )
+    parser.add_argument(
+        "--drop-slim",
+        action="store_true",
+        help="Drop osm2pgsql slim tables after import (saves disk; disables updates).",
+    )
     parser.add_argument(
         "--log-level",
         default=os.environ.get("LOG_LEVEL", "INFO"),
@@ -144,14 +174,58 @@ def download_osm(url: str, dest: pathlib.Path) -> pathlib.Path:
         return dest
 
     LOGGER.info("Downloading %s -> %s", url, dest)
-    with urllib.request.urlopen(url) as response, open(dest, "wb") as out_file:
-        shutil.copyfileobj(response, out_file)
+    partial = dest.with_name(dest.name + ".part")
+    for attempt in range(1, DOWNLOAD_ATTEMPTS + 1):
+        offset = partial.stat().st_size if partial.exists() else 0
+        request = urllib.request.Request(url)
+        if offset:
+            # Resume from the bytes already on disk rather than re-fetching the extract.
+            request.add_header("Range", f"bytes={offset}-")
+        try:
+            with urllib.request.urlopen(request) as response:
+                resumed = bool(offset) and response.status == 206
+                with open(partial, "ab" if resumed else "wb") as out_file:
+                    shutil.copyfileobj(response, out_file, DOWNLOAD_CHUNK_BYTES)
+        except urllib.error.HTTPError as exc:
+            if exc.code != 416 or not offset:
+                raise
+            partial.unlink()
+        except (http.client.IncompleteRead, urllib.error.URLError, OSError) as exc:
+            if attempt == DOWNLOAD_ATTEMPTS:
+                raise
+            LOGGER.warning(
+                "Download interrupted (%s); retrying (%d/%d).", exc, attempt, DOWNLOAD_ATTEMPTS
+            )
+        else:
+            partial.replace(dest)
+            break
+        time.sleep(2 ** (attempt - 1) + random.uniform(0, 0.25))
+    else:
+        raise RuntimeError(f"Download did not complete after {DOWNLOAD_ATTEMPTS} attempts.")
 
     LOGGER.info("Download complete (%.2f MB).", dest.stat().st_size / (1024 * 1024))
     return dest
 
 
-def run_osm2pgsql(pbf_path: pathlib.Path, schema: str, conn_info: Dict[str, str]) -> None:
+def default_osm2pgsql_cache_mb() -> int | None:
+    """Return half of the currently available memory in MB, or None when unknown."""
+
+    try:
+        available = os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, OSError, ValueError):
+        return None
+    return max(256, available // 2 // (1024 * 1024))
+
+
+def run_osm2pgsql(
+    pbf_path: pathlib.Path,
+    schema: str,
+    conn_info: Dict[str, str],
+    *,
+    cache_mb: int | None = None,
+    flat_nodes: pathlib.Path | None = None,
+    drop_slim: bool = False,
+) -> None:
     ensure_dependency("osm2pgsql")
     env = os.environ.copy()
     env["PGPASSWORD"] = conn_info["password"]
@@ -173,11 +247,33 @@ def run_osm2pgsql(pbf_path: pathlib.Path, schema: str, conn_info: Dict[str, str]
         "--slim",
         "--latlong",
         "--extra-attributes",
-        str(pbf_path),
+        "--number-processes",
+        str(os.cpu_count() or 4),
     ]
+    if cache_mb is not None:
+        cmd += ["--cache", str(cache_mb)]
+    if flat_nodes is not None:
+        # Large extracts: keep node locations in an mmap'd file instead of the cache.
+        cmd += ["--flat-nodes", str(flat_nodes)]
+    if drop_slim:
+        cmd.append("--drop")
+    cmd.append(str(pbf_path))
 
     LOGGER.info("Importing %s into schema '%s'...", pbf_path.name, schema)
-    subprocess.run(cmd, check=True, env=env)
+    # Relay progress through the logger; a pipe we drain never stalls on terminal flow control.
+    with subprocess.Popen(
+        cmd,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        bufsize=1,
+        text=True,
+    ) as proc:
+        assert proc.stdout is not None
+        for line in proc.stdout:
+            LOGGER.info("osm2pgsql: %s", line.rstrip())
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, cmd)
     LOGGER.info("osm2pgsql import complete.")
 
 
@@ -191,71 +287,107 @@ def create_indexes(schema: str, conn_info: Dict[str, str]) -> None:
         port=conn_info["port"],
     )
     conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
-    cur = conn.cursor()
 
     from psycopg2 import sql
-    
-    # CREATE SCHEMA using sql.Identifier to prevent injection
-    cur.execute(
-        sql.SQL("CREATE SCHEMA IF NOT EXISTS {}").format(sql.Identifier(schema))
-    )
-    
-    # Check for expected tables using parameterized query
-    cur.execute(
-        """
-        DO $$
-        BEGIN
-            IF NOT EXISTS (
-                SELECT 1 FROM information_schema.tables
-                WHERE table_schema = %s AND table_name = 'planet_osm_point'
-            ) THEN
-                RAISE NOTICE 'Expected osm2pgsql tables not found in schema %%.', %s;
-            END IF;
-        END $$;
-        """,
-        (schema, schema)
-    )
-    
-    # Create indexes using sql.Identifier for schema and table names
-    index_statements = [
-        ("planet_osm_point_geom_idx", "planet_osm_point", "way"),
-        ("planet_osm_line_geom_idx", "planet_osm_line", "way"),
-        ("planet_osm_polygon_geom_idx", "planet_osm_polygon", "way"),
-        ("planet_osm_roads_geom_idx", "planet_osm_roads", "way"),
-    ]
-    
-    for idx_name, table_name, column_name in index_statements:
-        cur.execute(
-            sql.SQL("CREATE INDEX IF NOT EXISTS {} ON {}.{} USING GIST({})").format(
-                sql.Identifier(idx_name),
-                sql.Identifier(schema),
-                sql.Identifier(table_name),
-                sql.Identifier(column_name)
+
+    try:
+        with conn.cursor() as cur:
+            # CREATE SCHEMA using sql.Identifier to prevent injection
+            cur.execute(
+                sql.SQL("CREATE SCHEMA IF NOT EXISTS {}").format(sql.Identifier(schema))
             )
-        )
 
-    cur.close()
-    conn.close()
+            # Check for expected tables using parameterized query
+            cur.execute(
+                """
+                DO $$
+                BEGIN
+                    IF NOT EXISTS (
+                        SELECT 1 FROM information_schema.tables
+                        WHERE table_schema = %s AND table_name = 'planet_osm_point'
+                    ) THEN
+                        RAISE NOTICE 'Expected osm2pgsql tables not found in schema %%.', %s;
+                    END IF;
+                END $$;
+                """,
+                (schema, schema)
+            )
+
+            # Create indexes using sql.Identifier for schema and table names
+            index_statements = [
+                ("planet_osm_point_geom_idx", "planet_osm_point", "way"),
+                ("planet_osm_line_geom_idx", "planet_osm_line", "way"),
+                ("planet_osm_polygon_geom_idx", "planet_osm_polygon", "way"),
+                ("planet_osm_roads_geom_idx", "planet_osm_roads", "way"),
+            ]
+
+            # One round trip: the composed statements carry no bind parameters.
+            cur.execute(
+                sql.SQL("; ").join(
+                    sql.SQL("CREATE INDEX IF NOT EXISTS {} ON {}.{} USING GIST({})").format(
+                        sql.Identifier(idx_name),
+                        sql.Identifier(schema),
+                        sql.Identifier(table_name),
+                        sql.Identifier(column_name),
+                    )
+                    for idx_name, table_name, column_name in index_statements
+                )
+            )
+    finally:
+        conn.close()
     LOGGER.info("Spatial indexes ready.")
 
 
+def write_json_tmp(path: pathlib.Path, payload: dict[str, Any]) -> pathlib.Path:
+    """Write ``payload`` next to ``path`` as a fsynced temp file and return its path."""
+
+    if orjson is not None:
+        data = orjson.dumps(payload, option=orjson.OPT_INDENT_2)
+    else:
+        data = json.dumps(payload, indent=2).encode("utf-8")
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "wb") as out_file:
+        out_file.write(data)
+        out_file.flush()
+        os.fsync(out_file.fileno())
+    return tmp_path
+
+
+def write_json_documents(documents: list[tuple[pathlib.Path, dict[str, Any]]]) -> None:
+    """Write several JSON documents so readers never observe a partial file.
+
+    Temp files are written concurrently, then renamed into place in list order, so
+    callers should list children before the documents that link to them.
+    """
+
+    with ThreadPoolExecutor(max_workers=len(documents) or 1) as pool:
+        tmp_paths = list(pool.map(lambda doc: write_json_tmp(*doc), documents))
+    for (path, _), tmp_path in zip(documents, tmp_paths, strict=True):
+        os.replace(tmp_path, path)
+
+
 def write_stac_item(stac_dir: pathlib.Path, asset_path: pathlib.Path) -> None:
     stac_dir.mkdir(parents=True, exist_ok=True)
     catalog_path = stac_dir / "catalog.json"
     collection_path = stac_dir / "osm_sample_collection.json"
     item_path = stac_dir / "osm_dc_sample_item.json"
 
-    now = dt.datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
-    item = copy.deepcopy(STAC_TEMPLATE)
-    item["properties"] = {**item["properties"], "created": now}
+    now = dt.datetime.now(dt.timezone.utc).replace(microsecond=0).isoformat()
+    now = now.replace("+00:00", "Z")
     asset_rel_path = os.path.relpath(asset_path, stac_dir)
-    item["assets"] = {
-        "osm_pbf": {
-            "href": asset_rel_path,
-            "type": "application/octet-stream",
-            "roles": ["data"],
-            "title": "District of Columbia OSM extract (.pbf)",
-        }
+    # Only the top level and properties are rebuilt; the remaining subtrees are shared
+    # with the read-only STAC_TEMPLATE.
+    item: dict[str, Any] = {
+        **STAC_TEMPLATE,
+        "properties": {**STAC_TEMPLATE["properties"], "created": now},
+        "assets": {
+            "osm_pbf": {
+                "href": asset_rel_path,
+                "type": "application/octet-stream",
+                "roles": ["data"],
+                "title": "District of Columbia OSM extract (.pbf)",
+            }
+        },
     }
 
     collection = {
@@ -304,12 +436,10 @@ def write_stac_item(stac_dir: pathlib.Path, asset_path: pathlib.Path) -> None:
         {"rel": "root", "href": catalog_path.name, "type": "application/json"},
     ]
 
-    LOGGER.info("Writing STAC catalog to %s", catalog_path)
-    catalog_path.write_text(json.dumps(catalog, indent=2))
-    LOGGER.info("Writing STAC collection to %s", collection_path)
-    collection_path.write_text(json.dumps(collection, indent=2))
-    LOGGER.info("Writing STAC item to %s", item_path)
-    item_path.write_text(json.dumps(item, indent=2))
+    LOGGER.info("Writing STAC item, collection, and catalog to %s", stac_dir)
+    write_json_documents(
+        [(item_path, item), (collection_path, collection), (catalog_path, catalog)]
+    )
 
 
 def get_conn_info() -> Dict[str, Any]:
@@ -348,7 +478,14 @@ def main() -> None:
 
     if not args.skip_import:
         try:
-            run_osm2pgsql(pbf_path, args.schema, conn_info)
+            run_osm2pgsql(
+                pbf_path,
+                args.schema,
+                conn_info,
+                cache_mb=args.osm2pgsql_cache_mb,
+                flat_nodes=args.flat_nodes,
+                drop_slim=args.drop_slim,
+            )
             create_indexes(args.schema, conn_info)
         except FileNotFoundError as exc:
             LOGGER.error("Import failed; dependency missing: %s", exc)
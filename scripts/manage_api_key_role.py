@@ -6,24 +6,39 @@ Create or update hashed API key role mappings in governance.api_keys.
 from __future__ import annotations
 
 import argparse
+import json
 import os
+import pathlib
 import sys
+from collections.abc import Generator, Iterable
+from contextlib import contextmanager
 
-import psycopg2
+from psycopg2 import pool
+from psycopg2.extensions import connection
+from psycopg2.extras import execute_values
 
 from src.security.authorization import api_key_fingerprint
 
 ALLOWED_ROLES = {"public", "member", "elder", "admin"}
 
+_connection_pool: pool.ThreadedConnectionPool | None = None
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Manage API key role mappings.")
-    parser.add_argument("--api-key", required=True, help="Plain API key to hash and store.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--api-key", help="Plain API key to hash and store.")
+    source.add_argument(
+        "--keys-file",
+        type=pathlib.Path,
+        help=(
+            "JSON list of {\"api_key\", \"role\", \"active\"} objects to upsert in one batch "
+            "(\"active\" defaults to true)."
+        ),
+    )
     parser.add_argument(
         "--role",
-        required=True,
         choices=sorted(ALLOWED_ROLES),
-        help="Role to assign to this API key.",
+        help="Role to assign to this API key (required with --api-key).",
     )
     parser.add_argument(
         "--active",
@@ -44,32 +59,121 @@ def db_conn_kwargs() -> dict[str, object]:
     }
 
 
-def upsert_api_key_role(api_key: str, role: str, active: bool) -> None:
-    key_hash = api_key_fingerprint(api_key)
-    query = """
-        INSERT INTO governance.api_keys (key_hash, role, active)
-        VALUES (%s, %s, %s)
-        ON CONFLICT (key_hash)
-        DO UPDATE SET
-            role = EXCLUDED.role,
-            active = EXCLUDED.active,
-            updated_at = NOW()
+@contextmanager
+def pooled_connection() -> Generator[connection, None, None]:
+    """Yield a pooled connection, committing on success and rolling back on error.
+
+    The pool is created lazily so repeated upserts in one process share a single
+    authenticated connection instead of reconnecting per key.
     """
-    with psycopg2.connect(**db_conn_kwargs()) as conn:
-        with conn.cursor() as cur:
-            cur.execute(query, (key_hash, role, active))
+
+    global _connection_pool
+    if _connection_pool is None:
+        _connection_pool = pool.ThreadedConnectionPool(minconn=1, maxconn=8, **db_conn_kwargs())
+
+    conn = _connection_pool.getconn()
+    try:
+        yield conn
         conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        _connection_pool.putconn(conn)
+
+
+def release_pool() -> None:
+    global _connection_pool
+    if _connection_pool is not None:
+        _connection_pool.closeall()
+        _connection_pool = None
+
+
+_UPSERT_API_KEY_SQL = """
+    INSERT INTO governance.api_keys (key_hash, role, active)
+    VALUES %s
+    ON CONFLICT (key_hash)
+    DO UPDATE SET
+        role = EXCLUDED.role,
+        active = EXCLUDED.active,
+        updated_at = NOW()
+"""
+
+
+def upsert_api_key_role(api_key: str, role: str, active: bool) -> None:
+    upsert_api_key_roles([(api_key, role, active)])
+
+
+def upsert_api_key_roles(rows: Iterable[tuple[str, str, bool]]) -> int:
+    """Upsert many (api_key, role, active) rows with batched multi-row INSERTs.
+
+    Keys are hashed before they leave the process. Repeated keys collapse to the last
+    row, since one INSERT ... ON CONFLICT cannot update the same row twice.
+    """
+
+    # Keys files may repeat a key; hash each distinct key once per call.
+    fingerprints: dict[str, str] = {}
+    hashed: dict[str, tuple[str, bool]] = {}
+    for api_key, role, active in rows:
+        key_hash = fingerprints.get(api_key)
+        if key_hash is None:
+            key_hash = fingerprints[api_key] = api_key_fingerprint(api_key)
+        hashed[key_hash] = (role, active)
+    values = [(key_hash, role, active) for key_hash, (role, active) in hashed.items()]
+    if not values:
+        return 0
+    with pooled_connection() as conn, conn.cursor() as cur:
+        execute_values(cur, _UPSERT_API_KEY_SQL, values, page_size=500)
+    return len(values)
+
+
+def load_key_rows(path: pathlib.Path) -> list[tuple[str, str, bool]]:
+    payload = json.loads(path.read_bytes())
+    if not isinstance(payload, list):
+        raise ValueError("Keys file must be a JSON list.")
+
+    rows: list[tuple[str, str, bool]] = []
+    for index, entry in enumerate(payload):
+        if not isinstance(entry, dict):
+            raise ValueError(f"Entry {index} must be an object.")
+        api_key = str(entry.get("api_key", "")).strip()
+        role = str(entry.get("role", "")).strip()
+        active = entry.get("active", True)
+        if not api_key:
+            raise ValueError(f"Entry {index} has a blank api_key.")
+        if role not in ALLOWED_ROLES:
+            raise ValueError(f"Entry {index} has unsupported role {role!r}.")
+        if not isinstance(active, bool):
+            raise ValueError(f"Entry {index} must use a boolean for active.")
+        rows.append((api_key, role, active))
+    return rows
 
 
 def main() -> int:
     args = parse_args()
-    api_key = args.api_key.strip()
-    if not api_key:
-        print("Error: --api-key cannot be blank.", file=sys.stderr)
-        return 2
-    upsert_api_key_role(api_key=api_key, role=args.role, active=args.active)
-    print(f"Upserted key role mapping: role={args.role}, active={args.active}")
-    return 0
+    try:
+        if args.keys_file is not None:
+            try:
+                rows = load_key_rows(args.keys_file)
+            except (OSError, ValueError) as exc:
+                print(f"Error: {exc}", file=sys.stderr)
+                return 2
+            count = upsert_api_key_roles(rows)
+            print(f"Upserted {count} key role mappings from {args.keys_file}")
+            return 0
+
+        api_key = args.api_key.strip()
+        if not api_key:
+            print("Error: --api-key cannot be blank.", file=sys.stderr)
+            return 2
+        if args.role is None:
+            print("Error: --role is required with --api-key.", file=sys.stderr)
+            return 2
+        upsert_api_key_role(api_key=api_key, role=args.role, active=args.active)
+        print(f"Upserted key role mapping: role={args.role}, active={args.active}")
+        return 0
+    finally:
+        release_pool()
 
 
 if __name__ == "__main__":
@@ -8,12 +8,21 @@ import json
 import os
 import pathlib
 import sys
-from collections.abc import Generator
+from collections.abc import Generator, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 from unittest.mock import MagicMock
 
+try:
+    import orjson
+except ImportError:  # optional: pip install -e ".[speedups]"
+    orjson = None
+
 ROOT = pathlib.Path(__file__).resolve().parents[1]
 DEFAULT_CASES_PATH = ROOT / "evals" / "api_contract_cases.json"
+SUPPORTED_ENDPOINTS = frozenset({"/query", "/query/natural"})
+# Cases are mostly pure Python under the GIL, so more workers stop paying off quickly.
+DEFAULT_WORKERS = 4
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
@@ -42,50 +51,100 @@ def _fake_nearest(*_args: Any, **_kwargs: Any) -> list[dict[str, Any]]:
 
 
 def _load_cases(path: pathlib.Path) -> list[dict[str, Any]]:
-    payload = json.loads(path.read_text(encoding="utf-8"))
+    raw = path.read_bytes()
+    payload = orjson.loads(raw) if orjson is not None else json.loads(raw)
     if not isinstance(payload, list):
         raise ValueError("Contract fixture must be a JSON list.")
     return payload
 
 
-def _assert_success_contract(case_id: str, body: dict[str, Any], expect: dict[str, Any]) -> str | None:
-    expected_status = expect.get("status")
-    if expected_status is not None and body.get("status") != expected_status:
-        return f"status mismatch expected={expected_status!r} actual={body.get('status')!r}"
-
-    expected_verification = expect.get("verification_status")
-    if expected_verification is not None and body.get("verification_status") != expected_verification:
-        return (
-            "verification_status mismatch "
-            f"expected={expected_verification!r} actual={body.get('verification_status')!r}"
-        )
+# (expect key, response field) pairs compared verbatim when the case sets the expect key.
+_BODY_EXPECTATIONS: tuple[tuple[str, str], ...] = (
+    ("status", "status"),
+    ("verification_status", "verification_status"),
+)
+_REQUEST_EXPECTATIONS: tuple[tuple[str, str], ...] = (("operation", "request.operation"),)
 
-    request = body.get("request")
-    if not isinstance(request, dict):
-        return "response.request missing or not an object"
 
-    expected_operation = expect.get("operation")
-    if expected_operation is not None and request.get("operation") != expected_operation:
-        return (
-            "request.operation mismatch "
-            f"expected={expected_operation!r} actual={request.get('operation')!r}"
-        )
+def _field_mismatches(
+    source: dict[str, Any], expect: dict[str, Any], fields: tuple[tuple[str, str], ...]
+) -> Iterator[str]:
+    for key, label in fields:
+        expected = expect.get(key)
+        if expected is not None and (actual := source.get(key)) != expected:
+            yield f"{label} mismatch expected={expected!r} actual={actual!r}"
+
+
+def _contract_violations(body: dict[str, Any], expect: dict[str, Any]) -> Iterator[str]:
+    """Yield contract violations lazily, cheapest checks first.
 
-    evidence = body.get("evidence")
-    if not isinstance(evidence, list):
-        return "evidence missing or not a list"
+    Messages are only formatted for failing checks, and callers that stop at the first
+    violation never evaluate the remaining checks.
+    """
 
+    yield from _field_mismatches(body, expect, _BODY_EXPECTATIONS)
+
+    if not isinstance(request := body.get("request"), dict):
+        yield "response.request missing or not an object"
+        return
+    yield from _field_mismatches(request, expect, _REQUEST_EXPECTATIONS)
+
+    if not isinstance(evidence := body.get("evidence"), list):
+        yield "evidence missing or not a list"
+        return
     expected_evidence_len = expect.get("evidence_length")
     if expected_evidence_len is not None and len(evidence) != int(expected_evidence_len):
-        return (
-            "evidence length mismatch "
-            f"expected={expected_evidence_len} actual={len(evidence)}"
+        yield f"evidence length mismatch expected={expected_evidence_len} actual={len(evidence)}"
+
+
+def _assert_success_contract(case_id: str, body: dict[str, Any], expect: dict[str, Any]) -> str | None:
+    return next(_contract_violations(body, expect), None)
+
+
+def _run_case(client: TestClient, case: dict[str, Any]) -> tuple[str, str | None]:
+    """Run one fixture case and return (case_id, failure message or None)."""
+
+    case_id = str(case.get("id", "unknown"))
+    endpoint = str(case.get("endpoint", "")).strip()
+    payload = case.get("payload")
+    expect = case.get("expect")
+
+    if endpoint not in SUPPORTED_ENDPOINTS:
+        return case_id, f"unsupported endpoint {endpoint!r}"
+    if not isinstance(payload, dict):
+        return case_id, "payload must be an object"
+    if not isinstance(expect, dict):
+        return case_id, "expect must be an object"
+
+    expected_status_code = int(expect.get("status_code", 200))
+    response = client.post(endpoint, json=payload)
+
+    if response.status_code != expected_status_code:
+        return case_id, (
+            "status_code mismatch "
+            f"expected={expected_status_code} actual={response.status_code}"
         )
 
-    return None
+    body = response.json()
+    expected_result = str(expect.get("result", "success"))
+
+    if expected_result == "error":
+        expected_substring = str(expect.get("error_contains", ""))
+        detail = body.get("detail", "") if isinstance(body, dict) else ""
+        if expected_substring and expected_substring not in str(detail):
+            return case_id, (
+                "error detail mismatch "
+                f"expected_substring={expected_substring!r} actual={detail!r}"
+            )
+        return case_id, None
 
+    if not isinstance(body, dict):
+        return case_id, "success response is not an object"
 
-def run_cases(cases: list[dict[str, Any]]) -> tuple[int, int]:
+    return case_id, _assert_success_contract(case_id, body, expect)
+
+
+def run_cases(cases: list[dict[str, Any]], *, workers: int = DEFAULT_WORKERS) -> tuple[int, int]:
     passed = 0
     failed = 0
 
@@ -94,75 +153,24 @@ def run_cases(cases: list[dict[str, Any]]) -> tuple[int, int]:
     original_enable_audit_log = settings.enable_audit_log
     original_enable_local_planner = settings.enable_local_llm_planner
 
+    # Overrides are process-global, so install them before any case is submitted.
     app.dependency_overrides[get_db_connection] = _fake_db_conn
     api_main.buffer_geometry = _fake_buffer
     api_main.nearest_neighbors = _fake_nearest
     settings.enable_audit_log = False
     settings.enable_local_llm_planner = False
 
-    client = TestClient(app)
-
     try:
-        for case in cases:
-            case_id = str(case.get("id", "unknown"))
-            endpoint = str(case.get("endpoint", "")).strip()
-            payload = case.get("payload")
-            expect = case.get("expect")
-
-            if endpoint not in {"/query", "/query/natural"}:
-                print(f"[FAIL] {case_id}: unsupported endpoint {endpoint!r}")
-                failed += 1
-                continue
-            if not isinstance(payload, dict):
-                print(f"[FAIL] {case_id}: payload must be an object")
-                failed += 1
-                continue
-            if not isinstance(expect, dict):
-                print(f"[FAIL] {case_id}: expect must be an object")
-                failed += 1
-                continue
-
-            expected_status_code = int(expect.get("status_code", 200))
-            response = client.post(endpoint, json=payload)
-
-            if response.status_code != expected_status_code:
-                print(
-                    f"[FAIL] {case_id}: status_code mismatch "
-                    f"expected={expected_status_code} actual={response.status_code}"
-                )
-                failed += 1
-                continue
-
-            body = response.json()
-            expected_result = str(expect.get("result", "success"))
-
-            if expected_result == "error":
-                expected_substring = str(expect.get("error_contains", ""))
-                detail = body.get("detail", "") if isinstance(body, dict) else ""
-                if expected_substring and expected_substring not in str(detail):
-                    print(
-                        f"[FAIL] {case_id}: error detail mismatch "
-                        f"expected_substring={expected_substring!r} actual={detail!r}"
-                    )
+        # One client for the whole run: the lifespan and portal are started once.
+        with TestClient(app) as client, ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            # map() keeps fixture order in the report even though cases overlap.
+            for case_id, failure in pool.map(lambda case: _run_case(client, case), cases):
+                if failure is None:
+                    print(f"[PASS] {case_id}")
+                    passed += 1
+                else:
+                    print(f"[FAIL] {case_id}: {failure}")
                     failed += 1
-                    continue
-                print(f"[PASS] {case_id}")
-                passed += 1
-                continue
-
-            if not isinstance(body, dict):
-                print(f"[FAIL] {case_id}: success response is not an object")
-                failed += 1
-                continue
-
-            contract_error = _assert_success_contract(case_id, body, expect)
-            if contract_error is not None:
-                print(f"[FAIL] {case_id}: {contract_error}")
-                failed += 1
-                continue
-
-            print(f"[PASS] {case_id}")
-            passed += 1
     finally:
         app.dependency_overrides.pop(get_db_connection, None)
         api_main.buffer_geometry = original_buffer
@@ -173,7 +181,7 @@ def run_cases(cases: list[dict[str, Any]]) -> tuple[int, int]:
     return passed, failed
 
 
-def parse_args() -> argparse.Namespace:
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Run API contract eval fixture checks.")
     parser.add_argument(
         "--cases",
@@ -181,13 +189,19 @@ def parse_args() -> argparse.Namespace:
         default=DEFAULT_CASES_PATH,
         help=f"Path to fixture file (default: {DEFAULT_CASES_PATH.relative_to(ROOT)})",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help="Cases to run concurrently (default: %(default)s).",
+    )
+    return parser.parse_args(argv)
 
 
-def main() -> int:
-    args = parse_args()
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
     cases = _load_cases(args.cases)
-    passed, failed = run_cases(cases)
+    passed, failed = run_cases(cases, workers=args.workers)
     print(f"\nSummary: passed={passed} failed={failed} total={passed + failed}")
     return 0 if failed == 0 else 1
 
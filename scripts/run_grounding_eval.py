@@ -4,43 +4,75 @@
 from __future__ import annotations
 
 import argparse
-import json
+import os
 import pathlib
 import sys
+from collections.abc import Mapping
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any
+
+from pydantic_core import from_json
 
 ROOT = pathlib.Path(__file__).resolve().parents[1]
 DEFAULT_CASES_PATH = ROOT / "evals" / "grounding_cases.json"
-if str(ROOT) not in sys.path:
-    sys.path.insert(0, str(ROOT))
-
-from src.api.main import QueryRequest, _build_grounding_evidence  # noqa: E402
-from src.nl import NaturalQueryParseError, parse_natural_query_prompt  # noqa: E402
 
 
 def _load_cases(path: pathlib.Path) -> list[dict[str, object]]:
-    payload = json.loads(path.read_text(encoding="utf-8"))
+    # jiter parses the raw bytes directly; no intermediate decoded str.
+    payload = from_json(path.read_bytes())
     if not isinstance(payload, list):
         raise ValueError("Eval fixture must be a JSON list.")
     return payload
 
 
+def _fast_mode_enabled() -> bool:
+    return os.environ.get("GROUNDING_EVAL_FAST", "").strip().lower() in {"1", "true", "yes"}
+
+
 def run_cases(cases: list[dict[str, object]]) -> tuple[int, int]:
     passed = 0
     failed = 0
+    # Requests go through QueryRequest validation exactly as production does, so a case
+    # only passes if the API would accept it. GROUNDING_EVAL_FAST skips that pass.
+    fast = _fast_mode_enabled()
+
+    # Deferred: src.api.main pulls in FastAPI, psycopg2, and the spatial stack, which
+    # `--help` and fixture-loading errors should not pay for.
+    if str(ROOT) not in sys.path:
+        sys.path.insert(0, str(ROOT))
+    from pydantic import ValidationError
+
+    from src.api.main import QueryRequest, _build_grounding_evidence
+    from src.nl import NaturalQueryParseError, parse_natural_query_prompt
+
+    # Fixtures often repeat prompts across variants; parse each distinct prompt once.
+    # Entries are read-only views so one case cannot mutate another case's parse result.
+    @lru_cache(maxsize=4096)
+    def parse_prompt(prompt: str) -> Mapping[str, Any]:
+        return MappingProxyType(parse_natural_query_prompt(prompt))
 
     for case in cases:
-        case_id = str(case.get("id", "unknown"))
-        prompt = str(case.get("prompt", ""))
+        # Fixtures are author-controlled JSON, so values are used as-is rather than coerced.
+        case_id = case.get("id") or "unknown"
+        prompt = case.get("prompt") or ""
         expect = case.get("expect")
         if not isinstance(expect, dict):
             print(f"[FAIL] {case_id}: missing 'expect' object")
             failed += 1
             continue
+        if not isinstance(prompt, str):
+            print(f"[FAIL] {case_id}: 'prompt' must be a string")
+            failed += 1
+            continue
 
-        expected_status = str(expect.get("status", ""))
+        expected_status = expect.get("status") or ""
         try:
-            parsed = parse_natural_query_prompt(prompt)
-            request = QueryRequest.model_validate({"prompt": prompt, **parsed})
+            parsed = parse_prompt(prompt)
+            if fast:
+                request = QueryRequest.model_construct(prompt=prompt, **parsed)
+            else:
+                request = QueryRequest.model_validate({"prompt": prompt, **parsed})
             verification_status, _ = _build_grounding_evidence(request)
 
             if expected_status != "success":
@@ -48,8 +80,8 @@ def run_cases(cases: list[dict[str, object]]) -> tuple[int, int]:
                 failed += 1
                 continue
 
-            expected_operation = str(expect.get("operation", ""))
-            expected_verification = str(expect.get("verification_status", ""))
+            expected_operation = expect.get("operation") or ""
+            expected_verification = expect.get("verification_status") or ""
 
             if parsed.get("operation") != expected_operation:
                 print(
@@ -68,17 +100,18 @@ def run_cases(cases: list[dict[str, object]]) -> tuple[int, int]:
 
             print(f"[PASS] {case_id}")
             passed += 1
-        except NaturalQueryParseError as exc:
+        except (NaturalQueryParseError, ValidationError) as exc:
             if expected_status != "error":
                 print(f"[FAIL] {case_id}: unexpected parse error: {exc}")
                 failed += 1
                 continue
 
-            expected_substring = str(expect.get("error_contains", ""))
-            if expected_substring and expected_substring not in str(exc):
+            expected_substring = expect.get("error_contains") or ""
+            message = str(exc)
+            if expected_substring and expected_substring not in message:
                 print(
                     f"[FAIL] {case_id}: error mismatch "
-                    f"expected substring={expected_substring!r} actual={str(exc)!r}"
+                    f"expected substring={expected_substring!r} actual={message!r}"
                 )
                 failed += 1
                 continue
@@ -1,8 +1,12 @@
-from functools import lru_cache
+from __future__ import annotations
 
-from pydantic import AliasChoices, Field
+from functools import cached_property, lru_cache
+
+from pydantic import AliasChoices, Field, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+TEST_ENVIRONMENTS = frozenset({"test", "testing"})
+
 
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(
@@ -60,9 +64,14 @@ class Settings(BaseSettings):
             "db_read_password",
         ),
     )
-    db_pool_min: int = Field(default=1)
-    db_pool_max: int = Field(default=5)
+    db_pool_min: int = Field(default=1, ge=1)
+    db_pool_max: int = Field(default=5, ge=1)
     log_level: str = Field(default="INFO")
+    ready_cache_seconds: float = Field(
+        default=1.0,
+        ge=0,
+        validation_alias=AliasChoices("READY_CACHE_SECONDS", "ready_cache_seconds"),
+    )
     rate_limit_enabled: bool = Field(default=True)
     rate_limit_requests: int = Field(default=60)
     rate_limit_window_seconds: int = Field(default=60)
@@ -72,6 +81,11 @@ class Settings(BaseSettings):
         default="database",
         validation_alias=AliasChoices("AUTHZ_BACKEND", "authz_backend"),
     )
+    authz_role_cache_seconds: float = Field(
+        default=0.0,
+        ge=0,
+        validation_alias=AliasChoices("AUTHZ_ROLE_CACHE_SECONDS", "authz_role_cache_seconds"),
+    )
     allow_public_api: bool = Field(
         default=False,
         validation_alias=AliasChoices("ALLOW_PUBLIC_API", "allow_public_api"),
@@ -124,6 +138,35 @@ class Settings(BaseSettings):
         validation_alias=AliasChoices("LLM_PROMPT_MAX_CHARS", "llm_prompt_max_chars"),
     )
 
+    @model_validator(mode="after")
+    def _check_pool_bounds(self) -> Settings:
+        if self.db_pool_max < self.db_pool_min:
+            raise ValueError("DB_POOL_MAX must be greater than or equal to DB_POOL_MIN.")
+        return self
+
+    @cached_property
+    def is_test_environment(self) -> bool:
+        """Whether APP_ENV names a test environment (computed once per instance)."""
+        return self.environment.lower() in TEST_ENVIRONMENTS
+
+    @cached_property
+    def expected_api_key(self) -> str:
+        """API_KEY with surrounding whitespace removed (computed once per instance)."""
+        return self.api_key.strip()
+
+    @cached_property
+    def uses_database_authz(self) -> bool:
+        """Whether AUTHZ_BACKEND selects per-key database role resolution."""
+        return self.authz_backend.lower() == "database"
+
+    @cached_property
+    def allowed_query_table_set(self) -> frozenset[str]:
+        """Normalized ALLOWED_QUERY_TABLES, falling back to data.features when empty."""
+        tables = frozenset(
+            table.strip() for table in self.allowed_query_tables.split(",") if table.strip()
+        )
+        return tables or frozenset({"data.features"})
+
 
 @lru_cache
 def get_settings() -> Settings:
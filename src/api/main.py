@@ -1,15 +1,23 @@
 from __future__ import annotations
 
 import hashlib
+import hmac
+import logging
+import secrets
+import sys
+from collections.abc import Callable, Mapping
 from contextlib import asynccontextmanager
-from time import perf_counter
+from functools import lru_cache
+from time import monotonic, perf_counter_ns
+from types import MappingProxyType
 from typing import Any
 
+import anyio
 import structlog
-from fastapi import Depends, FastAPI, Header, HTTPException, Request, status
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request, status
 from psycopg2 import Error as PsycopgError
 from psycopg2.extensions import connection as PGConnection
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 
 from src.db.session import (
     connection_context,
@@ -18,23 +26,27 @@ from src.db.session import (
     release_pool,
 )
 from src.governance.audit_logger import log_query_event
+from src.governance.audit_writer import AuditWriter
 from src.llm import (
     LLMPlannerInputError,
     LLMPlannerOutputError,
     LLMPlannerUnavailableError,
+    close_providers,
     plan_operation_from_prompt,
 )
 from src.logging_config import configure_logging
 from src.nl import NaturalQueryParseError, parse_natural_query_prompt
 from src.security.authorization import Permission, check_permission, resolve_role
-from src.security.rate_limit import RateLimitExceeded, build_rate_limiter
+from src.security.rate_limit import NoOpRateLimiter, RateLimitExceeded, build_rate_limiter
 from src.spatial import (
     buffer_geometry,
     calculate_area,
     find_intersections,
     nearest_neighbors,
     transform_crs,
+    validate_geojson_geometry,
 )
+from src.spatial.postgis_ops import DISTANCE_TO_METERS
 from src.telemetry import configure_tracing, current_trace_id, instrument_fastapi_app
 
 from .config import Settings, get_settings
@@ -72,7 +84,7 @@ class QueryRequest(BaseModel):
     distance: float | None = Field(
         None,
         ge=0,
-        description="Distance for buffer or nearest-neighbor operations.",
+        description="Buffer distance, or search radius for nearest_neighbors (in units).",
     )
     units: str | None = Field(
         None, description="Units for distance/area (default meters)."
@@ -86,6 +98,18 @@ class QueryRequest(BaseModel):
     )
     to_epsg: int | None = Field(None, ge=1, le=999_999, description="Target EPSG.")
 
+    @field_validator("operation")
+    @classmethod
+    def _normalize_operation(cls, value: str | None) -> str | None:
+        # Normalized once at intake so dispatch, audit, and evidence code compare directly;
+        # interning lets the _OP_HANDLERS lookup match the literal keys by identity.
+        return sys.intern(value.lower()) if value else value
+
+    @field_validator("geometry", "geometry_b")
+    @classmethod
+    def _validate_geometry(cls, value: dict[str, Any] | None) -> dict[str, Any] | None:
+        return validate_geojson_geometry(value) if value is not None else None
+
 
 class QueryResponse(BaseModel):
     status: str
@@ -111,9 +135,9 @@ def require_api_key(
     x_api_key: str = Header(default="", alias="X-API-Key"),
     settings: Settings = Depends(get_settings),  # noqa: B008
 ) -> None:
-    is_test_env = settings.environment.lower() in ("test", "testing")
-    use_database_authz = settings.authz_backend.lower() == "database"
-    expected = settings.api_key.strip()
+    is_test_env = settings.is_test_environment
+    use_database_authz = settings.uses_database_authz
+    expected = settings.expected_api_key
 
     # In non-test environments using static key auth, enforce API_KEY presence.
     if not is_test_env and not use_database_authz and not expected:
@@ -123,7 +147,12 @@ def require_api_key(
         )
 
     # Legacy exact-match mode when static auth is enabled.
-    if expected and not use_database_authz and x_api_key != expected:
+    # Constant-time comparison so response timing does not reveal key prefixes.
+    if (
+        expected
+        and not use_database_authz
+        and not hmac.compare_digest(x_api_key.encode("utf-8"), expected.encode("utf-8"))
+    ):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid API key.",
@@ -139,17 +168,16 @@ def require_api_key(
             )
 
 
-def get_db_connection(settings: Settings = Depends(get_settings)):  # noqa: B008
-    yield from db_connection_dependency(settings)
-
-
 settings = get_settings()
 configure_logging(settings.log_level)
 configure_tracing(settings)
 logger = structlog.get_logger(__name__)
-allowed_query_tables = {
-    table.strip() for table in settings.allowed_query_tables.split(",") if table.strip()
-} or {"data.features"}
+# The level is fixed by configure_logging above; hot-path calls with computed fields
+# check this first so nothing is built for suppressed events.
+log_info_enabled = logger.is_enabled_for(logging.INFO)
+is_test_env = settings.is_test_environment
+allowed_query_tables = settings.allowed_query_table_set
+_ALLOWED_TABLES_MSG = ", ".join(sorted(allowed_query_tables))
 rate_limiter = build_rate_limiter(
     enabled=settings.rate_limit_enabled,
     environment=settings.environment,
@@ -160,8 +188,16 @@ rate_limiter = build_rate_limiter(
 )
 
 
-def get_rate_limiter():
-    return rate_limiter
+_RATE_LIMIT_HASH_KEY = secrets.token_bytes(32)
+_PARSE_CACHE_MAX_PROMPT_CHARS = 4_096
+
+audit_writer = AuditWriter(lambda: connection_context(settings))
+
+
+def get_db_connection():
+    # Bound to the module-level settings (the same ones the pool is initialized from),
+    # so the dependency graph has no per-request get_settings node here.
+    yield from db_connection_dependency(settings)
 
 
 def _rate_limit_identifier(request: Request, x_api_key: str) -> str:
@@ -169,18 +205,30 @@ def _rate_limit_identifier(request: Request, x_api_key: str) -> str:
     if not raw_identifier:
         client_host = request.client.host if request and request.client else "anonymous"
         raw_identifier = f"ip:{client_host}"
-    trimmed = raw_identifier[:256]
-    return hashlib.sha256(trimmed.encode("utf-8", errors="ignore")).hexdigest()
+    return _hash_identifier(raw_identifier[:256])
+
+
+def _hash_identifier(raw: str) -> str:
+    # Only an in-memory bucket key: a keyed BLAKE2b is faster than SHA-256 for short inputs,
+    # and the per-process key keeps logged identifiers from being matched to raw API keys.
+    return hashlib.blake2b(
+        raw.encode("utf-8", errors="ignore"),
+        digest_size=16,
+        key=_RATE_LIMIT_HASH_KEY,
+    ).hexdigest()
 
 
 def enforce_rate_limit(
     request: Request,
     x_api_key: str = Header(default="", alias="X-API-Key"),
-    limiter=Depends(get_rate_limiter),  # noqa: B008
 ) -> None:
+    if isinstance(rate_limiter, NoOpRateLimiter):
+        # Disabled or test environment: nothing to count, so skip deriving the identifier.
+        return
     identifier = _rate_limit_identifier(request, x_api_key)
     try:
-        limiter.check(identifier)
+        # Module-level limiter read directly: one fewer node for the dependency solver.
+        rate_limiter.check(identifier)
     except RateLimitExceeded as exc:
         logger.warning("rate_limit.exceeded", identifier=identifier)
         raise HTTPException(
@@ -191,13 +239,19 @@ def enforce_rate_limit(
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    if settings.environment.lower() not in ("test", "testing"):
-        initialize_pool(settings)
+    # Opening db_pool_min connections blocks; keep it off the event loop. Request handlers
+    # stay sync so FastAPI runs them (and their psycopg2 calls) in its worker threadpool.
+    if not is_test_env:
+        await anyio.to_thread.run_sync(initialize_pool, settings)
+        audit_writer.start()
     try:
         yield
     finally:
-        if settings.environment.lower() not in ("test", "testing"):
-            release_pool()
+        if not is_test_env:
+            # Drain queued audit events before their connections go away.
+            await anyio.to_thread.run_sync(audit_writer.stop)
+            await anyio.to_thread.run_sync(release_pool)
+        close_providers()
 
 
 app = FastAPI(
@@ -214,9 +268,17 @@ def health() -> dict[str, str]:
     return {"status": "ok"}
 
 
+_ready_ok_until = 0.0
+
+
 @app.get("/ready", tags=["system"])
 def ready() -> dict[str, str]:
-    if settings.environment.lower() in ("test", "testing"):
+    global _ready_ok_until
+    if is_test_env:
+        return {"status": "ready"}
+    # Probe floods (orchestrator checks, scrapers) reuse a recent success instead of
+    # each taking a pooled connection; failures are never cached.
+    if monotonic() < _ready_ok_until:
         return {"status": "ready"}
     try:
         with connection_context(settings) as conn:
@@ -229,6 +291,7 @@ def ready() -> dict[str, str]:
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Database not ready.",
         ) from exc
+    _ready_ok_until = monotonic() + settings.ready_cache_seconds
     return {"status": "ready"}
 
 
@@ -239,19 +302,24 @@ def query(
     __: None = Depends(enforce_rate_limit),  # noqa: B008
     x_api_key: str = Header(default="", alias="X-API-Key"),
     conn: PGConnection = Depends(get_db_connection),  # noqa: B008
+    echo_geometry: bool = Query(  # noqa: B008
+        True,
+        description="Echo request geometries back in the response (disable to shrink it).",
+    ),
 ) -> QueryResponse:
-    start_time = perf_counter()
+    start_time = perf_counter_ns()
     resolved_role = _assert_permission(
         required_permission=Permission.QUERY_PUBLIC,
         x_api_key=x_api_key,
         conn=conn,
     )
-    logger.info(
-        "query.received",
-        operation=request.operation,
-        prompt_length=len(request.prompt),
-        return_format=request.return_format,
-    )
+    if log_info_enabled:
+        logger.info(
+            "query.received",
+            operation=request.operation,
+            prompt_length=len(request.prompt),
+            return_format=request.return_format,
+        )
 
     if request.operation:
         return _execute_structured_request(
@@ -261,6 +329,7 @@ def query(
             started_at=start_time,
             resolved_role=resolved_role,
             success_message="Structured operation executed successfully.",
+            echo_geometry=echo_geometry,
         )
 
     if settings.enable_local_llm_planner:
@@ -322,6 +391,7 @@ def query(
             started_at=start_time,
             resolved_role=resolved_role,
             success_message="Natural-language query planned and executed successfully.",
+            echo_geometry=echo_geometry,
         )
 
     _write_audit_log(
@@ -339,7 +409,7 @@ def query(
             "Local LLM planning is disabled. "
             "Provide 'operation' for structured tool execution."
         ),
-        request=request,
+        request=_response_echo(request, echo_geometry),
         verification_status="unverified",
         evidence=[],
     )
@@ -352,24 +422,28 @@ def query_natural(
     __: None = Depends(enforce_rate_limit),  # noqa: B008
     x_api_key: str = Header(default="", alias="X-API-Key"),
     conn: PGConnection = Depends(get_db_connection),  # noqa: B008
+    echo_geometry: bool = Query(  # noqa: B008
+        True,
+        description="Echo request geometries back in the response (disable to shrink it).",
+    ),
 ) -> QueryResponse:
-    start_time = perf_counter()
+    start_time = perf_counter_ns()
     resolved_role = _assert_permission(
         required_permission=Permission.QUERY_PUBLIC,
         x_api_key=x_api_key,
         conn=conn,
     )
-    logger.info("query_natural.received", prompt_length=len(request.prompt))
+    if log_info_enabled:
+        logger.info("query_natural.received", prompt_length=len(request.prompt))
 
     try:
-        parsed_fields = parse_natural_query_prompt(request.prompt)
+        parsed_fields = _parse_prompt(request.prompt)
     except NaturalQueryParseError as exc:
-        parsed_request = QueryRequest.model_validate(
-            {
-                "prompt": request.prompt,
-                "return_format": request.return_format,
-                "include_confidence": request.include_confidence,
-            }
+        # Every field here was already validated by NaturalQueryRequest; the rest default.
+        parsed_request = QueryRequest.model_construct(
+            prompt=request.prompt,
+            return_format=request.return_format,
+            include_confidence=request.include_confidence,
         )
         _write_audit_log(
             conn=conn,
@@ -382,6 +456,7 @@ def query_natural(
         )
         raise HTTPException(status_code=400, detail=str(exc)) from exc
 
+    # Parsed fields come from user-supplied JSON, so they must go through full validation.
     structured_request = QueryRequest.model_validate(
         {
             "prompt": request.prompt,
@@ -398,17 +473,34 @@ def query_natural(
         started_at=start_time,
         resolved_role=resolved_role,
         success_message="Natural-language query parsed and executed successfully.",
+        echo_geometry=echo_geometry,
     )
 
 
+def _parse_prompt(prompt: str) -> Mapping[str, Any]:
+    # Retries and repeated prompts skip the JSON scan and validation. Very long prompts
+    # bypass the cache so it cannot pin large strings in memory.
+    if len(prompt) > _PARSE_CACHE_MAX_PROMPT_CHARS:
+        return parse_natural_query_prompt(prompt)
+    return _parse_prompt_cached(prompt)
+
+
+@lru_cache(maxsize=1024)
+def _parse_prompt_cached(prompt: str) -> Mapping[str, Any]:
+    # Read-only view: cached results are shared across requests. Parse errors raise and
+    # are not cached.
+    return MappingProxyType(parse_natural_query_prompt(prompt))
+
+
 def _execute_structured_request(
     *,
     request: QueryRequest,
     conn: PGConnection,
     x_api_key: str,
-    started_at: float,
+    started_at: int,
     resolved_role: str,
     success_message: str,
+    echo_geometry: bool = True,
 ) -> QueryResponse:
     try:
         result = _execute_structured_operation(request, conn)
@@ -462,15 +554,22 @@ def _execute_structured_request(
     return QueryResponse(
         status="completed",
         message=success_message,
-        request=request,
+        request=_response_echo(request, echo_geometry),
         result=result,
         verification_status=verification_status,
         evidence=evidence,
     )
 
 
+def _response_echo(request: QueryRequest, echo_geometry: bool) -> QueryRequest:
+    # Geometries are usually the bulk of the echoed request; callers can opt out of them.
+    if echo_geometry or (request.geometry is None and request.geometry_b is None):
+        return request
+    return request.model_copy(update={"geometry": None, "geometry_b": None})
+
+
 def _query_data_sources(request: QueryRequest) -> list[str]:
-    if request.operation and request.operation.lower() == "nearest_neighbors":
+    if request.operation == "nearest_neighbors":
         table = request.table.strip()
         return [table] if table else []
     return []
@@ -504,6 +603,7 @@ def _assert_permission(
         api_key=x_api_key,
         authz_backend=settings.authz_backend,
         conn=conn,
+        role_cache_seconds=settings.authz_role_cache_seconds,
     )
     if not check_permission(role, required_permission):
         raise HTTPException(
@@ -514,8 +614,8 @@ def _assert_permission(
 
 
 def _build_grounding_evidence(request: QueryRequest) -> tuple[str, list[dict[str, Any]]]:
-    operation = request.operation.lower() if request.operation else None
-    if operation is None:
+    operation = request.operation
+    if not operation:
         return "unverified", []
 
     if operation in {"buffer", "calculate_area", "transform_crs"}:
@@ -578,7 +678,7 @@ def _write_audit_log(
     request: QueryRequest,
     x_api_key: str,
     status: str,
-    started_at: float,
+    started_at: int,
     error_message: str | None = None,
     resolved_role: str | None = None,
 ) -> None:
@@ -586,105 +686,131 @@ def _write_audit_log(
         return
 
     try:
-        duration_ms = max(int((perf_counter() - started_at) * 1000), 0)
+        duration_ms = (perf_counter_ns() - started_at) // 1_000_000
         if request.operation:
-            query_type = request.operation.lower()
+            query_type = request.operation
         elif status in {"planning_error", "planning_unavailable"}:
             query_type = "nl_planning"
         else:
             query_type = "nl_pending"
-        log_query_event(
-            conn,
-            user_identifier=x_api_key,
-            prompt=request.prompt,
-            query_type=query_type,
-            execution_time_ms=duration_ms,
-            status=status,
-            error_message=error_message,
-            data_sources=_query_data_sources(request),
-            metadata={**_audit_metadata(request), "resolved_role": resolved_role},
-        )
+        event: dict[str, Any] = {
+            "user_identifier": x_api_key,
+            "prompt": request.prompt,
+            "query_type": query_type,
+            "execution_time_ms": duration_ms,
+            "status": status,
+            "error_message": error_message,
+            "data_sources": _query_data_sources(request),
+            "metadata": {**_audit_metadata(request), "resolved_role": resolved_role},
+        }
+        # Hand off to the background writer; write inline when it is not running or full.
+        if not audit_writer.submit(event):
+            log_query_event(conn, **event)
     except Exception as exc:
         logger.warning("audit.log_failed", error_type=type(exc).__name__)
 
 
-def _execute_structured_operation(
-    request: QueryRequest, conn: PGConnection
-) -> dict[str, Any]:
-    assert request.operation is not None
-    op = request.operation.lower()
+def _op_buffer(request: QueryRequest, conn: PGConnection) -> dict[str, Any]:
+    if request.geometry is None or request.distance is None:
+        raise ValueError("Buffer requires 'geometry' and 'distance'.")
+    units = request.units or "meters"
+    buffered_geometry = buffer_geometry(
+        conn,
+        geom=request.geometry,
+        distance=request.distance,
+        units=units,
+        srid=request.srid,
+    )
+    return {"geometry": buffered_geometry, "units": units}
+
+
+def _op_calculate_area(request: QueryRequest, conn: PGConnection) -> dict[str, Any]:
+    if request.geometry is None:
+        raise ValueError("Area calculation requires 'geometry'.")
+    units = request.units or "square_meters"
+    area = calculate_area(
+        conn,
+        geom=request.geometry,
+        units=units,
+        srid=request.srid,
+    )
+    return {"area": area, "units": units}
 
-    if op == "buffer":
-        if request.geometry is None or request.distance is None:
-            raise ValueError("Buffer requires 'geometry' and 'distance'.")
-        units = request.units or "meters"
-        buffered_geometry = buffer_geometry(
-            conn,
-            geom=request.geometry,
-            distance=request.distance,
-            units=units,
-            srid=request.srid,
-        )
-        return {"geometry": buffered_geometry, "units": units}
-
-    if op == "calculate_area":
-        if request.geometry is None:
-            raise ValueError("Area calculation requires 'geometry'.")
-        units = request.units or "square_meters"
-        area = calculate_area(
-            conn,
-            geom=request.geometry,
-            units=units,
-            srid=request.srid,
-        )
-        return {"area": area, "units": units}
 
-    if op == "find_intersections":
-        if request.geometry is None or request.geometry_b is None:
-            raise ValueError(
-                "Intersection requires both 'geometry' and 'geometry_b'."
-            )
-        intersection_geometry = find_intersections(
-            conn,
-            request.geometry,
-            request.geometry_b,
-            srid=request.srid,
+def _op_find_intersections(request: QueryRequest, conn: PGConnection) -> dict[str, Any]:
+    if request.geometry is None or request.geometry_b is None:
+        raise ValueError(
+            "Intersection requires both 'geometry' and 'geometry_b'."
         )
-        return {"geometry": intersection_geometry}
+    intersection_geometry = find_intersections(
+        conn,
+        request.geometry,
+        request.geometry_b,
+        srid=request.srid,
+    )
+    return {"geometry": intersection_geometry}
 
-    if op == "nearest_neighbors":
-        if request.geometry is None:
-            raise ValueError("Nearest neighbors requires 'geometry'.")
-        table = request.table.strip()
-        if table not in allowed_query_tables:
-            allowed = ", ".join(sorted(allowed_query_tables))
-            raise ValueError(
-                f"Table '{table}' is not permitted. Allowed tables: {allowed}."
-            )
-        features = nearest_neighbors(
-            conn,
-            geom=request.geometry,
-            table=table,
-            limit=request.limit,
-            srid=request.srid,
+
+def _op_nearest_neighbors(request: QueryRequest, conn: PGConnection) -> dict[str, Any]:
+    if request.geometry is None:
+        raise ValueError("Nearest neighbors requires 'geometry'.")
+    table = request.table.strip()
+    if table not in allowed_query_tables:
+        raise ValueError(
+            f"Table '{table}' is not permitted. Allowed tables: {_ALLOWED_TABLES_MSG}."
         )
-        return {"features": features, "limit": request.limit}
-
-    if op == "transform_crs":
-        if (
-            request.geometry is None
-            or request.from_epsg is None
-            or request.to_epsg is None
-        ):
-            raise ValueError(
-                "CRS transformation requires 'geometry', 'from_epsg', and 'to_epsg'."
-            )
-        geometry = transform_crs(
-            conn,
-            geom=request.geometry,
-            from_epsg=request.from_epsg,
-            to_epsg=request.to_epsg,
+    # An optional distance bounds the search radius (in request.units, default meters).
+    max_distance_meters = None
+    if request.distance is not None:
+        units = request.units or "meters"
+        factor = DISTANCE_TO_METERS.get(units.lower())
+        if factor is None:
+            raise ValueError(f"Unsupported distance unit '{units}'.")
+        max_distance_meters = request.distance * factor
+    features = nearest_neighbors(
+        conn,
+        geom=request.geometry,
+        table=table,
+        limit=request.limit,
+        srid=request.srid,
+        max_distance_meters=max_distance_meters,
+    )
+    return {"features": features, "limit": request.limit}
+
+
+def _op_transform_crs(request: QueryRequest, conn: PGConnection) -> dict[str, Any]:
+    if (
+        request.geometry is None
+        or request.from_epsg is None
+        or request.to_epsg is None
+    ):
+        raise ValueError(
+            "CRS transformation requires 'geometry', 'from_epsg', and 'to_epsg'."
         )
-        return {"geometry": geometry}
+    geometry = transform_crs(
+        conn,
+        geom=request.geometry,
+        from_epsg=request.from_epsg,
+        to_epsg=request.to_epsg,
+    )
+    return {"geometry": geometry}
 
-    raise ValueError(f"Unsupported operation '{request.operation}'.")
+
+# Built once at import; keys are the lowercased operation names accepted by /query.
+_OP_HANDLERS: dict[str, Callable[[QueryRequest, PGConnection], dict[str, Any]]] = {
+    "buffer": _op_buffer,
+    "calculate_area": _op_calculate_area,
+    "find_intersections": _op_find_intersections,
+    "nearest_neighbors": _op_nearest_neighbors,
+    "transform_crs": _op_transform_crs,
+}
+
+
+def _execute_structured_operation(
+    request: QueryRequest, conn: PGConnection
+) -> dict[str, Any]:
+    assert request.operation is not None
+    handler = _OP_HANDLERS.get(request.operation)
+    if handler is None:
+        raise ValueError(f"Unsupported operation '{request.operation}'.")
+    return handler(request, conn)
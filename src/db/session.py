@@ -2,18 +2,39 @@ from __future__ import annotations
 
 from collections.abc import Generator
 from contextlib import contextmanager
+from time import perf_counter_ns
+from typing import Any
 
 import structlog
 from psycopg2 import pool
 from psycopg2.extensions import connection
+from psycopg2.extras import register_default_json
 
 from src.api.config import Settings
 
+try:
+    import orjson
+except ImportError:  # optional: pip install -e ".[speedups]"
+    orjson = None
+
 logger = structlog.get_logger(__name__)
 
 _connection_pool: pool.ThreadedConnectionPool | None = None
 
 
+class _PooledConnection(connection):
+    """Pool connection that decodes json results with orjson when it is installed.
+
+    The typecaster is registered on each connection as the pool opens it, so other
+    psycopg2 connections in the process (e.g. scripts) keep the stdlib decoder.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        if orjson is not None:
+            register_default_json(self, loads=orjson.loads)
+
+
 def _build_conninfo_dsn(
     *,
     db_name: str,
@@ -69,10 +90,19 @@ def initialize_pool(settings: Settings) -> None:
         min=settings.db_pool_min,
         max=settings.db_pool_max,
     )
+    started = perf_counter_ns()
+    # psycopg2 pools open `minconn` connections in the constructor, so the pool is warm
+    # once this returns; lifespan calls it before the app accepts traffic.
     _connection_pool = pool.ThreadedConnectionPool(
         minconn=settings.db_pool_min,
         maxconn=settings.db_pool_max,
         dsn=dsn,
+        connection_factory=_PooledConnection,
+    )
+    logger.info(
+        "db.pool.warmed",
+        connections=settings.db_pool_min,
+        elapsed_ms=(perf_counter_ns() - started) // 1_000_000,
     )
 
 
@@ -1,5 +1,11 @@
 """Governance helpers for audit and policy-related workflows."""
 
-from .audit_logger import log_query_event
+from .audit_logger import log_query_event, log_query_events, log_query_events_bulk
+from .audit_writer import AuditWriter
 
-__all__ = ["log_query_event"]
+__all__ = [
+    "AuditWriter",
+    "log_query_event",
+    "log_query_events",
+    "log_query_events_bulk",
+]
@@ -1,22 +1,41 @@
 from __future__ import annotations
 
 import hashlib
+import io
 import json
+from collections.abc import Iterable, Sequence
 from typing import Any
 
 from psycopg2.extensions import connection as PGConnection
+from psycopg2.extras import execute_values
+
+try:
+    import orjson
+except ImportError:  # optional: pip install -e ".[speedups]"
+
+    def _json_dumps(value: Any) -> str:
+        return json.dumps(value)
+
+else:
+
+    def _json_dumps(value: Any) -> str:
+        encoded: bytes = orjson.dumps(value)
+        return encoded.decode("utf-8")
+
+def _digest(value: str) -> str:
+    # Opaque audit keys only; 128-bit BLAKE2b is faster than SHA-256 and half the width.
+    # Not memoized: a cache would keep the raw identifiers and prompts this module redacts.
+    return hashlib.blake2b(value.encode("utf-8", errors="ignore"), digest_size=16).hexdigest()
 
 
 def _hash_identifier(value: str) -> str:
     normalized = value.strip() or "anonymous"
-    digest = hashlib.sha256(normalized.encode("utf-8", errors="ignore")).hexdigest()
-    return f"sha256:{digest}"
+    return f"blake2b:{_digest(normalized)}"
 
 
 def _redacted_query_text(prompt: str) -> str:
     normalized = prompt.strip()
-    digest = hashlib.sha256(normalized.encode("utf-8", errors="ignore")).hexdigest()
-    return f"redacted:sha256:{digest}:len:{len(normalized)}"
+    return f"redacted:blake2b:{_digest(normalized)}:len:{len(normalized)}"
 
 
 def _sanitize_error_message(error_message: str | None) -> str | None:
@@ -52,6 +71,65 @@ def _redact_metadata(metadata: dict[str, Any] | None) -> dict[str, Any]:
     return redacted
 
 
+_INSERT_COLUMNS = """
+    INSERT INTO audit.query_log (
+        user_id,
+        query_text,
+        query_type,
+        execution_time_ms,
+        status,
+        error_message,
+        data_sources,
+        attribution,
+        metadata
+    )
+"""
+# Single-row inserts are the inline fallback (and the writer's per-event retry), so they
+# stay a plain parameterized INSERT: no session state to lose behind a transaction pooler.
+_INSERT_QUERY = _INSERT_COLUMNS + "VALUES (%s, %s, %s, %s, %s, %s, %s::jsonb, %s::jsonb, %s::jsonb)"
+_INSERT_MANY_QUERY = _INSERT_COLUMNS + "VALUES %s"
+_INSERT_MANY_TEMPLATE = "(%s, %s, %s, %s, %s, %s, %s::jsonb, %s::jsonb, %s::jsonb)"
+_COPY_QUERY = (
+    "COPY audit.query_log (user_id, query_text, query_type, execution_time_ms, status, "
+    "error_message, data_sources, attribution, metadata) FROM STDIN WITH (FORMAT text)"
+)
+# COPY text format escapes for backslash and the row/column delimiters.
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+_EMPTY_LIST_JSON = _json_dumps([])
+_EMPTY_OBJECT_JSON = _json_dumps({})
+_DEFAULT_ATTRIBUTION_JSON = _json_dumps({"prompt_policy": "redacted", "user_policy": "hashed"})
+
+
+def _audit_row(
+    *,
+    user_identifier: str,
+    prompt: str,
+    query_type: str | None,
+    execution_time_ms: int,
+    status: str,
+    error_message: str | None = None,
+    data_sources: list[str] | None = None,
+    attribution: dict[str, Any] | None = None,
+    metadata: dict[str, Any] | None = None,
+) -> tuple[Any, ...]:
+    safe_user_id = _hash_identifier(user_identifier)
+    safe_query_text = _redacted_query_text(prompt)
+    safe_error = _sanitize_error_message(error_message)
+    # Most events carry no sources/attribution/metadata; reuse their pre-encoded JSON.
+    return (
+        safe_user_id,
+        safe_query_text,
+        query_type,
+        execution_time_ms,
+        status,
+        safe_error,
+        _json_dumps(data_sources) if data_sources else _EMPTY_LIST_JSON,
+        _json_dumps(attribution) if attribution else _DEFAULT_ATTRIBUTION_JSON,
+        _json_dumps(_redact_metadata(metadata)) if metadata else _EMPTY_OBJECT_JSON,
+    )
+
+
 def log_query_event(
     conn: PGConnection,
     *,
@@ -74,39 +152,65 @@ def log_query_event(
     - Geometry payloads in metadata are summarized without coordinates.
     """
 
-    safe_user_id = _hash_identifier(user_identifier)
-    safe_query_text = _redacted_query_text(prompt)
-    safe_error = _sanitize_error_message(error_message)
-    safe_sources = data_sources or []
-    safe_attribution = attribution or {"prompt_policy": "redacted", "user_policy": "hashed"}
-    safe_metadata = _redact_metadata(metadata)
-
-    query = """
-        INSERT INTO audit.query_log (
-            user_id,
-            query_text,
-            query_type,
-            execution_time_ms,
-            status,
-            error_message,
-            data_sources,
-            attribution,
-            metadata
-        ) VALUES (%s, %s, %s, %s, %s, %s, %s::jsonb, %s::jsonb, %s::jsonb)
+    row = _audit_row(
+        user_identifier=user_identifier,
+        prompt=prompt,
+        query_type=query_type,
+        execution_time_ms=execution_time_ms,
+        status=status,
+        error_message=error_message,
+        data_sources=data_sources,
+        attribution=attribution,
+        metadata=metadata,
+    )
+    with conn.cursor() as cur:
+        cur.execute(_INSERT_QUERY, row)
+
+
+def log_query_events(conn: PGConnection, events: Sequence[dict[str, Any]]) -> None:
+    """
+    Persist several audit events in one multi-row INSERT.
+
+    Each event holds ``log_query_event`` keyword arguments and is redacted the same way.
     """
 
+    if not events:
+        return
+    rows = [_audit_row(**event) for event in events]
     with conn.cursor() as cur:
-        cur.execute(
-            query,
-            (
-                safe_user_id,
-                safe_query_text,
-                query_type,
-                execution_time_ms,
-                status,
-                safe_error,
-                json.dumps(safe_sources),
-                json.dumps(safe_attribution),
-                json.dumps(safe_metadata),
-            ),
+        execute_values(
+            cur,
+            _INSERT_MANY_QUERY,
+            rows,
+            template=_INSERT_MANY_TEMPLATE,
+            page_size=len(rows),
         )
+
+
+def log_query_events_bulk(conn: PGConnection, events: Iterable[dict[str, Any]]) -> int:
+    """
+    Stream audit events into ``audit.query_log`` with ``COPY ... FROM STDIN``.
+
+    Meant for replay/backfill of large event sets, where COPY avoids per-statement
+    parse and plan cost; live traffic keeps using ``log_query_events``. Rows are redacted
+    exactly like the INSERT paths. Returns the number of rows written.
+    """
+
+    buffer = io.StringIO()
+    count = 0
+    for event in events:
+        buffer.write("\t".join(_copy_field(value) for value in _audit_row(**event)))
+        buffer.write("\n")
+        count += 1
+    if not count:
+        return 0
+    buffer.seek(0)
+    with conn.cursor() as cur:
+        cur.copy_expert(_COPY_QUERY, buffer)
+    return count
+
+
+def _copy_field(value: Any) -> str:
+    if value is None:
+        return "\\N"
+    return str(value).translate(_COPY_ESCAPES)
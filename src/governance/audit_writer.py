@@ -0,0 +1,144 @@
+"""
+Background audit writer.
+
+Request handlers hand audit events to a bounded in-process queue; a single daemon
+thread drains it and persists whatever has accumulated (up to ``batch_size`` events)
+with one multi-row INSERT on its own pooled connection, so the audit write is not on
+the response path and bursts cost one round trip instead of one per event.
+
+When the writer is not running or its queue is full, ``submit`` returns False and
+the caller is expected to write synchronously. If a batch INSERT fails, its events
+are retried one at a time on fresh connections; only events that still fail are
+dropped, and the count is logged.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+from collections.abc import Callable
+from contextlib import AbstractContextManager
+from typing import Any
+
+import structlog
+from psycopg2.extensions import connection as PGConnection
+
+from .audit_logger import log_query_event, log_query_events
+
+logger = structlog.get_logger(__name__)
+
+ConnectionFactory = Callable[[], AbstractContextManager[PGConnection]]
+
+_STOP = object()
+
+
+class AuditWriter:
+    """
+    Single-thread audit sink fed by a bounded queue.
+
+    Parameters:
+    - connection_factory: returns a context manager yielding a connection that is
+      committed on exit (e.g. ``lambda: connection_context(settings)``)
+    - max_pending: queue bound; beyond it callers fall back to synchronous writes
+    - batch_size: most events persisted per INSERT
+    """
+
+    def __init__(
+        self,
+        connection_factory: ConnectionFactory,
+        max_pending: int = 10_000,
+        batch_size: int = 1_000,
+    ) -> None:
+        if max_pending <= 0 or batch_size <= 0:
+            raise ValueError("Audit writer requires positive max_pending and batch_size.")
+        self._connection_factory = connection_factory
+        self._batch_size = batch_size
+        self._queue: queue.Queue[Any] = queue.Queue(maxsize=max_pending)
+        self._thread: threading.Thread | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = 10.0) -> None:
+        """Flush queued events and stop the worker thread."""
+
+        if self._thread is None:
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            logger.warning("audit.stop_timeout", pending=self._queue.qsize())
+            return
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.warning("audit.stop_timeout", pending=self._queue.qsize())
+            return
+        self._thread = None
+
+    def submit(self, event: dict[str, Any]) -> bool:
+        """Queue ``log_query_event`` keyword arguments; False means write it yourself."""
+
+        if not self.running:
+            return False
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            logger.warning("audit.queue_full")
+            return False
+        return True
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            # Block for the first event, then take whatever else is already waiting.
+            batch: list[dict[str, Any]] = []
+            item = self._queue.get()
+            while True:
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+                if len(batch) >= self._batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if batch:
+                self._write(batch)
+
+    def _write(self, batch: list[dict[str, Any]]) -> None:
+        try:
+            with self._connection_factory() as conn:
+                log_query_events(conn, batch)
+        except Exception as exc:
+            logger.warning(
+                "audit.batch_failed", error_type=type(exc).__name__, event_count=len(batch)
+            )
+        else:
+            return
+
+        # One bad row fails the whole multi-row INSERT; isolate it instead of losing the batch.
+        dropped = 0
+        error_type = None
+        for event in batch:
+            try:
+                with self._connection_factory() as conn:
+                    log_query_event(conn, **event)
+            except Exception as exc:
+                dropped += 1
+                error_type = type(exc).__name__
+        if dropped:
+            logger.error(
+                "audit.log_failed",
+                error_type=error_type,
+                event_count=len(batch),
+                dropped=dropped,
+            )
@@ -6,6 +6,7 @@ from .provider import (
     LLMPlannerInputError,
     LLMPlannerOutputError,
     LLMPlannerUnavailableError,
+    close_providers,
 )
 
 __all__ = [
@@ -13,5 +14,6 @@ __all__ = [
     "LLMPlannerInputError",
     "LLMPlannerOutputError",
     "LLMPlannerUnavailableError",
+    "close_providers",
     "plan_operation_from_prompt",
 ]
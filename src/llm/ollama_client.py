@@ -1,13 +1,53 @@
 from __future__ import annotations
 
 import json
+import math
+import random
+import threading
 import time
+from email.utils import mktime_tz, parsedate_tz
 from typing import Any
 
 import httpx
 
 from .provider import LLMPlannerOutputError, LLMPlannerUnavailableError
 
+try:
+    import orjson
+except ImportError:  # optional: pip install -e ".[speedups]"
+    _json_loads = json.loads
+else:
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError, so error handling is shared.
+    _json_loads = orjson.loads
+
+_MAX_BACKOFF_SECONDS = 2.0
+_MAX_RETRY_AFTER_SECONDS = 5.0
+
+
+def _retry_after_seconds(value: str) -> float | None:
+    """Parse Retry-After as delta-seconds or an HTTP-date; None when unusable."""
+
+    try:
+        seconds = float(value)
+    except ValueError:
+        parsed = parsedate_tz(value)
+        if parsed is None:
+            return None
+        seconds = mktime_tz(parsed) - time.time()
+    # "nan" and "inf" parse as floats but cannot be slept on.
+    return seconds if math.isfinite(seconds) else None
+
+
+def _retry_delay(exc: Exception, delay_seconds: float) -> float:
+    """Honor a server Retry-After (clamped); otherwise use full-jitter backoff."""
+
+    if isinstance(exc, httpx.HTTPStatusError):
+        retry_after = _retry_after_seconds(exc.response.headers.get("Retry-After", ""))
+        if retry_after is not None:
+            return min(max(retry_after, 0.0), _MAX_RETRY_AFTER_SECONDS)
+    # Full jitter keeps concurrent workers from retrying a single Ollama in lockstep.
+    return random.uniform(0, delay_seconds)
+
 
 class OllamaPlannerClient:
     def __init__(
@@ -22,6 +62,32 @@ class OllamaPlannerClient:
         self._model = model
         self._timeout_seconds = timeout_seconds
         self._max_retries = max(max_retries, 0)
+        self._client: httpx.Client | None = None
+        # Instances are shared across request threads; guards creating and closing _client.
+        self._client_lock = threading.Lock()
+
+    def _http_client(self) -> httpx.Client:
+        # Created on first use and kept for the instance's lifetime, so retries and later
+        # calls reuse the pooled keep-alive connection instead of reconnecting.
+        client = self._client
+        if client is not None:
+            return client
+        with self._client_lock:
+            if self._client is None:
+                self._client = httpx.Client(
+                    base_url=self._base_url,
+                    timeout=self._timeout_seconds,
+                    limits=httpx.Limits(max_keepalive_connections=4, max_connections=8),
+                )
+            return self._client
+
+    def close(self) -> None:
+        """Close the pooled HTTP connections (safe to call more than once)."""
+
+        with self._client_lock:
+            client, self._client = self._client, None
+        if client is not None:
+            client.close()
 
     def _payload(self, prompt: str) -> dict[str, Any]:
         return {
@@ -41,16 +107,15 @@ class OllamaPlannerClient:
 
         for attempt in range(attempts):
             try:
-                with httpx.Client(base_url=self._base_url, timeout=self._timeout_seconds) as client:
-                    response = client.post("/api/generate", json=payload)
-                    response.raise_for_status()
-                    data = response.json()
+                response = self._http_client().post("/api/generate", json=payload)
+                response.raise_for_status()
+                data = response.json()
 
                 raw_response = data.get("response")
                 if not isinstance(raw_response, str):
                     raise LLMPlannerOutputError("Ollama response missing string field 'response'.")
 
-                parsed = json.loads(raw_response)
+                parsed = _json_loads(raw_response)
                 if not isinstance(parsed, dict):
                     raise LLMPlannerOutputError("LLM output must be a JSON object.")
 
@@ -58,8 +123,8 @@ class OllamaPlannerClient:
             except (httpx.TimeoutException, httpx.NetworkError, httpx.HTTPStatusError) as exc:
                 if attempt >= attempts - 1:
                     raise LLMPlannerUnavailableError("LLM provider unavailable.") from exc
-                time.sleep(delay_seconds)
-                delay_seconds *= 2
+                time.sleep(_retry_delay(exc, delay_seconds))
+                delay_seconds = min(delay_seconds * 2, _MAX_BACKOFF_SECONDS)
             except json.JSONDecodeError as exc:
                 raise LLMPlannerOutputError("LLM output is not valid JSON.") from exc
 
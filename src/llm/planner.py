@@ -13,6 +13,11 @@ from .provider import (
 )
 
 _ALLOWED_PROMPT_CONTROL_CHARS = {"\n", "\t", "\r"}
+# str.translate table that deletes every disallowed control character, so one C-level
+# pass detects them instead of a per-character Python loop.
+_DISALLOWED_CONTROL_CHARS = dict.fromkeys(
+    code for code in range(32) if chr(code) not in _ALLOWED_PROMPT_CONTROL_CHARS
+)
 
 _PLANNER_SYSTEM_PROMPT = """You are a strict GIS operation planner.
 Return exactly one JSON object and no additional text.
@@ -31,15 +36,17 @@ def _sanitize_prompt(raw_prompt: str, *, max_chars: int) -> str:
             f"Prompt exceeds max length of {max_chars} characters."
         )
 
-    for char in prompt:
-        if ord(char) < 32 and char not in _ALLOWED_PROMPT_CONTROL_CHARS:
-            raise LLMPlannerInputError("Prompt contains unsupported control characters.")
+    if len(prompt.translate(_DISALLOWED_CONTROL_CHARS)) != len(prompt):
+        raise LLMPlannerInputError("Prompt contains unsupported control characters.")
 
     return prompt
 
 
+_PLANNER_PROMPT_PREFIX = f"{_PLANNER_SYSTEM_PROMPT}\nUser request:\n"
+
+
 def _compose_planner_prompt(prompt: str) -> str:
-    return f"{_PLANNER_SYSTEM_PROMPT}\nUser request:\n{prompt}\nJSON:"
+    return f"{_PLANNER_PROMPT_PREFIX}{prompt}\nJSON:"
 
 
 def plan_operation_from_prompt(
@@ -1,6 +1,14 @@
 from __future__ import annotations
 
-from typing import Any, Protocol
+import threading
+from typing import TYPE_CHECKING, Any, Protocol
+
+if TYPE_CHECKING:
+    from .ollama_client import OllamaPlannerClient
+
+
+_clients: dict[tuple[str, str, float, int], OllamaPlannerClient] = {}
+_clients_lock = threading.Lock()
 
 
 class LLMPlannerError(RuntimeError):
@@ -28,15 +36,42 @@ def build_provider(settings: Any) -> PlannerProvider:
     provider_name = str(getattr(settings, "llm_provider", "ollama")).strip().lower()
 
     if provider_name == "ollama":
-        from .ollama_client import OllamaPlannerClient
-
-        return OllamaPlannerClient(
-            base_url=str(getattr(settings, "llm_ollama_base_url", "http://localhost:11434")),
-            model=str(getattr(settings, "llm_model", "qwen2.5:7b-instruct")),
-            timeout_seconds=float(getattr(settings, "llm_timeout_seconds", 20)),
-            max_retries=int(getattr(settings, "llm_max_retries", 1)),
+        return _ollama_client(
+            str(getattr(settings, "llm_ollama_base_url", "http://localhost:11434")),
+            str(getattr(settings, "llm_model", "qwen2.5:7b-instruct")),
+            float(getattr(settings, "llm_timeout_seconds", 20)),
+            int(getattr(settings, "llm_max_retries", 1)),
         )
 
     raise LLMPlannerUnavailableError(
         f"Unsupported llm_provider '{provider_name}'. Supported: ollama."
     )
+
+
+def _ollama_client(
+    base_url: str, model: str, timeout_seconds: float, max_retries: int
+) -> PlannerProvider:
+    # One client per configuration, so its HTTP connection pool outlives a single request.
+    from .ollama_client import OllamaPlannerClient
+
+    key = (base_url, model, timeout_seconds, max_retries)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = OllamaPlannerClient(
+                base_url=base_url,
+                model=model,
+                timeout_seconds=timeout_seconds,
+                max_retries=max_retries,
+            )
+    return client
+
+
+def close_providers() -> None:
+    """Close cached provider clients (used on application shutdown)."""
+
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        client.close()
@@ -7,21 +7,68 @@ standard logging compatibility for third-party libraries.
 
 from __future__ import annotations
 
+import atexit
 import logging
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any
 
 import structlog
 
+# Request threads only enqueue records; this listener's thread writes them to stdout.
+_listener: QueueListener | None = None
+_queue_handler: QueueHandler | None = None
+
+
+def _json_renderer() -> structlog.processors.JSONRenderer:
+    """Use orjson for event serialization when the speedups extra is installed."""
+
+    try:
+        import orjson
+    except ImportError:
+        return structlog.processors.JSONRenderer()
+
+    def _dumps(event: Any, **kwargs: Any) -> str:
+        # stdlib handlers expect str; orjson emits bytes.
+        rendered: bytes = orjson.dumps(event, default=kwargs.get("default"))
+        return rendered.decode("utf-8")
+
+    return structlog.processors.JSONRenderer(serializer=_dumps)
+
+
+def _stop_listener() -> None:
+    """Flush queued records and stop the stdout listener thread."""
+
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def _install_queue_handler(log_level: int) -> None:
+    global _listener, _queue_handler
+
+    _stop_listener()
+    root = logging.getLogger()
+    if _queue_handler is not None:
+        root.removeHandler(_queue_handler)
+
+    records: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter("%(message)s"))
+    _listener = QueueListener(records, stream_handler)
+    _queue_handler = QueueHandler(records)
+    root.addHandler(_queue_handler)
+    root.setLevel(log_level)
+    _listener.start()
+
 
 def configure_logging(level: str | None = None) -> None:
     """Configure structlog + standard logging."""
 
-    log_level = level or "INFO"
-    logging.basicConfig(
-        format="%(message)s",
-        stream=sys.stdout,
-        level=getattr(logging, log_level.upper(), logging.INFO),
-    )
+    log_level = getattr(logging, (level or "INFO").upper(), logging.INFO)
+    _install_queue_handler(log_level)
 
     structlog.configure(
         processors=[
@@ -31,11 +78,13 @@ def configure_logging(level: str | None = None) -> None:
             structlog.stdlib.add_logger_name,
             structlog.processors.StackInfoRenderer(),
             structlog.processors.format_exc_info,
-            structlog.processors.JSONRenderer(),
+            _json_renderer(),
         ],
         logger_factory=structlog.stdlib.LoggerFactory(),
-        wrapper_class=structlog.make_filtering_bound_logger(
-            getattr(logging, log_level.upper(), logging.INFO)
-        ),
+        # Calls below the level return immediately, before any processor runs.
+        wrapper_class=structlog.make_filtering_bound_logger(log_level),
         cache_logger_on_first_use=True,
     )
+
+
+atexit.register(_stop_listener)
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
 import json
+import re
 from typing import Any
 
 from pydantic import BaseModel, ConfigDict, ValidationError, field_validator, model_validator
 
-from src.spatial.postgis_ops import AREA_FROM_SQ_METERS, DISTANCE_TO_METERS
+from src.spatial.postgis_ops import (
+    AREA_FROM_SQ_METERS,
+    DISTANCE_TO_METERS,
+    validate_geojson_geometry,
+)
 
 ALLOWED_OPERATIONS = {
     "buffer",
@@ -43,6 +48,11 @@ class StructuredOperationCandidate(BaseModel):
             raise ValueError(f"Unsupported operation '{value}'. Allowed: {allowed}.")
         return normalized
 
+    @field_validator("geometry", "geometry_b")
+    @classmethod
+    def _validate_geometry(cls, value: dict[str, Any] | None) -> dict[str, Any] | None:
+        return validate_geojson_geometry(value) if value is not None else None
+
     @field_validator("units")
     @classmethod
     def _normalize_units(cls, value: str | None) -> str | None:
@@ -93,22 +103,33 @@ class StructuredOperationCandidate(BaseModel):
         return self
 
 
+_CANDIDATE_FIELDS = tuple(StructuredOperationCandidate.model_fields)
+
+
+# A JSON object opens with "{" followed by optional whitespace and then a key or "}".
+# Braces in prose or code ("{x}", "{ 1, 2 }") never match, so they skip raw_decode.
+_OBJECT_START_RE = re.compile(r'\{\s*["}]')
+# JSONDecoder keeps no per-call state, so one instance serves every parse.
+_DECODER = json.JSONDecoder()
+
+
 def _extract_json_objects(text: str) -> list[dict[str, Any]]:
-    decoder = json.JSONDecoder()
     found: list[dict[str, Any]] = []
     index = 0
-    while index < len(text):
-        if text[index] != "{":
-            index += 1
-            continue
+    while True:
+        match = _OBJECT_START_RE.search(text, index)
+        if match is None:
+            break
+        index = match.start()
         try:
-            parsed, consumed = decoder.raw_decode(text[index:])
+            # The offset form decodes in place instead of copying the prompt tail.
+            parsed, end = _DECODER.raw_decode(text, index)
         except json.JSONDecodeError:
             index += 1
             continue
         if isinstance(parsed, dict):
             found.append(parsed)
-        index += consumed
+        index = end
     return found
 
 
@@ -153,4 +174,10 @@ def validate_structured_operation_payload(payload: dict[str, Any]) -> dict[str,
     except ValidationError as exc:
         raise NaturalQueryParseError(_format_validation_error(exc)) from exc
 
-    return candidate.model_dump(exclude_none=True)
+    # Read the validated fields directly; model_dump would re-serialize (and copy) the
+    # nested geometry dicts that validation just produced.
+    return {
+        name: value
+        for name in _CANDIDATE_FIELDS
+        if (value := getattr(candidate, name)) is not None
+    }
@@ -7,8 +7,13 @@ an explicit permission matrix. Unknown non-empty API keys default to MEMBER.
 
 from __future__ import annotations
 
-import hashlib
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
 from enum import Enum
+from hashlib import sha256
+from types import MappingProxyType
 
 from fastapi import Header, HTTPException, status
 from psycopg2.extensions import connection as PGConnection
@@ -28,9 +33,56 @@ class Permission(str, Enum):
     EXPORT_DATA = "export:data"
 
 
+# Explicit role -> permission matrix, built once and read-only at runtime.
+_ROLE_PERMISSIONS: Mapping[Role, frozenset[Permission]] = MappingProxyType(
+    {
+        Role.PUBLIC: frozenset({Permission.QUERY_PUBLIC}),
+        Role.MEMBER: frozenset({Permission.QUERY_PUBLIC, Permission.QUERY_SENSITIVE}),
+        Role.ELDER: frozenset(
+            {
+                Permission.QUERY_PUBLIC,
+                Permission.QUERY_SENSITIVE,
+                Permission.QUERY_SACRED,
+            }
+        ),
+        Role.ADMIN: frozenset(
+            {
+                Permission.QUERY_PUBLIC,
+                Permission.QUERY_SENSITIVE,
+                Permission.QUERY_SACRED,
+                Permission.EXPORT_DATA,
+            }
+        ),
+    }
+)
+
+# Bitmask form of the matrix above: one bit per permission, OR-ed per role, so a check
+# is an integer AND. Unknown roles and permissions map to 0 and are denied.
+_PERMISSION_BITS: Mapping[Permission, int] = MappingProxyType(
+    {permission: 1 << index for index, permission in enumerate(Permission)}
+)
+_ROLE_MASKS: Mapping[Role, int] = MappingProxyType(
+    {
+        role: sum(_PERMISSION_BITS[permission] for permission in permissions)
+        for role, permissions in _ROLE_PERMISSIONS.items()
+    }
+)
+
+# API key prefix (text before the first ":", or the whole key) -> role.
+_PREFIX_TO_ROLE: Mapping[str, Role] = MappingProxyType({role.value: role for role in Role})
+
+
+# Database role lookups keyed by key fingerprint -> (role, expires_at). Only used when
+# callers pass a positive cache TTL; revocations take effect once an entry expires.
+# Misses are never cached, so a newly issued key works on its first request.
+_ROLE_CACHE_MAX_ENTRIES = 4_096
+_role_cache: OrderedDict[str, tuple[Role, float]] = OrderedDict()
+_role_cache_lock = threading.Lock()
+
+
 def api_key_fingerprint(api_key: str) -> str:
     normalized = api_key.strip()
-    return hashlib.sha256(normalized.encode("utf-8", errors="ignore")).hexdigest()
+    return sha256(normalized.encode("utf-8", errors="ignore")).hexdigest()
 
 
 def resolve_role_from_api_key(api_key: str) -> Role:
@@ -51,16 +103,8 @@ def resolve_role_from_api_key(api_key: str) -> Role:
     if not normalized:
         return Role.PUBLIC
 
-    if normalized.startswith("admin:") or normalized == "admin":
-        return Role.ADMIN
-    if normalized.startswith("elder:") or normalized == "elder":
-        return Role.ELDER
-    if normalized.startswith("member:") or normalized == "member":
-        return Role.MEMBER
-    if normalized.startswith("public:") or normalized == "public":
-        return Role.PUBLIC
-
-    return Role.MEMBER
+    prefix = normalized.partition(":")[0]
+    return _PREFIX_TO_ROLE.get(prefix, Role.MEMBER)
 
 
 def _normalize_role(raw_role: str | None) -> Role | None:
@@ -73,9 +117,45 @@ def _normalize_role(raw_role: str | None) -> Role | None:
     return None
 
 
-def resolve_role_from_database(conn: PGConnection, api_key: str) -> Role | None:
+def clear_role_cache() -> None:
+    """Drop cached database role lookups (e.g. right after revoking a key)."""
+
+    with _role_cache_lock:
+        _role_cache.clear()
+
+
+def _cached_role(key_hash: str, now: float) -> Role | None:
+    with _role_cache_lock:
+        entry = _role_cache.get(key_hash)
+        if entry is None:
+            return None
+        role, expires_at = entry
+        if now >= expires_at:
+            del _role_cache[key_hash]
+            return None
+        _role_cache.move_to_end(key_hash)
+        return role
+
+
+def _store_role(key_hash: str, role: Role, expires_at: float) -> None:
+    with _role_cache_lock:
+        _role_cache[key_hash] = (role, expires_at)
+        _role_cache.move_to_end(key_hash)
+        if len(_role_cache) > _ROLE_CACHE_MAX_ENTRIES:
+            _role_cache.popitem(last=False)
+
+
+def resolve_role_from_database(
+    conn: PGConnection,
+    api_key: str,
+    *,
+    cache_ttl_seconds: float = 0.0,
+) -> Role | None:
     """
     Resolve role from governance.api_keys using a SHA-256 API key fingerprint.
+
+    With a positive ``cache_ttl_seconds``, resolved roles are reused for that long
+    before the database is consulted again; "no active key" results are not cached.
     """
 
     normalized = api_key.strip()
@@ -83,6 +163,12 @@ def resolve_role_from_database(conn: PGConnection, api_key: str) -> Role | None:
         return Role.PUBLIC
 
     key_hash = api_key_fingerprint(normalized)
+    now = time.monotonic()
+    if cache_ttl_seconds > 0:
+        cached = _cached_role(key_hash, now)
+        if cached is not None:
+            return cached
+
     query = """
         SELECT role
         FROM governance.api_keys
@@ -93,9 +179,10 @@ def resolve_role_from_database(conn: PGConnection, api_key: str) -> Role | None:
     with conn.cursor() as cur:
         cur.execute(query, (key_hash,))
         row = cur.fetchone()
-    if not row:
-        return None
-    return _normalize_role(row[0])
+    role = _normalize_role(row[0]) if row else None
+    if role is not None and cache_ttl_seconds > 0:
+        _store_role(key_hash, role, now + cache_ttl_seconds)
+    return role
 
 
 def resolve_role(
@@ -103,11 +190,14 @@ def resolve_role(
     api_key: str,
     authz_backend: str,
     conn: PGConnection | None = None,
+    role_cache_seconds: float = 0.0,
 ) -> Role:
     backend = authz_backend.strip().lower()
     if backend == "database" and conn is not None:
         try:
-            role = resolve_role_from_database(conn, api_key)
+            role = resolve_role_from_database(
+                conn, api_key, cache_ttl_seconds=role_cache_seconds
+            )
         except Exception:
             role = None
         if role is not None:
@@ -122,22 +212,7 @@ def check_permission(
     """
     Evaluate whether the role has the required permission.
     """
-    role_permissions: dict[Role, set[Permission]] = {
-        Role.PUBLIC: {Permission.QUERY_PUBLIC},
-        Role.MEMBER: {Permission.QUERY_PUBLIC, Permission.QUERY_SENSITIVE},
-        Role.ELDER: {
-            Permission.QUERY_PUBLIC,
-            Permission.QUERY_SENSITIVE,
-            Permission.QUERY_SACRED,
-        },
-        Role.ADMIN: {
-            Permission.QUERY_PUBLIC,
-            Permission.QUERY_SENSITIVE,
-            Permission.QUERY_SACRED,
-            Permission.EXPORT_DATA,
-        },
-    }
-    return required_permission in role_permissions.get(user_role, set())
+    return (_ROLE_MASKS.get(user_role, 0) & _PERMISSION_BITS.get(required_permission, 0)) != 0
 
 
 def enforce_permission(required: Permission):
@@ -145,9 +220,12 @@ def enforce_permission(required: Permission):
     FastAPI dependency factory that validates the caller has the given permission.
     """
 
+    # Resolved once per route; an unmapped permission has no bit and always denies.
+    required_bit = _PERMISSION_BITS.get(required, 0)
+
     def _checker(x_api_key: str | None = Header(default="", alias="X-API-Key")) -> None:
         role = resolve_role_from_api_key(x_api_key or "")
-        if not check_permission(role, required):
+        if not _ROLE_MASKS.get(role, 0) & required_bit:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Insufficient permissions for this operation.",
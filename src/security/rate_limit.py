@@ -11,6 +11,8 @@ import threading
 import time
 from collections import OrderedDict
 
+_MAX_SHARDS = 16
+
 
 class RateLimitExceeded(Exception):
     """Raised when a caller exceeds the configured rate limit."""
@@ -23,6 +25,28 @@ class NoOpRateLimiter:
         return
 
 
+class _Bucket:
+    """Token state for one caller; slotted to avoid a per-caller dict."""
+
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, tokens: float, updated: float) -> None:
+        self.tokens = tokens
+        self.updated = updated
+
+
+class _Shard:
+    """One lock-protected slice of the limiter's buckets, kept in last-update order."""
+
+    __slots__ = ("lock", "buckets", "max_identifiers", "next_sweep")
+
+    def __init__(self, max_identifiers: int) -> None:
+        self.lock = threading.Lock()
+        self.buckets: OrderedDict[str, _Bucket] = OrderedDict()
+        self.max_identifiers = max_identifiers
+        self.next_sweep = 0.0
+
+
 class RateLimiter:
     """
     Token-bucket rate limiter keyed by caller identifier (API key or IP).
@@ -33,6 +57,8 @@ class RateLimiter:
     - burst: optional burst capacity; defaults to max_requests
     - max_identifiers: cap on tracked caller keys to bound memory use
     - bucket_ttl_seconds: idle time before old caller buckets are evicted
+    - shard_count: power-of-two number of independently locked bucket maps; the
+      identifier cap and LRU eviction apply per shard
     """
 
     def __init__(
@@ -42,58 +68,69 @@ class RateLimiter:
         burst: int | None = None,
         max_identifiers: int = 10_000,
         bucket_ttl_seconds: int = 3_600,
+        shard_count: int = 1,
     ) -> None:
         if max_requests <= 0 or window_seconds <= 0:
             raise ValueError("Rate limiter requires positive max_requests and window_seconds.")
         if max_identifiers <= 0 or bucket_ttl_seconds <= 0:
             raise ValueError("Rate limiter requires positive max_identifiers and bucket_ttl_seconds.")
+        if shard_count <= 0 or shard_count & (shard_count - 1):
+            raise ValueError("Rate limiter requires a power-of-two shard_count.")
 
         capacity = burst if burst is not None else max_requests
         self.capacity = float(capacity)
         self.refill_rate = float(max_requests) / float(window_seconds)
         self.max_identifiers = max_identifiers
         self.bucket_ttl_seconds = float(bucket_ttl_seconds)
-        self._buckets: OrderedDict[str, dict[str, float]] = OrderedDict()
-        self._lock = threading.Lock()
-
-    def _refill(self, bucket: dict[str, float], now: float) -> None:
-        elapsed = now - bucket["updated"]
-        if elapsed <= 0:
+        per_shard_identifiers = max(1, max_identifiers // shard_count)
+        self._shards = [_Shard(per_shard_identifiers) for _ in range(shard_count)]
+        self._shard_mask = shard_count - 1
+        # Stale buckets are swept at most once per interval rather than on every check.
+        self._sweep_interval = max(1.0, self.bucket_ttl_seconds / 16)
+
+    def _evict_stale(self, shard: _Shard, now: float) -> None:
+        if now < shard.next_sweep:
             return
-        bucket["tokens"] = min(self.capacity, bucket["tokens"] + elapsed * self.refill_rate)
-        bucket["updated"] = now
-
-    def _evict_stale(self, now: float) -> None:
-        stale_keys = [
-            key
-            for key, bucket in self._buckets.items()
-            if now - bucket["updated"] >= self.bucket_ttl_seconds
-        ]
-        for key in stale_keys:
-            self._buckets.pop(key, None)
+        # Buckets are kept in last-update order, so stale ones sit at the front.
+        buckets = shard.buckets
+        while buckets:
+            bucket = next(iter(buckets.values()))
+            if now - bucket.updated < self.bucket_ttl_seconds:
+                break
+            buckets.popitem(last=False)
+        shard.next_sweep = now + self._sweep_interval
 
     def check(self, identifier: str) -> None:
         """
         Consume one token for the given identifier or raise RateLimitExceeded.
         """
 
-        now = time.monotonic()
-        with self._lock:
-            self._evict_stale(now)
+        shard = self._shards[hash(identifier) & self._shard_mask]
+        with shard.lock:
+            # Read the clock under the lock so bucket order matches update order.
+            now = time.monotonic()
+            self._evict_stale(shard, now)
 
-            bucket = self._buckets.get(identifier)
+            buckets = shard.buckets
+            bucket = buckets.get(identifier)
             if bucket is None:
-                if len(self._buckets) >= self.max_identifiers:
+                if len(buckets) >= shard.max_identifiers:
                     # Evict least-recently used identifier to bound memory.
-                    self._buckets.popitem(last=False)
-                bucket = {"tokens": self.capacity, "updated": now}
-
-            self._refill(bucket, now)
-            if bucket["tokens"] < 1.0:
+                    buckets.popitem(last=False)
+                bucket = buckets[identifier] = _Bucket(self.capacity, now)
+            else:
+                buckets.move_to_end(identifier)
+
+            # Refill and consume in one pass over locals.
+            tokens = bucket.tokens
+            elapsed = now - bucket.updated
+            if elapsed > 0:
+                tokens = min(self.capacity, tokens + elapsed * self.refill_rate)
+                bucket.updated = now
+            if tokens < 1.0:
+                bucket.tokens = tokens
                 raise RateLimitExceeded("Rate limit exceeded.")
-            bucket["tokens"] -= 1.0
-            self._buckets[identifier] = bucket
-            self._buckets.move_to_end(identifier)
+            bucket.tokens = tokens - 1.0
 
 
 def build_rate_limiter(
@@ -110,9 +147,14 @@ def build_rate_limiter(
 
     if not enabled or environment.lower() in ("test", "testing"):
         return NoOpRateLimiter()
+    # Largest power of two up to _MAX_SHARDS that still leaves each shard one slot.
+    shard_count = 1
+    while shard_count * 2 <= min(_MAX_SHARDS, max_identifiers):
+        shard_count *= 2
     return RateLimiter(
         max_requests=max_requests,
         window_seconds=window_seconds,
         max_identifiers=max_identifiers,
         bucket_ttl_seconds=bucket_ttl_seconds,
+        shard_count=shard_count,
     )
@@ -9,16 +9,26 @@ measurements, etc.).
 
 from .postgis_ops import (
     buffer_geometry,
+    buffer_geometry_many,
     calculate_area,
+    calculate_area_many,
     find_intersections,
+    find_intersections_many,
     nearest_neighbors,
     transform_crs,
+    transform_crs_many,
+    validate_geojson_geometry,
 )
 
 __all__ = [
     "buffer_geometry",
+    "buffer_geometry_many",
     "calculate_area",
+    "calculate_area_many",
     "find_intersections",
+    "find_intersections_many",
     "nearest_neighbors",
     "transform_crs",
+    "transform_crs_many",
+    "validate_geojson_geometry",
 ]
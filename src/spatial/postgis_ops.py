@@ -14,44 +14,80 @@ the code straightforward to test using mocks.
 from __future__ import annotations
 
 import json
+from collections.abc import Mapping, Sequence
+from types import MappingProxyType
 from typing import Any, cast
 
 from psycopg2 import sql
 from psycopg2.extensions import connection
+from psycopg2.extensions import cursor as PGCursor
+
+# Queries cast ST_AsGeoJSON output to json, so psycopg2's json typecaster returns
+# parsed dicts and no helper decodes result strings itself. Pooled connections decode
+# json with orjson when it is installed (see src.db.session).
+try:
+    import orjson
+except ImportError:  # optional: pip install -e ".[speedups]"
+
+    def _json_dumps(value: Any) -> str:
+        return json.dumps(value)
+
+else:
+
+    def _json_dumps(value: Any) -> str:
+        encoded: bytes = orjson.dumps(value)
+        return encoded.decode("utf-8")
 
 GeoJSON = dict[str, Any]
 GeoJSONInput = GeoJSON | str
 
-DISTANCE_TO_METERS: dict[str, float] = {
-    "meter": 1.0,
-    "meters": 1.0,
-    "metre": 1.0,
-    "metres": 1.0,
-    "kilometer": 1_000.0,
-    "kilometers": 1_000.0,
-    "kilometre": 1_000.0,
-    "kilometres": 1_000.0,
-    "mile": 1_609.344,
-    "miles": 1_609.344,
-    "foot": 0.3048,
-    "feet": 0.3048,
-    "ft": 0.3048,
-    "yard": 0.9144,
-    "yards": 0.9144,
-}
-
-AREA_FROM_SQ_METERS: dict[str, float] = {
-    "square_meter": 1.0,
-    "square_meters": 1.0,
-    "sqm": 1.0,
-    "hectare": 0.0001,
-    "hectares": 0.0001,
-    "acre": 0.000247105,
-    "acres": 0.000247105,
-    "square_kilometer": 1e-6,
-    "square_kilometers": 1e-6,
-    "sqkm": 1e-6,
-}
+# Unit tables are read-only; keys are lowercase and callers lowercase input once.
+DISTANCE_TO_METERS: Mapping[str, float] = MappingProxyType(
+    {
+        "meter": 1.0,
+        "meters": 1.0,
+        "metre": 1.0,
+        "metres": 1.0,
+        "kilometer": 1_000.0,
+        "kilometers": 1_000.0,
+        "kilometre": 1_000.0,
+        "kilometres": 1_000.0,
+        "mile": 1_609.344,
+        "miles": 1_609.344,
+        "foot": 0.3048,
+        "feet": 0.3048,
+        "ft": 0.3048,
+        "yard": 0.9144,
+        "yards": 0.9144,
+    }
+)
+
+GEOJSON_GEOMETRY_TYPES = frozenset(
+    {
+        "Point",
+        "MultiPoint",
+        "LineString",
+        "MultiLineString",
+        "Polygon",
+        "MultiPolygon",
+        "GeometryCollection",
+    }
+)
+
+AREA_FROM_SQ_METERS: Mapping[str, float] = MappingProxyType(
+    {
+        "square_meter": 1.0,
+        "square_meters": 1.0,
+        "sqm": 1.0,
+        "hectare": 0.0001,
+        "hectares": 0.0001,
+        "acre": 0.000247105,
+        "acres": 0.000247105,
+        "square_kilometer": 1e-6,
+        "square_kilometers": 1e-6,
+        "sqkm": 1e-6,
+    }
+)
 
 
 def buffer_geometry(
@@ -82,14 +118,14 @@ def buffer_geometry(
                 )::geometry,
                 %s
             )
-        )
+        )::json
     """
     with conn.cursor() as cur:
         cur.execute(query, (geom_json, srid, meters, srid))
         row = cur.fetchone()
     if not row or row[0] is None:
         raise ValueError("Buffer operation returned no geometry.")
-    return cast(GeoJSON, json.loads(row[0]))
+    return cast(GeoJSON, row[0])
 
 
 def calculate_area(
@@ -138,14 +174,31 @@ def find_intersections(
                 ST_SetSRID(ST_GeomFromGeoJSON(%s), %s),
                 ST_SetSRID(ST_GeomFromGeoJSON(%s), %s)
             )
-        )
+        )::json
     """
     with conn.cursor() as cur:
         cur.execute(query, (geom_a_json, srid, geom_b_json, srid))
         row = cur.fetchone()
     if not row or row[0] is None:
         return None
-    return cast(GeoJSON, json.loads(row[0]))
+    return cast(GeoJSON, row[0])
+
+
+def _column_srid(cur: PGCursor, table: str, geom_column: str) -> int | None:
+    # Unqualified table names resolve against the session's current schema.
+    schema, _, name = table.rpartition(".")
+    cur.execute(
+        """
+        SELECT srid
+        FROM geometry_columns
+        WHERE f_table_schema = COALESCE(%s, current_schema())
+          AND f_table_name = %s
+          AND f_geometry_column = %s
+        """,
+        (schema or None, name, geom_column),
+    )
+    row = cur.fetchone()
+    return int(row[0]) if row else None
 
 
 def nearest_neighbors(
@@ -156,44 +209,77 @@ def nearest_neighbors(
     geom_column: str = "geom",
     id_column: str = "id",
     srid: int = 4326,
+    max_distance_meters: float | None = None,
 ) -> list[dict[str, Any]]:
     """
     Find the nearest features in a table to the provided geometry.
 
-    Results include the identifier, distance (meters), and GeoJSON geometry.
-    Uses geography type for both ordering and distance calculation to ensure
-    accurate spherical distances and consistent results.
+    With ``max_distance_meters``, only features within that geodesic distance
+    (``ST_DWithin`` on geography) are returned.
+
+    Results include the identifier, distance (meters), and GeoJSON geometry,
+    ordered by geodesic distance.
+
+    Ordering and the radius filter run on geography. When the table's column is
+    registered in ``geometry_columns`` as EPSG:4326 (as ``data.features`` is), it is
+    cast to geography without ``ST_Transform``, so a ``GIST ((geom::geography))``
+    index can serve both. Columns in any other SRID are transformed per row, which
+    is exact but cannot use an index.
     """
 
     if limit <= 0:
         raise ValueError("limit must be greater than zero.")
+    if max_distance_meters is not None and max_distance_meters < 0:
+        raise ValueError("max_distance_meters must be non-negative.")
 
     geom_json = _ensure_geojson_str(geom)
-    # Use geography type for accurate spherical distance in meters.
-    # Both the ORDER BY (<->) and ST_Distance use the same geography-based
-    # calculation to ensure ordering matches reported distances.
-    query = sql.SQL(
-        """
-        SELECT
-            {id_column},
-            ST_AsGeoJSON({geom_column}) AS geom_json,
-            ST_Distance(
-                ST_Transform({geom_column}, 4326)::geography,
-                ST_Transform(ST_SetSRID(ST_GeomFromGeoJSON(%s), %s), 4326)::geography
-            ) AS distance_m
-        FROM {table}
-        ORDER BY ST_Transform({geom_column}, 4326)::geography <->
-                 ST_Transform(ST_SetSRID(ST_GeomFromGeoJSON(%s), %s), 4326)::geography
-        LIMIT %s
-        """
-    ).format(
-        id_column=sql.Identifier(id_column),
-        geom_column=sql.Identifier(geom_column),
-        table=sql.Identifier(*(table.split(".")) if "." in table else (table,)),
-    )
+    identifiers = {
+        "id_column": sql.Identifier(id_column),
+        "geom_column": sql.Identifier(geom_column),
+        "table": sql.Identifier(*(table.split(".")) if "." in table else (table,)),
+    }
 
-    params = (geom_json, srid, geom_json, srid, limit)
     with conn.cursor() as cur:
+        column_srid = _column_srid(cur, table, geom_column)
+        if column_srid == 4326:
+            geography = sql.SQL("{geom_column}::geography").format(**identifiers)
+        else:
+            geography = sql.SQL("ST_Transform({geom_column}, 4326)::geography").format(
+                **identifiers
+            )
+        point_params: tuple[Any, ...]
+        if srid == 4326:
+            point = sql.SQL("ST_SetSRID(ST_GeomFromGeoJSON(%s), 4326)::geography")
+            point_params = (geom_json,)
+        else:
+            point = sql.SQL("ST_Transform(ST_SetSRID(ST_GeomFromGeoJSON(%s), %s), 4326)::geography")
+            point_params = (geom_json, srid)
+
+        within: sql.Composable = sql.SQL("")
+        params: tuple[Any, ...] = point_params
+        if max_distance_meters is not None:
+            # Filtering before ORDER BY ... LIMIT keeps every feature inside the radius
+            # eligible, so the result is only short when fewer features qualify.
+            within = sql.SQL("WHERE ST_DWithin({geography}, {point}, %s)").format(
+                geography=geography, point=point
+            )
+            params += point_params + (float(max_distance_meters),)
+        params += point_params + (limit,)
+        # <-> on geography is spherical distance while ST_Distance is spheroidal, so
+        # near-ties (within ~0.5%) may come back in either order.
+        query = sql.SQL(
+            """
+            SELECT
+                {id_column},
+                ST_AsGeoJSON({geom_column})::json AS geom_json,
+                ST_Distance({geography}, {point}) AS distance_m
+            FROM {table}
+            {within}
+            ORDER BY {geography} <-> {point}
+            LIMIT %s
+            """
+        ).format(geography=geography, point=point, within=within, **identifiers)
+
         cur.execute(query, params)
         rows = cur.fetchall()
 
@@ -203,7 +289,7 @@ def nearest_neighbors(
         results.append(
             {
                 "id": feature_id,
-                "geometry": json.loads(geom_result) if geom_result else None,
+                "geometry": geom_result,
                 "distance_meters": float(distance_m) if distance_m is not None else None,
             }
         )
@@ -227,24 +313,198 @@ def transform_crs(
                 ST_SetSRID(ST_GeomFromGeoJSON(%s), %s),
                 %s
             )
-        )
+        )::json
     """
     with conn.cursor() as cur:
         cur.execute(query, (geom_json, from_epsg, to_epsg))
         row = cur.fetchone()
     if not row or row[0] is None:
         raise ValueError("CRS transformation returned no geometry.")
-    return cast(GeoJSON, json.loads(row[0]))
+    return cast(GeoJSON, row[0])
+
+
+# --------------------------------------------------------------------------- #
+# Batched variants
+#
+# Each *_many helper sends its inputs as arrays and unnests them server-side, so a
+# list of N geometries costs one round trip instead of N. Results keep input order.
+# --------------------------------------------------------------------------- #
+
+def buffer_geometry_many(
+    conn: connection,
+    geoms: Sequence[GeoJSONInput],
+    distances: Sequence[float],
+    units: str = "meters",
+    srid: int = 4326,
+) -> list[GeoJSON]:
+    """
+    Buffer each geometry by the distance at the same position.
+
+    Semantics match ``buffer_geometry`` applied item by item.
+    """
+
+    if len(geoms) != len(distances):
+        raise ValueError("geoms and distances must have the same length.")
+    if not geoms:
+        return []
+
+    meters = [_distance_to_meters(distance, units) for distance in distances]
+    query = """
+        SELECT ST_AsGeoJSON(
+            ST_Transform(
+                ST_Buffer(
+                    ST_Transform(ST_SetSRID(ST_GeomFromGeoJSON(t.g), %s), 4326)::geography,
+                    t.d
+                )::geometry,
+                %s
+            )
+        )::json
+        FROM unnest(%s::text[], %s::double precision[]) WITH ORDINALITY AS t(g, d, ord)
+        ORDER BY t.ord
+    """
+    with conn.cursor() as cur:
+        cur.execute(query, (srid, srid, _ensure_geojson_strs(geoms), meters))
+        rows = cur.fetchall()
+    results: list[GeoJSON] = []
+    for row in rows:
+        if row[0] is None:
+            raise ValueError("Buffer operation returned no geometry.")
+        results.append(cast(GeoJSON, row[0]))
+    return results
+
+
+def calculate_area_many(
+    conn: connection,
+    geoms: Sequence[GeoJSONInput],
+    units: str = "square_meters",
+    srid: int = 4326,
+) -> list[float]:
+    """
+    Calculate the area of each geometry in the requested units.
+    """
+
+    if not geoms:
+        return []
+    # Resolve the unit before the round trip so bad input fails without a query.
+    _area_from_square_meters(0.0, units)
+    query = """
+        SELECT ST_Area(
+            ST_Transform(ST_SetSRID(ST_GeomFromGeoJSON(t.g), %s), 4326)::geography
+        )
+        FROM unnest(%s::text[]) WITH ORDINALITY AS t(g, ord)
+        ORDER BY t.ord
+    """
+    with conn.cursor() as cur:
+        cur.execute(query, (srid, _ensure_geojson_strs(geoms)))
+        rows = cur.fetchall()
+    results: list[float] = []
+    for row in rows:
+        if row[0] is None:
+            raise ValueError("Area calculation returned no result.")
+        results.append(_area_from_square_meters(float(row[0]), units))
+    return results
+
+
+def find_intersections_many(
+    conn: connection,
+    pairs: Sequence[tuple[GeoJSONInput, GeoJSONInput]],
+    srid: int = 4326,
+) -> list[GeoJSON | None]:
+    """
+    Intersect each (geom_a, geom_b) pair; entries are None where there is no overlap.
+    """
+
+    if not pairs:
+        return []
+    query = """
+        SELECT ST_AsGeoJSON(
+            ST_Intersection(
+                ST_SetSRID(ST_GeomFromGeoJSON(t.a), %s),
+                ST_SetSRID(ST_GeomFromGeoJSON(t.b), %s)
+            )
+        )::json
+        FROM unnest(%s::text[], %s::text[]) WITH ORDINALITY AS t(a, b, ord)
+        ORDER BY t.ord
+    """
+    geoms_a = _ensure_geojson_strs([pair[0] for pair in pairs])
+    geoms_b = _ensure_geojson_strs([pair[1] for pair in pairs])
+    with conn.cursor() as cur:
+        cur.execute(query, (srid, srid, geoms_a, geoms_b))
+        rows = cur.fetchall()
+    return [cast(GeoJSON, row[0]) if row[0] is not None else None for row in rows]
+
+
+def transform_crs_many(
+    conn: connection,
+    geoms: Sequence[GeoJSONInput],
+    from_epsg: int,
+    to_epsg: int,
+) -> list[GeoJSON]:
+    """
+    Transform each geometry from one CRS to another.
+    """
+
+    if not geoms:
+        return []
+    query = """
+        SELECT ST_AsGeoJSON(
+            ST_Transform(
+                ST_SetSRID(ST_GeomFromGeoJSON(t.g), %s),
+                %s
+            )
+        )::json
+        FROM unnest(%s::text[]) WITH ORDINALITY AS t(g, ord)
+        ORDER BY t.ord
+    """
+    with conn.cursor() as cur:
+        cur.execute(query, (from_epsg, to_epsg, _ensure_geojson_strs(geoms)))
+        rows = cur.fetchall()
+    results: list[GeoJSON] = []
+    for row in rows:
+        if row[0] is None:
+            raise ValueError("CRS transformation returned no geometry.")
+        results.append(cast(GeoJSON, row[0]))
+    return results
 
 
 # --------------------------------------------------------------------------- #
 # Helper utilities
 # --------------------------------------------------------------------------- #
 
+def validate_geojson_geometry(geom: GeoJSON) -> GeoJSON:
+    """
+    Check that a GeoJSON geometry has a known type and a coordinate array.
+
+    This is a structural check only, so malformed input is rejected once at request
+    parsing instead of surfacing later as a PostGIS error. PostGIS still validates
+    the coordinates themselves.
+    """
+
+    geometry_type = geom.get("type")
+    if geometry_type not in GEOJSON_GEOMETRY_TYPES:
+        allowed = ", ".join(sorted(GEOJSON_GEOMETRY_TYPES))
+        raise ValueError(f"Unsupported GeoJSON geometry type {geometry_type!r}. Allowed: {allowed}.")
+    if geometry_type == "GeometryCollection":
+        members = geom.get("geometries")
+        if not isinstance(members, list):
+            raise ValueError("GeometryCollection requires a 'geometries' list.")
+        for member in members:
+            if not isinstance(member, dict):
+                raise ValueError("GeometryCollection members must be GeoJSON objects.")
+            validate_geojson_geometry(member)
+    elif not isinstance(geom.get("coordinates"), list):
+        raise ValueError(f"{geometry_type} geometry requires a 'coordinates' array.")
+    return geom
+
+
 def _ensure_geojson_str(geom: GeoJSONInput) -> str:
     if isinstance(geom, str):
         return geom
-    return json.dumps(geom)
+    return _json_dumps(geom)
+
+
+def _ensure_geojson_strs(geoms: Sequence[GeoJSONInput]) -> list[str]:
+    return [_ensure_geojson_str(geom) for geom in geoms]
 
 
 def _distance_to_meters(distance: float, units: str) -> float:
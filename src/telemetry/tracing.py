@@ -2,6 +2,14 @@ from __future__ import annotations
 
 from typing import Any
 
+# Resolved once at import so current_trace_id never retries a failed import per request.
+try:
+    from opentelemetry import trace as _trace_api
+except Exception:  # optional: pip install -e ".[telemetry]"
+    _otel_trace: Any = None
+else:
+    _otel_trace = _trace_api
+
 _TRACING_CONFIGURED = False
 
 
@@ -16,8 +24,9 @@ def configure_tracing(settings: Any) -> bool:
     if not bool(getattr(settings, "otel_enabled", False)):
         return False
 
+    if _otel_trace is None:
+        return False
     try:
-        from opentelemetry import trace
         from opentelemetry.sdk.resources import Resource
         from opentelemetry.sdk.trace import TracerProvider
         from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
@@ -29,7 +38,7 @@ def configure_tracing(settings: Any) -> bool:
     )
     provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
     provider.add_span_processor(BatchSpanProcessor(ConsoleSpanExporter()))
-    trace.set_tracer_provider(provider)
+    _otel_trace.set_tracer_provider(provider)
     _TRACING_CONFIGURED = True
     return True
 
@@ -54,17 +63,19 @@ def instrument_fastapi_app(app: Any, settings: Any) -> bool:
 def current_trace_id() -> str | None:
     """
     Return the active trace id as 32-char hex when available.
+
+    Returns None without touching OpenTelemetry unless configure_tracing succeeded.
     """
 
-    try:
-        from opentelemetry import trace
-    except Exception:
+    if not _TRACING_CONFIGURED:
         return None
 
-    span = trace.get_current_span()
+    span = _otel_trace.get_current_span()
     if span is None:
         return None
     context = span.get_span_context()
     if context is None or not getattr(context, "is_valid", False):
         return None
-    return f"{context.trace_id:032x}"
+    trace_id: int = context.trace_id
+    # Same zero-padded 32-char hex as format(trace_id, "032x"), via a direct C path.
+    return trace_id.to_bytes(16, "big").hex()
@@ -1,2 +1,24 @@
 # pytest configuration
 # Note: pythonpath is configured in pyproject.toml, no sys.path manipulation needed
+import os
+from collections.abc import Iterator
+
+import pytest
+from fastapi.testclient import TestClient
+
+# Set before any test module imports src.api.main, whose import-time setup reads APP_ENV.
+os.environ.setdefault("APP_ENV", "test")
+
+
+@pytest.fixture(scope="session")
+def client() -> Iterator[TestClient]:
+    """One TestClient for the whole run; tests swap dependencies via app overrides.
+
+    Entering it runs the app lifespan once and keeps one portal and transport for every
+    request. With APP_ENV=test the lifespan skips the DB pool and audit writer.
+    """
+
+    from src.api.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
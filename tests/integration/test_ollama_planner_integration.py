@@ -6,11 +6,8 @@ from unittest.mock import MagicMock
 
 import httpx
 import pytest
-from fastapi.testclient import TestClient
 
-os.environ.setdefault("APP_ENV", "test")
-
-from src.api.main import app, get_db_connection  # noqa: E402
+from src.api.main import app, get_db_connection
 
 pytestmark = pytest.mark.integration
 
@@ -45,7 +42,7 @@ def _ollama_ready(base_url: str, model: str) -> tuple[bool, str]:
     return False, f"Required model '{model}' not present. Available: {', '.join(names)}"
 
 
-def test_query_local_planner_with_live_ollama(monkeypatch):
+def test_query_local_planner_with_live_ollama(client, monkeypatch):
     if os.environ.get("ENABLE_OLLAMA_INTEGRATION", "0") != "1":
         pytest.skip("Set ENABLE_OLLAMA_INTEGRATION=1 to run live Ollama integration test.")
 
@@ -74,7 +71,6 @@ def test_query_local_planner_with_live_ollama(monkeypatch):
         },
     )
 
-    client = TestClient(app)
     try:
         response = client.post(
             "/query",
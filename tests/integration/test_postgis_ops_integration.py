@@ -5,7 +5,14 @@ import os
 import psycopg2
 import pytest
 
-from src.spatial import buffer_geometry, calculate_area, nearest_neighbors, transform_crs
+from src.spatial import (
+    buffer_geometry,
+    buffer_geometry_many,
+    calculate_area,
+    calculate_area_many,
+    nearest_neighbors,
+    transform_crs,
+)
 
 POSTGRES_TEST_DSN = os.environ.get("POSTGRES_TEST_DSN", "").strip()
 
@@ -69,9 +76,30 @@ def test_nearest_neighbors_integration(conn):
     assert results[0]["distance_meters"] <= results[1]["distance_meters"]
 
 
+def test_nearest_neighbors_max_distance_integration(conn):
+    geom = {"type": "Point", "coordinates": [0.0, 0.0]}
+    # Feature "c" sits about 2.2 km away, outside the radius.
+    results = nearest_neighbors(
+        conn, geom, table="data.features", limit=3, max_distance_meters=1_500
+    )
+    assert [result["id"] for result in results] == ["a", "b"]
+
+
 def test_transform_crs_integration(conn):
     geom = {"type": "Point", "coordinates": [1.0, 0.0]}
     transformed = transform_crs(conn, geom, from_epsg=4326, to_epsg=3857)
     x, y = transformed["coordinates"]
     assert abs(x - 111319.49) < 1000
     assert abs(y) < 10
+
+
+def test_batched_buffer_and_area_integration(conn):
+    geoms = [
+        {"type": "Point", "coordinates": [0.0, 0.0]},
+        {"type": "Point", "coordinates": [0.0, 0.0]},
+    ]
+    buffered = buffer_geometry_many(conn, geoms, [100, 200], units="meters")
+    areas = calculate_area_many(conn, buffered, units="square_meters")
+
+    assert len(areas) == 2
+    assert areas[1] > areas[0] > 1.0
@@ -0,0 +1,50 @@
+from collections.abc import Generator, Iterator
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.api.config import Settings, get_settings
+from src.api.main import app, get_db_connection
+
+# Built once at import so each test reuses a validated Settings instead of rebuilding it.
+_SETTINGS = {
+    api_key: Settings(
+        api_key=api_key,
+        environment="test",
+        authz_backend="static",
+        db_password="ignored",
+    )
+    for api_key in ("", "secret")
+}
+
+
+def _fake_db_conn() -> Generator[MagicMock, None, None]:
+    """Fake DB connection generator for testing."""
+    conn = MagicMock(name="connection")
+    yield conn
+
+
+@pytest.fixture(autouse=True)
+def _dependency_overrides(request: pytest.FixtureRequest) -> Iterator[None]:
+    """Install fake DB/settings overrides for every API test; use @pytest.mark.api_key(...)
+    to require a configured key."""
+
+    marker = request.node.get_closest_marker("api_key")
+    settings = _SETTINGS[marker.args[0] if marker else ""]
+    app.dependency_overrides[get_db_connection] = _fake_db_conn
+    app.dependency_overrides[get_settings] = lambda: settings
+    yield
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def audit_events(monkeypatch: pytest.MonkeyPatch) -> list[dict[str, object]]:
+    """Capture the events the API would write inline via log_query_event."""
+
+    events: list[dict[str, object]] = []
+
+    def _record(conn: object, **event: object) -> None:
+        events.append(event)
+
+    monkeypatch.setattr("src.api.main.log_query_event", _record)
+    return events
@@ -0,0 +1,33 @@
+import pytest
+from pydantic import ValidationError
+
+from src.api.config import Settings
+
+
+def test_settings_is_test_environment_normalizes_case(monkeypatch):
+    monkeypatch.setenv("APP_ENV", "Testing")
+    assert Settings().is_test_environment is True
+
+    monkeypatch.setenv("APP_ENV", "production")
+    assert Settings().is_test_environment is False
+
+
+def test_settings_allowed_query_table_set_strips_and_defaults():
+    settings = Settings(allowed_query_tables=" data.features , data.parcels ,,")
+    assert settings.allowed_query_table_set == frozenset({"data.features", "data.parcels"})
+    assert Settings(allowed_query_tables=" , ").allowed_query_table_set == frozenset(
+        {"data.features"}
+    )
+
+
+def test_settings_normalizes_api_key_and_authz_backend():
+    settings = Settings(api_key="  secret  ", authz_backend="Database")
+    assert settings.expected_api_key == "secret"
+    assert settings.uses_database_authz is True
+    assert Settings(authz_backend="static").uses_database_authz is False
+
+
+def test_settings_rejects_inverted_pool_bounds():
+    with pytest.raises(ValidationError):
+        Settings(db_pool_min=5, db_pool_max=2)
+    assert Settings(db_pool_min=2, db_pool_max=2).db_pool_max == 2
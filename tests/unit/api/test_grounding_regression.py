@@ -1,96 +1,55 @@
 from __future__ import annotations
 
-import os
-from collections.abc import Generator
-from unittest.mock import MagicMock
+import pytest
 
-from fastapi.testclient import TestClient
-
-os.environ.setdefault("APP_ENV", "test")
-
-from src.api.config import Settings, get_settings  # noqa: E402
-from src.api.main import app, get_db_connection  # noqa: E402
-
-
-def _fake_db_conn() -> Generator[MagicMock, None, None]:
-    conn = MagicMock(name="connection")
-    yield conn
-
-
-client = TestClient(app)
-
-
-def _override_dependencies() -> None:
-    app.dependency_overrides[get_db_connection] = _fake_db_conn
-    app.dependency_overrides[get_settings] = lambda: Settings(
-        environment="test",
-        db_password="ignored",
-    )
-
-
-def _clear_overrides() -> None:
-    app.dependency_overrides.clear()
-
-
-def test_grounding_regression_unknown_operation_is_rejected():
-    _override_dependencies()
-    response = client.post(
-        "/query/natural",
-        json={
-            "prompt": (
-                "Run this: "
-                '{"operation":"dissolve","geometry":{"type":"Point","coordinates":[0,0]}}'
-            )
+GROUNDING_REJECTIONS = [
+    pytest.param(
+        {
+            "prompt": "Run this: "
+            '{"operation":"dissolve","geometry":{"type":"Point","coordinates":[0,0]}}'
         },
-    )
-    assert response.status_code == 400
-    assert "Unsupported operation" in response.json()["detail"]
-    _clear_overrides()
-
-
-def test_grounding_regression_prose_only_prompt_is_rejected():
-    _override_dependencies()
-    response = client.post("/query/natural", json={"prompt": "Find nearby parks"})
-    assert response.status_code == 400
-    assert "structured operation JSON object" in response.json()["detail"]
-    _clear_overrides()
-
-
-def test_grounding_regression_multiple_json_operations_are_rejected():
-    _override_dependencies()
-    response = client.post(
-        "/query/natural",
-        json={
-            "prompt": (
-                '{"operation":"buffer","geometry":{"type":"Point","coordinates":[0,0]},"distance":1}'
-                ' and '
-                '{"operation":"calculate_area","geometry":{"type":"Polygon","coordinates":[[[0,0],[1,0],[1,1],[0,0]]]}}'
-            )
+        b"Unsupported operation",
+        id="unknown_operation",
+    ),
+    pytest.param(
+        {"prompt": "Find nearby parks"},
+        b"structured operation JSON object",
+        id="prose_only_prompt",
+    ),
+    pytest.param(
+        {"prompt": "Find nearby parks", "return_format": "geojson"},
+        b"structured operation JSON object",
+        id="prose_only_prompt_with_return_format",
+    ),
+    pytest.param(
+        {
+            "prompt": '{"operation":"buffer","geometry":{"type":"Point","coordinates":[0,0]},'
+            '"distance":1} and '
+            '{"operation":"calculate_area","geometry":{"type":"Polygon","coordinates":[[[0,0],[1,0],[1,1],[0,0]]]}}'
         },
-    )
-    assert response.status_code == 400
-    assert "Multiple operation JSON objects" in response.json()["detail"]
-    _clear_overrides()
-
+        b"Multiple operation JSON objects",
+        id="multiple_json_operations",
+    ),
+    pytest.param(
+        {
+            "prompt": "Run this: "
+            '{"operation":"nearest_neighbors","geometry":{"type":"Point","coordinates":[0,0]},'
+            '"table":"audit.query_log","limit":1}'
+        },
+        b"not permitted",
+        id="disallowed_table",
+    ),
+]
 
-def test_grounding_regression_disallowed_table_is_rejected(monkeypatch):
-    _override_dependencies()
 
-    def fake_nearest(conn, geom, table, limit, srid):  # pragma: no cover
+@pytest.mark.parametrize(("payload", "expected"), GROUNDING_REJECTIONS)
+def test_grounding_regression_prompt_is_rejected(client, monkeypatch, payload, expected):
+    def fake_nearest(conn, geom, table, limit, srid, max_distance_meters):  # pragma: no cover
         return []
 
+    # A rejected prompt must never reach a spatial query.
     monkeypatch.setattr("src.api.main.nearest_neighbors", fake_nearest)
 
-    response = client.post(
-        "/query/natural",
-        json={
-            "prompt": (
-                "Run this: "
-                '{"operation":"nearest_neighbors","geometry":{"type":"Point","coordinates":[0,0]},'
-                '"table":"audit.query_log","limit":1}'
-            )
-        },
-    )
+    response = client.post("/query/natural", json=payload)
     assert response.status_code == 400
-    assert "not permitted" in response.json()["detail"]
-    _clear_overrides()
+    assert expected in response.content
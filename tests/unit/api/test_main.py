@@ -1,104 +1,137 @@
-import os
-from collections.abc import Generator
+from contextlib import contextmanager
 from unittest.mock import MagicMock
 
 import pytest
 from fastapi import HTTPException
-from fastapi.testclient import TestClient
-
-os.environ.setdefault("APP_ENV", "test")
-
-from src.api.config import Settings, get_settings  # noqa: E402
-from src.api.main import app, get_db_connection, require_api_key  # noqa: E402
-from src.llm import LLMPlannerOutputError, LLMPlannerUnavailableError  # noqa: E402
-
-
-def _fake_db_conn() -> Generator[MagicMock, None, None]:
-    """Fake DB connection generator for testing."""
-    conn = MagicMock(name="connection")
-    yield conn
-
-
-client = TestClient(app)
 
+from src.api.config import Settings
+from src.api.main import (
+    _hash_identifier,
+    _rate_limit_identifier,
+    require_api_key,
+)
+from src.llm import LLMPlannerOutputError, LLMPlannerUnavailableError
+from src.security import RateLimiter
+
+# Request payloads shared across tests; tests that need a variant copy them with {**...}.
+_POINT = {"type": "Point", "coordinates": [0, 0]}
+_FAKE_POLYGON = {"type": "Polygon", "coordinates": [[[0, 0], [1, 0], [1, 1], [0, 0]]]}
+_BUFFER_REQUEST = {
+    "prompt": "Buffer a point",
+    "operation": "buffer",
+    "geometry": _POINT,
+    "distance": 10,
+}
+_MISSING_DISTANCE_REQUEST = {
+    "prompt": "Buffer missing distance",
+    "operation": "buffer",
+    "geometry": _POINT,
+}
+
+
+def test_health_endpoint(client):
+    response = client.get("/health")
+    assert response.status_code == 200
+    assert response.content == b'{"status":"ok"}'
 
-def _override_dependencies(api_key: str = "") -> None:
-    app.dependency_overrides[get_db_connection] = _fake_db_conn
-    app.dependency_overrides[get_settings] = lambda: Settings(
-        api_key=api_key,
-        environment="test",
-        authz_backend="static",
-        db_password="ignored",
-    )
 
+def test_ready_endpoint(client):
+    response = client.get("/ready")
+    assert response.status_code == 200
+    assert response.content == b'{"status":"ready"}'
 
-def _clear_overrides() -> None:
-    app.dependency_overrides.clear()
 
+def test_ready_reuses_recent_successful_probe(client, monkeypatch):
+    probes: list[object] = []
 
-def test_health_endpoint():
-    response = client.get("/health")
-    assert response.status_code == 200
-    assert response.json() == {"status": "ok"}
+    @contextmanager
+    def fake_connection_context(settings):
+        probes.append(settings)
+        yield MagicMock(name="connection")
 
+    monkeypatch.setattr("src.api.main.is_test_env", False)
+    monkeypatch.setattr("src.api.main._ready_ok_until", 0.0)
+    monkeypatch.setattr("src.api.main.connection_context", fake_connection_context)
 
-def test_ready_endpoint():
-    response = client.get("/ready")
-    assert response.status_code == 200
-    assert response.json() == {"status": "ready"}
+    assert client.get("/ready").status_code == 200
+    assert client.get("/ready").status_code == 200
+    assert len(probes) == 1
 
 
-def test_query_requires_api_key():
-    _override_dependencies(api_key="secret")
+@pytest.mark.api_key("secret")
+def test_query_requires_api_key(client):
     response = client.post(
         "/query",
         json={"prompt": "Hi", "return_format": "geojson"},
     )
     assert response.status_code == 401
-    assert response.json()["detail"] == "Invalid API key."
-    _clear_overrides()
+    assert response.content == b'{"detail":"Invalid API key."}'
 
 
-def test_require_api_key_database_mode_rejects_empty_when_public_disabled(monkeypatch):
+def test_require_api_key_static_mode_compares_exact_key(monkeypatch):
+    monkeypatch.setenv("APP_ENV", "development")
+    settings = Settings(environment="development", authz_backend="static", api_key="secret")
+
+    require_api_key(x_api_key="secret", settings=settings)
+    for candidate in ("secre", "secret2", "sécret", ""):
+        with pytest.raises(HTTPException) as exc_info:
+            require_api_key(x_api_key=candidate, settings=settings)
+        assert exc_info.value.status_code == 401
+
+
+@pytest.mark.parametrize(
+    ("authz_backend", "allow_public_api", "x_api_key", "expected_detail"),
+    [
+        pytest.param("database", False, "", "Invalid API key", id="database_rejects_empty"),
+        pytest.param("database", True, "", None, id="database_allows_empty_when_public"),
+        pytest.param("static", False, "any", "API key not configured", id="static_requires_key"),
+    ],
+)
+def test_require_api_key_without_configured_key(
+    monkeypatch, authz_backend, allow_public_api, x_api_key, expected_detail
+):
+    # APP_ENV is read through an alias that wins over the environment= init argument.
     monkeypatch.setenv("APP_ENV", "development")
     settings = Settings(
         environment="development",
-        authz_backend="database",
-        allow_public_api=False,
+        authz_backend=authz_backend,
+        allow_public_api=allow_public_api,
         api_key="",
     )
+    if expected_detail is None:
+        require_api_key(x_api_key=x_api_key, settings=settings)
+        return
+
     with pytest.raises(HTTPException) as exc_info:
-        require_api_key(x_api_key="", settings=settings)
+        require_api_key(x_api_key=x_api_key, settings=settings)
+    assert expected_detail in str(exc_info.value.detail)
 
-    assert "Invalid API key" in str(exc_info.value.detail)
 
+def test_rate_limit_identifier_is_stable_and_hides_raw_key():
+    request = MagicMock(name="request")
+    identifier = _rate_limit_identifier(request, " secret-key ")
 
-def test_require_api_key_database_mode_allows_empty_when_public_enabled(monkeypatch):
-    monkeypatch.setenv("APP_ENV", "development")
-    settings = Settings(
-        environment="development",
-        authz_backend="database",
-        allow_public_api=True,
-        api_key="",
-    )
-    require_api_key(x_api_key="", settings=settings)
+    assert identifier == _rate_limit_identifier(request, "secret-key")
+    assert identifier != _rate_limit_identifier(request, "other-key")
+    assert "secret-key" not in identifier
+    # Raw keys must not be retained as memoization keys.
+    assert not hasattr(_hash_identifier, "cache_info")
 
 
-def test_require_api_key_static_mode_requires_configured_key(monkeypatch):
-    monkeypatch.setenv("APP_ENV", "development")
-    settings = Settings(
-        environment="development",
-        authz_backend="static",
-        api_key="",
+def test_query_rate_limit_enforced_when_limiter_active(client, monkeypatch):
+    monkeypatch.setattr(
+        "src.api.main.rate_limiter", RateLimiter(max_requests=1, window_seconds=60)
     )
-    with pytest.raises(HTTPException) as exc_info:
-        require_api_key(x_api_key="any", settings=settings)
+    payload = {"prompt": "Summarize parks", "return_format": "geojson"}
 
-    assert "API key not configured" in str(exc_info.value.detail)
+    first = client.post("/query", headers={"X-API-Key": "demo-key"}, json=payload)
+    second = client.post("/query", headers={"X-API-Key": "demo-key"}, json=payload)
 
+    assert first.status_code == 200
+    assert second.status_code == 429
 
-def test_query_pending_when_operation_missing():
-    _override_dependencies()
+
+def test_query_pending_when_operation_missing(client):
     response = client.post(
         "/query",
         headers={"X-API-Key": ""},
@@ -110,46 +143,33 @@ def test_query_pending_when_operation_missing():
     assert "Provide 'operation'" in data["message"]
     assert data["verification_status"] == "unverified"
     assert data["evidence"] == []
-    _clear_overrides()
-
 
-def test_query_pending_writes_audit_event(monkeypatch):
-    _override_dependencies()
-    calls: list[dict[str, object]] = []
-
-    def fake_log_query_event(conn, **kwargs):
-        calls.append(kwargs)
-
-    monkeypatch.setattr("src.api.main.log_query_event", fake_log_query_event)
 
+def test_query_pending_writes_audit_event(client, audit_events):
     response = client.post(
         "/query",
         headers={"X-API-Key": "demo-key"},
         json={"prompt": "Summarize parks", "return_format": "geojson"},
     )
     assert response.status_code == 200
-    assert len(calls) == 1
-    assert calls[0]["status"] == "pending"
-    assert calls[0]["query_type"] == "nl_pending"
-    assert calls[0]["user_identifier"] == "demo-key"
-    _clear_overrides()
-
+    assert len(audit_events) == 1
+    assert audit_events[0]["status"] == "pending"
+    assert audit_events[0]["query_type"] == "nl_pending"
+    assert audit_events[0]["user_identifier"] == "demo-key"
 
-def test_query_uses_local_planner_when_enabled(monkeypatch):
-    _override_dependencies()
-    fake_geometry = {"type": "Polygon", "coordinates": [[[0, 0], [1, 0], [1, 1], [0, 0]]]}
 
+def test_query_uses_local_planner_when_enabled(client, monkeypatch):
     monkeypatch.setattr("src.api.main.settings.enable_local_llm_planner", True)
     monkeypatch.setattr(
         "src.api.main.plan_operation_from_prompt",
         lambda prompt, settings: {
             "operation": "buffer",
-            "geometry": {"type": "Point", "coordinates": [0, 0]},
+            "geometry": _POINT,
             "distance": 100,
             "units": "meters",
         },
     )
-    monkeypatch.setattr("src.api.main.buffer_geometry", lambda *args, **kwargs: fake_geometry)
+    monkeypatch.setattr("src.api.main.buffer_geometry", lambda *args, **kwargs: _FAKE_POLYGON)
 
     response = client.post(
         "/query",
@@ -160,12 +180,10 @@ def test_query_uses_local_planner_when_enabled(monkeypatch):
     data = response.json()
     assert data["status"] == "completed"
     assert data["request"]["operation"] == "buffer"
-    assert data["result"]["geometry"] == fake_geometry
-    _clear_overrides()
+    assert data["result"]["geometry"] == _FAKE_POLYGON
 
 
-def test_query_local_planner_invalid_output_returns_400(monkeypatch):
-    _override_dependencies()
+def test_query_local_planner_invalid_output_returns_400(client, monkeypatch):
     monkeypatch.setattr("src.api.main.settings.enable_local_llm_planner", True)
     monkeypatch.setattr(
         "src.api.main.plan_operation_from_prompt",
@@ -180,12 +198,10 @@ def test_query_local_planner_invalid_output_returns_400(monkeypatch):
         json={"prompt": "Please dissolve parcels"},
     )
     assert response.status_code == 400
-    assert "LLM planner produced invalid operation" in response.json()["detail"]
-    _clear_overrides()
+    assert b"LLM planner produced invalid operation" in response.content
 
 
-def test_query_local_planner_unavailable_returns_503(monkeypatch):
-    _override_dependencies()
+def test_query_local_planner_unavailable_returns_503(client, monkeypatch):
     monkeypatch.setattr("src.api.main.settings.enable_local_llm_planner", True)
     monkeypatch.setattr(
         "src.api.main.plan_operation_from_prompt",
@@ -198,48 +214,23 @@ def test_query_local_planner_unavailable_returns_503(monkeypatch):
         json={"prompt": "Find nearby parks"},
     )
     assert response.status_code == 503
-    assert "Local LLM planner unavailable" in response.json()["detail"]
-    _clear_overrides()
+    assert b"Local LLM planner unavailable" in response.content
 
 
-def test_query_natural_rejects_unparseable_prompt():
-    _override_dependencies()
-    response = client.post(
-        "/query/natural",
-        headers={"X-API-Key": ""},
-        json={"prompt": "Find nearby parks", "return_format": "geojson"},
-    )
-    assert response.status_code == 400
-    assert "structured operation JSON object" in response.json()["detail"]
-    _clear_overrides()
-
-
-def test_query_natural_writes_parse_error_audit_event(monkeypatch):
-    _override_dependencies()
-    calls: list[dict[str, object]] = []
-
-    def fake_log_query_event(conn, **kwargs):
-        calls.append(kwargs)
-
-    monkeypatch.setattr("src.api.main.log_query_event", fake_log_query_event)
-
+def test_query_natural_writes_parse_error_audit_event(client, audit_events):
     response = client.post(
         "/query/natural",
         headers={"X-API-Key": "demo-key"},
         json={"prompt": "Find nearby parks", "return_format": "geojson"},
     )
     assert response.status_code == 400
-    assert len(calls) == 1
-    assert calls[0]["status"] == "parse_error"
-    _clear_overrides()
-
+    assert len(audit_events) == 1
+    assert audit_events[0]["status"] == "parse_error"
 
-def test_query_natural_executes_parsed_operation(monkeypatch):
-    _override_dependencies()
-    fake_geometry = {"type": "Polygon", "coordinates": [[[0, 0], [1, 0], [1, 1], [0, 0]]]}
 
+def test_query_natural_executes_parsed_operation(client, monkeypatch):
     def fake_buffer(conn, geom, distance, units, srid):
-        return fake_geometry
+        return _FAKE_POLYGON
 
     monkeypatch.setattr("src.api.main.buffer_geometry", fake_buffer)
 
@@ -258,106 +249,110 @@ def test_query_natural_executes_parsed_operation(monkeypatch):
     assert response.status_code == 200
     data = response.json()
     assert data["status"] == "completed"
-    assert data["result"]["geometry"] == fake_geometry
+    assert data["result"]["geometry"] == _FAKE_POLYGON
     assert data["request"]["operation"] == "buffer"
     assert data["verification_status"] == "verified"
     assert data["evidence"][0]["source_kind"] == "input_geometry"
-    _clear_overrides()
 
 
-def test_query_buffer_operation(monkeypatch):
-    _override_dependencies()
-    fake_geometry = {"type": "Polygon", "coordinates": [[[0, 0], [1, 0], [1, 1], [0, 0]]]}
-
+def test_query_buffer_operation(client, monkeypatch):
     def fake_buffer(conn, geom, distance, units, srid):
-        return fake_geometry
+        return _FAKE_POLYGON
 
     monkeypatch.setattr("src.api.main.buffer_geometry", fake_buffer)
 
     response = client.post(
         "/query",
         headers={"X-API-Key": ""},
-        json={
-            "prompt": "Buffer a point",
-            "operation": "buffer",
-            "geometry": {"type": "Point", "coordinates": [0, 0]},
-            "distance": 100,
-            "units": "meters",
-        },
+        json={**_BUFFER_REQUEST, "distance": 100, "units": "meters"},
     )
     assert response.status_code == 200
     data = response.json()
     assert data["status"] == "completed"
-    assert data["result"]["geometry"] == fake_geometry
+    assert data["result"]["geometry"] == _FAKE_POLYGON
     assert data["verification_status"] == "verified"
     assert data["evidence"][0]["source_id"] == "request.geometry"
-    _clear_overrides()
 
 
-def test_query_invalid_parameters(monkeypatch):
-    _override_dependencies()
+def test_query_can_omit_echoed_geometry(client, monkeypatch):
+    monkeypatch.setattr("src.api.main.buffer_geometry", lambda conn, **kwargs: None)
+
+    response = client.post(
+        "/query?echo_geometry=false",
+        headers={"X-API-Key": ""},
+        json=_BUFFER_REQUEST,
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["request"]["operation"] == "buffer"
+    assert data["request"]["geometry"] is None
+    assert data["evidence"][0]["source_id"] == "request.geometry"
+
+
+def test_query_normalizes_operation_case(client, monkeypatch):
+    monkeypatch.setattr("src.api.main.buffer_geometry", lambda conn, **kwargs: None)
 
     response = client.post(
         "/query",
         headers={"X-API-Key": ""},
-        json={
-            "prompt": "Buffer missing distance",
-            "operation": "buffer",
-            "geometry": {"type": "Point", "coordinates": [0, 0]},
-        },
+        json={**_BUFFER_REQUEST, "operation": "BUFFER"},
     )
-    assert response.status_code == 400
-    assert "requires 'geometry' and 'distance'" in response.json()["detail"]
-    _clear_overrides()
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "completed"
+    assert data["request"]["operation"] == "buffer"
+    assert data["verification_status"] == "verified"
 
 
-def test_query_invalid_parameters_writes_audit_event(monkeypatch):
-    _override_dependencies()
-    calls: list[dict[str, object]] = []
+def test_query_invalid_parameters(client, monkeypatch):
+    response = client.post(
+        "/query",
+        headers={"X-API-Key": ""},
+        json=_MISSING_DISTANCE_REQUEST,
+    )
+    assert response.status_code == 400
+    assert b"requires 'geometry' and 'distance'" in response.content
+
 
-    def fake_log_query_event(conn, **kwargs):
-        calls.append(kwargs)
+def test_query_rejects_malformed_geometry_at_validation(client):
+    response = client.post(
+        "/query",
+        headers={"X-API-Key": ""},
+        json={**_BUFFER_REQUEST, "geometry": {"type": "Point"}},
+    )
+    assert response.status_code == 422
 
-    monkeypatch.setattr("src.api.main.log_query_event", fake_log_query_event)
 
+def test_query_invalid_parameters_writes_audit_event(client, audit_events):
     response = client.post(
         "/query",
         headers={"X-API-Key": "demo-key"},
-        json={
-            "prompt": "Buffer missing distance",
-            "operation": "buffer",
-            "geometry": {"type": "Point", "coordinates": [0, 0]},
-        },
+        json=_MISSING_DISTANCE_REQUEST,
     )
     assert response.status_code == 400
-    assert len(calls) == 1
-    assert calls[0]["status"] == "invalid_parameters"
-    assert "requires 'geometry' and 'distance'" in str(calls[0]["error_message"])
-    _clear_overrides()
+    assert len(audit_events) == 1
+    assert audit_events[0]["status"] == "invalid_parameters"
+    assert "requires 'geometry' and 'distance'" in str(audit_events[0]["error_message"])
 
 
-def test_query_rejects_non_allowlisted_table():
-    _override_dependencies()
+def test_query_rejects_non_allowlisted_table(client):
     response = client.post(
         "/query",
         headers={"X-API-Key": ""},
         json={
             "prompt": "Find nearest features",
             "operation": "nearest_neighbors",
-            "geometry": {"type": "Point", "coordinates": [0, 0]},
+            "geometry": _POINT,
             "table": "audit.query_log",
             "limit": 1,
         },
     )
     assert response.status_code == 400
-    assert "not permitted" in response.json()["detail"]
-    _clear_overrides()
+    assert b"not permitted" in response.content
 
 
-def test_query_nearest_neighbors_marks_response_unverified(monkeypatch):
-    _override_dependencies()
-
-    def fake_nearest(conn, geom, table, limit, srid):
+def test_query_nearest_neighbors_marks_response_unverified(client, monkeypatch):
+    def fake_nearest(conn, geom, table, limit, srid, max_distance_meters):
         return [{"id": "feature-1", "geometry": None, "distance_meters": 1.0}]
 
     monkeypatch.setattr("src.api.main.nearest_neighbors", fake_nearest)
@@ -368,7 +363,7 @@ def test_query_nearest_neighbors_marks_response_unverified(monkeypatch):
         json={
             "prompt": "Find nearest features",
             "operation": "nearest_neighbors",
-            "geometry": {"type": "Point", "coordinates": [0, 0]},
+            "geometry": _POINT,
             "table": "data.features",
             "limit": 1,
         },
@@ -379,4 +374,35 @@ def test_query_nearest_neighbors_marks_response_unverified(monkeypatch):
     assert data["verification_status"] == "unverified"
     assert data["evidence"][0]["source_id"] == "data.features"
     assert data["evidence"][0]["verification"] == "unverified"
-    _clear_overrides()
+
+
+@pytest.mark.parametrize(
+    ("extra", "expected_radius"),
+    [({}, None), ({"distance": 2, "units": "kilometers"}, 2_000.0)],
+    ids=["unbounded", "distance_in_units"],
+)
+def test_query_nearest_neighbors_passes_distance_as_radius(
+    client, monkeypatch, extra, expected_radius
+):
+    radii: list[float | None] = []
+
+    def fake_nearest(conn, geom, table, limit, srid, max_distance_meters):
+        radii.append(max_distance_meters)
+        return []
+
+    monkeypatch.setattr("src.api.main.nearest_neighbors", fake_nearest)
+
+    response = client.post(
+        "/query",
+        headers={"X-API-Key": ""},
+        json={
+            "prompt": "Find nearest features",
+            "operation": "nearest_neighbors",
+            "geometry": _POINT,
+            "table": "data.features",
+            "limit": 1,
+            **extra,
+        },
+    )
+    assert response.status_code == 200
+    assert radii == [expected_radius]
@@ -1,20 +1,54 @@
 from __future__ import annotations
 
 import json
-from unittest.mock import MagicMock
+from typing import Any
 
-from src.governance.audit_logger import log_query_event
+import pytest
 
+from src.governance import audit_logger
+from src.governance.audit_logger import (
+    log_query_event,
+    log_query_events,
+    log_query_events_bulk,
+)
 
-def _mock_connection():
-    conn = MagicMock(name="connection")
-    cursor = MagicMock(name="cursor")
-    conn.cursor.return_value.__enter__.return_value = cursor
-    return conn, cursor
 
+class _StubCursor:
+    """Records only the cursor calls the audit logger makes."""
 
-def test_log_query_event_redacts_prompt_and_hashes_user_identifier():
-    conn, cursor = _mock_connection()
+    def __init__(self) -> None:
+        self.calls: list[tuple[str, Any]] = []
+        self.copied: list[tuple[str, str]] = []
+
+    def execute(self, sql: str, params: Any = None) -> None:
+        self.calls.append((sql, params))
+
+    def copy_expert(self, sql: str, buffer: Any) -> None:
+        self.copied.append((sql, buffer.read()))
+
+    def __enter__(self) -> _StubCursor:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        return None
+
+
+class _StubConnection:
+    def __init__(self) -> None:
+        self.cursor_obj = _StubCursor()
+
+    def cursor(self) -> _StubCursor:
+        return self.cursor_obj
+
+
+@pytest.fixture
+def conn_cursor() -> tuple[_StubConnection, _StubCursor]:
+    conn = _StubConnection()
+    return conn, conn.cursor_obj
+
+
+def test_log_query_event_redacts_prompt_and_hashes_user_identifier(conn_cursor):
+    conn, cursor = conn_cursor
     raw_prompt = "Sacred site near [12.34,56.78]"
     raw_user = "real-api-key-123"
 
@@ -29,17 +63,17 @@ def test_log_query_event_redacts_prompt_and_hashes_user_identifier():
         metadata={"operation": "buffer", "geometry": {"type": "Point", "coordinates": [1, 2]}},
     )
 
-    cursor.execute.assert_called_once()
-    _, params = cursor.execute.call_args.args
+    ((sql, params),) = cursor.calls
+    assert "INSERT INTO audit.query_log" in sql
 
     user_id = params[0]
     query_text = params[1]
     metadata_json = params[8]
 
-    assert user_id.startswith("sha256:")
+    assert user_id.startswith("blake2b:")
     assert raw_user not in user_id
     assert "Sacred site" not in query_text
-    assert "redacted:sha256:" in query_text
+    assert "redacted:blake2b:" in query_text
 
     metadata = json.loads(metadata_json)
     assert metadata["geometry_summary"]["type"] == "Point"
@@ -47,8 +81,8 @@ def test_log_query_event_redacts_prompt_and_hashes_user_identifier():
     assert "geometry" not in metadata
 
 
-def test_log_query_event_sanitizes_error_message():
-    conn, cursor = _mock_connection()
+def test_log_query_event_sanitizes_error_message(conn_cursor):
+    conn, cursor = conn_cursor
     raw_error = "bad input\nwith newline\tand tabs"
 
     log_query_event(
@@ -61,6 +95,113 @@ def test_log_query_event_sanitizes_error_message():
         error_message=raw_error,
     )
 
-    cursor.execute.assert_called_once()
-    _, params = cursor.execute.call_args.args
+    _, params = cursor.calls[-1]
     assert params[5] == "bad input with newline and tabs"
+
+
+def test_log_query_event_defaults_optional_json_columns(conn_cursor):
+    conn, cursor = conn_cursor
+
+    log_query_event(
+        conn,
+        user_identifier="user",
+        prompt="prompt",
+        query_type=None,
+        execution_time_ms=1,
+        status="parse_error",
+    )
+
+    _, params = cursor.calls[-1]
+    assert json.loads(params[6]) == []
+    assert json.loads(params[7]) == {"prompt_policy": "redacted", "user_policy": "hashed"}
+    assert json.loads(params[8]) == {}
+
+
+def test_log_query_event_uses_no_session_prepared_statements(conn_cursor):
+    conn, cursor = conn_cursor
+    event = {
+        "user_identifier": "user",
+        "prompt": "prompt",
+        "query_type": "buffer",
+        "execution_time_ms": 5,
+        "status": "completed",
+    }
+
+    log_query_event(conn, **event)
+    log_query_event(conn, **event)
+
+    # Session PREPARE breaks behind transaction-pooling proxies such as pgbouncer.
+    statements = [sql.split()[0] for sql, _ in cursor.calls]
+    assert statements == ["INSERT", "INSERT"]
+
+
+def test_log_query_events_redacts_every_row(conn_cursor, monkeypatch):
+    conn, cursor = conn_cursor
+    calls: list[tuple[object, ...]] = []
+    monkeypatch.setattr(
+        "src.governance.audit_logger.execute_values",
+        lambda cur, query, rows, **kwargs: calls.append((cur, query, rows)),
+    )
+
+    log_query_events(
+        conn,
+        [
+            {
+                "user_identifier": f"real-api-key-{index}",
+                "prompt": "Sacred site near [12.34,56.78]",
+                "query_type": "buffer",
+                "execution_time_ms": index,
+                "status": "completed",
+            }
+            for index in range(3)
+        ],
+    )
+
+    assert len(calls) == 1
+    cur, _, rows = calls[0]
+    assert cur is cursor
+    assert len(rows) == 3
+    for index, row in enumerate(rows):
+        assert row[0].startswith("blake2b:")
+        assert f"real-api-key-{index}" not in row[0]
+        assert "Sacred site" not in row[1]
+
+
+def test_log_query_events_bulk_streams_escaped_copy_rows(conn_cursor):
+    conn, cursor = conn_cursor
+
+    written = log_query_events_bulk(
+        conn,
+        [
+            {
+                "user_identifier": "real-api-key-123",
+                "prompt": "Sacred site near [12.34,56.78]",
+                "query_type": None,
+                "execution_time_ms": 7,
+                "status": "invalid_parameters",
+                "error_message": "bad\\input",
+            }
+        ],
+    )
+
+    assert written == 1
+    ((copy_sql, copied),) = cursor.copied
+    assert copy_sql.startswith("COPY audit.query_log")
+    (row,) = copied.splitlines()
+    fields = row.split("\t")
+    assert len(fields) == 9
+    assert fields[0].startswith("blake2b:")
+    assert "Sacred site" not in row
+    assert fields[2] == "\\N"
+    assert fields[5] == "bad\\\\input"
+
+
+def test_log_query_events_bulk_skips_copy_when_empty(conn_cursor):
+    conn, cursor = conn_cursor
+    assert log_query_events_bulk(conn, []) == 0
+    assert cursor.copied == []
+
+
+def test_audit_digests_do_not_retain_raw_values():
+    # A memoized digest would keep raw API keys and prompts alive as cache keys.
+    assert not hasattr(audit_logger._digest, "cache_info")
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from unittest.mock import MagicMock
+
+from src.governance.audit_writer import AuditWriter
+
+
+def _event(status: str = "completed") -> dict[str, object]:
+    return {
+        "user_identifier": "real-api-key-123",
+        "prompt": "Buffer a point",
+        "query_type": "buffer",
+        "execution_time_ms": 3,
+        "status": status,
+    }
+
+
+def _connection_factory():
+    conn = MagicMock(name="connection")
+
+    @contextmanager
+    def factory():
+        yield conn
+
+    return factory, conn
+
+
+def test_audit_writer_rejects_events_when_not_running(monkeypatch):
+    batches: list[list[dict[str, object]]] = []
+    monkeypatch.setattr(
+        "src.governance.audit_writer.log_query_events",
+        lambda conn, events: batches.append(list(events)),
+    )
+    factory, _ = _connection_factory()
+    writer = AuditWriter(factory)
+
+    assert writer.submit(_event()) is False
+    assert batches == []
+
+
+def test_audit_writer_batches_queued_events_and_flushes_on_stop(monkeypatch):
+    batches: list[list[dict[str, object]]] = []
+    monkeypatch.setattr(
+        "src.governance.audit_writer.log_query_events",
+        lambda conn, events: batches.append(list(events)),
+    )
+    factory, _ = _connection_factory()
+    writer = AuditWriter(factory, batch_size=2)
+    # Queue everything before the worker starts so batching is deterministic.
+    writer._thread = MagicMock(is_alive=MagicMock(return_value=True))
+    for status in ("completed", "invalid_parameters", "parse_error"):
+        assert writer.submit(_event(status)) is True
+    writer._thread = None
+    writer.start()
+    writer.stop()
+
+    assert not writer.running
+    assert [[event["status"] for event in batch] for batch in batches] == [
+        ["completed", "invalid_parameters"],
+        ["parse_error"],
+    ]
+
+
+def test_audit_writer_reports_full_queue_so_caller_writes_inline():
+    factory, _ = _connection_factory()
+    writer = AuditWriter(factory, max_pending=1)
+    # Mark the writer running without consuming, so the queue stays full.
+    writer._thread = MagicMock(is_alive=MagicMock(return_value=True))
+
+    assert writer.submit(_event()) is True
+    assert writer.submit(_event()) is False
+
+
+def test_audit_writer_retries_failed_batch_per_event(monkeypatch):
+    def failing_batch(conn, events):
+        raise RuntimeError("batch insert failed")
+
+    written: list[str] = []
+
+    def log_one(conn, **event):
+        if event["status"] == "parse_error":
+            raise RuntimeError("bad row")
+        written.append(event["status"])
+
+    monkeypatch.setattr("src.governance.audit_writer.log_query_events", failing_batch)
+    monkeypatch.setattr("src.governance.audit_writer.log_query_event", log_one)
+    factory, _ = _connection_factory()
+    writer = AuditWriter(factory)
+
+    writer._write([_event("completed"), _event("parse_error"), _event("invalid_parameters")])
+
+    assert written == ["completed", "invalid_parameters"]
+
+
+def test_audit_writer_stop_does_not_block_on_full_queue():
+    factory, _ = _connection_factory()
+    writer = AuditWriter(factory, max_pending=1)
+    # A stuck worker: alive, but never consuming the queue.
+    stuck = MagicMock(is_alive=MagicMock(return_value=True))
+    writer._thread = stuck
+    assert writer.submit(_event()) is True
+
+    writer.stop(timeout=0.01)
+
+    assert writer._thread is stuck
+    stuck.join.assert_not_called()
+
+
+def test_audit_writer_one_bad_row_does_not_lose_a_full_batch(monkeypatch):
+    def batch_insert(conn, events):
+        if any(event["status"] == "parse_error" for event in events):
+            raise RuntimeError("multi-row INSERT rejected")
+
+    written: list[dict[str, object]] = []
+
+    def log_one(conn, **event):
+        if event["status"] == "parse_error":
+            raise RuntimeError("bad row")
+        written.append(event)
+
+    monkeypatch.setattr("src.governance.audit_writer.log_query_events", batch_insert)
+    monkeypatch.setattr("src.governance.audit_writer.log_query_event", log_one)
+    factory, _ = _connection_factory()
+    writer = AuditWriter(factory, max_pending=1_000, batch_size=1_000)
+    writer._thread = MagicMock(is_alive=MagicMock(return_value=True))
+    for index in range(1_000):
+        assert writer.submit(_event("parse_error" if index == 500 else "completed")) is True
+    writer._thread = None
+    writer.start()
+    writer.stop()
+
+    assert len(written) == 999
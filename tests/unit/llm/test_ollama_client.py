@@ -1,12 +1,24 @@
 from __future__ import annotations
 
 import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate
 
 import httpx
 import pytest
 
 from src.llm.ollama_client import OllamaPlannerClient
-from src.llm.provider import LLMPlannerOutputError, LLMPlannerUnavailableError
+from src.llm.provider import (
+    LLMPlannerOutputError,
+    LLMPlannerUnavailableError,
+    build_provider,
+    close_providers,
+)
+
+# httpx.Request parses its URL on construction; the fakes only need one shared instance.
+_FAKE_REQUEST = httpx.Request("POST", "http://localhost/api/generate")
 
 
 class _FakeResponse:
@@ -16,81 +28,193 @@ class _FakeResponse:
 
     def raise_for_status(self) -> None:
         if self.status_code >= 400:
-            request = httpx.Request("POST", "http://localhost/api/generate")
-            response = httpx.Response(self.status_code, request=request)
-            raise httpx.HTTPStatusError("error", request=request, response=response)
+            response = httpx.Response(self.status_code, request=_FAKE_REQUEST)
+            raise httpx.HTTPStatusError("error", request=_FAKE_REQUEST, response=response)
 
     def json(self) -> dict:
         return self._payload
 
 
+class _FakeClient:
+    def __init__(self, sequence: list):
+        self.sequence = sequence
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def close(self):
+        pass
+
+    def post(self, path: str, json: dict):
+        next_item = self.sequence.pop(0)
+        if isinstance(next_item, Exception):
+            raise next_item
+        assert path == "/api/generate"
+        assert json["format"] == "json"
+        return next_item
+
+
 class _ClientFactory:
     def __init__(self, sequence):
         self.sequence = list(sequence)
+        self.created = 0
 
     def __call__(self, *args, **kwargs):
-        outer = self
+        self.created += 1
+        # Clients share the factory's queue, so retries and later calls keep consuming it.
+        return _FakeClient(self.sequence)
 
-        class _FakeClient:
-            def __enter__(self):
-                return self
 
-            def __exit__(self, exc_type, exc, tb):
-                return False
+@pytest.fixture
+def fake_httpx_client(monkeypatch):
+    """Return an installer that routes OllamaPlannerClient's httpx.Client to a fake.
 
-            def post(self, path: str, json: dict):
-                next_item = outer.sequence.pop(0)
-                if isinstance(next_item, Exception):
-                    raise next_item
-                assert path == "/api/generate"
-                assert json["format"] == "json"
-                return next_item
+    Retry backoff sleeps become no-ops; tests that inspect them patch time.sleep again.
+    """
 
-        return _FakeClient()
+    def _install(sequence) -> _ClientFactory:
+        factory = _ClientFactory(sequence)
+        monkeypatch.setattr("src.llm.ollama_client.httpx.Client", factory)
+        monkeypatch.setattr("src.llm.ollama_client.time.sleep", lambda _: None)
+        return factory
 
+    return _install
 
-def test_ollama_client_returns_parsed_json_object(monkeypatch):
-    payload = {"operation": "buffer", "distance": 10}
-    factory = _ClientFactory(
-        [_FakeResponse(status_code=200, payload={"response": json.dumps(payload)})]
+
+_PLANNED = {"operation": "buffer", "distance": 10}
+_CONNECT_ERROR = httpx.ConnectError("connect failed", request=_FAKE_REQUEST)
+
+GENERATE_CASES = [
+    pytest.param(
+        [_FakeResponse(status_code=200, payload={"response": json.dumps(_PLANNED)})],
+        0,
+        None,
+        id="returns_parsed_json_object",
+    ),
+    pytest.param(
+        [_CONNECT_ERROR, _CONNECT_ERROR],
+        1,
+        LLMPlannerUnavailableError,
+        id="retries_then_raises_unavailable",
+    ),
+    pytest.param(
+        [_FakeResponse(status_code=200, payload={"response": "not-json"})],
+        0,
+        LLMPlannerOutputError,
+        id="rejects_non_json_output",
+    ),
+]
+
+
+@pytest.mark.parametrize(("sequence", "max_retries", "expected_error"), GENERATE_CASES)
+def test_ollama_client_generate_structured_operation(
+    fake_httpx_client, sequence, max_retries, expected_error
+):
+    fake_httpx_client(sequence)
+
+    client = OllamaPlannerClient(
+        base_url="http://localhost:11434",
+        model="qwen2.5:7b-instruct",
+        timeout_seconds=10,
+        max_retries=max_retries,
     )
-    monkeypatch.setattr("src.llm.ollama_client.httpx.Client", factory)
+
+    if expected_error is None:
+        assert client.generate_structured_operation(prompt="buffer point") == _PLANNED
+        return
+    with pytest.raises(expected_error):
+        client.generate_structured_operation(prompt="buffer point")
+
+
+def test_ollama_client_reuses_http_client_across_retries_and_calls(fake_httpx_client):
+    ok = _FakeResponse(status_code=200, payload={"response": json.dumps({"operation": "buffer"})})
+    factory = fake_httpx_client([_CONNECT_ERROR, ok, ok])
 
     client = OllamaPlannerClient(
         base_url="http://localhost:11434",
         model="qwen2.5:7b-instruct",
         timeout_seconds=10,
-        max_retries=0,
+        max_retries=1,
     )
-    result = client.generate_structured_operation(prompt="buffer point")
+    client.generate_structured_operation(prompt="buffer point")
+    client.generate_structured_operation(prompt="buffer point")
+    client.close()
+
+    assert factory.created == 1
 
-    assert result == payload
 
+def test_build_provider_reuses_client_per_configuration():
+    class _Settings:
+        llm_provider = "ollama"
+        llm_ollama_base_url = "http://localhost:11434"
+        llm_model = "qwen2.5:7b-instruct"
+        llm_timeout_seconds = 10
+        llm_max_retries = 0
 
-def test_ollama_client_retries_then_raises_unavailable(monkeypatch):
-    connect_error = httpx.ConnectError(
-        "connect failed",
-        request=httpx.Request("POST", "http://localhost/api/generate"),
+    try:
+        assert build_provider(_Settings()) is build_provider(_Settings())
+    finally:
+        close_providers()
+
+
+def test_ollama_client_honors_retry_after_then_jitters(monkeypatch, fake_httpx_client):
+    throttled = httpx.HTTPStatusError(
+        "throttled",
+        request=_FAKE_REQUEST,
+        response=httpx.Response(429, headers={"Retry-After": "60"}, request=_FAKE_REQUEST),
     )
-    factory = _ClientFactory([connect_error, connect_error])
-    monkeypatch.setattr("src.llm.ollama_client.httpx.Client", factory)
-    monkeypatch.setattr("src.llm.ollama_client.time.sleep", lambda _: None)
+    ok = _FakeResponse(status_code=200, payload={"response": json.dumps({"operation": "buffer"})})
+    fake_httpx_client([throttled, _CONNECT_ERROR, ok])
+    sleeps: list[float] = []
+    monkeypatch.setattr("src.llm.ollama_client.time.sleep", sleeps.append)
 
     client = OllamaPlannerClient(
         base_url="http://localhost:11434",
         model="qwen2.5:7b-instruct",
         timeout_seconds=10,
-        max_retries=1,
+        max_retries=2,
     )
+    client.generate_structured_operation(prompt="buffer point")
 
+    assert sleeps[0] == 5.0
+    assert 0 <= sleeps[1] <= 0.4
+
+
+def test_ollama_client_backoff_is_full_jitter_within_doubling_caps(monkeypatch, fake_httpx_client):
+    fake_httpx_client([_CONNECT_ERROR] * 4)
+    sleeps: list[float] = []
+    monkeypatch.setattr("src.llm.ollama_client.time.sleep", sleeps.append)
+
+    client = OllamaPlannerClient(
+        base_url="http://localhost:11434",
+        model="qwen2.5:7b-instruct",
+        timeout_seconds=10,
+        max_retries=3,
+    )
     with pytest.raises(LLMPlannerUnavailableError):
         client.generate_structured_operation(prompt="buffer point")
 
+    assert len(sleeps) == 3
+    for attempt, slept in enumerate(sleeps):
+        assert 0 <= slept <= min(0.2 * 2**attempt, 2.0)
+
+
+def test_ollama_client_creates_one_http_client_under_concurrent_first_use(
+    monkeypatch, fake_httpx_client
+):
+    factory = fake_httpx_client([])
+    created = factory.__call__
 
-def test_ollama_client_rejects_non_json_output(monkeypatch):
-    factory = _ClientFactory([_FakeResponse(status_code=200, payload={"response": "not-json"})])
-    monkeypatch.setattr("src.llm.ollama_client.httpx.Client", factory)
+    def slow_factory(*args, **kwargs):
+        # Widen the window between the None check and the assignment; time.sleep is
+        # patched out by the fixture.
+        threading.Event().wait(0.01)
+        return created(*args, **kwargs)
 
+    monkeypatch.setattr("src.llm.ollama_client.httpx.Client", slow_factory)
     client = OllamaPlannerClient(
         base_url="http://localhost:11434",
         model="qwen2.5:7b-instruct",
@@ -98,5 +222,48 @@ def test_ollama_client_rejects_non_json_output(monkeypatch):
         max_retries=0,
     )
 
-    with pytest.raises(LLMPlannerOutputError):
-        client.generate_structured_operation(prompt="buffer point")
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        clients = list(pool.map(lambda _: client._http_client(), range(8)))
+    client.close()
+
+    assert factory.created == 1
+    assert all(http_client is clients[0] for http_client in clients)
+
+
+def _throttled(retry_after: str) -> httpx.HTTPStatusError:
+    return httpx.HTTPStatusError(
+        "throttled",
+        request=_FAKE_REQUEST,
+        response=httpx.Response(429, headers={"Retry-After": retry_after}, request=_FAKE_REQUEST),
+    )
+
+
+@pytest.mark.parametrize(
+    ("retry_after", "low", "high"),
+    [
+        pytest.param("nan", 0.0, 0.2, id="nan_falls_back_to_jitter"),
+        pytest.param("inf", 0.0, 0.2, id="inf_falls_back_to_jitter"),
+        pytest.param(
+            formatdate(time.time() + 60, usegmt=True), 5.0, 5.0, id="http_date_clamped"
+        ),
+        pytest.param("Wed, 21 Oct 2015 07:28:00 GMT", 0.0, 0.0, id="http_date_in_past"),
+    ],
+)
+def test_ollama_client_retry_after_forms(
+    monkeypatch, fake_httpx_client, retry_after, low, high
+):
+    ok = _FakeResponse(status_code=200, payload={"response": json.dumps({"operation": "buffer"})})
+    fake_httpx_client([_throttled(retry_after), ok])
+    sleeps: list[float] = []
+    monkeypatch.setattr("src.llm.ollama_client.time.sleep", sleeps.append)
+
+    client = OllamaPlannerClient(
+        base_url="http://localhost:11434",
+        model="qwen2.5:7b-instruct",
+        timeout_seconds=10,
+        max_retries=1,
+    )
+    client.generate_structured_operation(prompt="buffer point")
+
+    assert len(sleeps) == 1
+    assert low <= sleeps[0] <= high
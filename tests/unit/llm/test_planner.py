@@ -69,6 +69,22 @@ def test_plan_operation_from_prompt_rejects_control_chars():
         )
 
 
+def test_plan_operation_from_prompt_allows_whitespace_control_chars():
+    provider = _FakeProvider(
+        {
+            "operation": "buffer",
+            "geometry": {"type": "Point", "coordinates": [0, 0]},
+            "distance": 10,
+        }
+    )
+    planned = plan_operation_from_prompt(
+        prompt="Buffer this point\n\tby 10 meters\r\n",
+        settings=_Settings(),
+        provider=provider,
+    )
+    assert planned["operation"] == "buffer"
+
+
 def test_plan_operation_from_prompt_surfaces_output_validation_errors():
     with pytest.raises(LLMPlannerOutputError):
         plan_operation_from_prompt(
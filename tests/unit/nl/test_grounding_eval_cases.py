@@ -9,27 +9,36 @@ from src.api.main import QueryRequest, _build_grounding_evidence
 from src.nl import NaturalQueryParseError, parse_natural_query_prompt
 
 CASES_PATH = Path(__file__).resolve().parents[3] / "evals" / "grounding_cases.json"
+# Parsed once at import and split by expected outcome, so each test has one path.
+CASES = tuple(json.loads(CASES_PATH.read_bytes()))
+SUCCESS_CASES = [case for case in CASES if case["expect"]["status"] == "success"]
+ERROR_CASES = [case for case in CASES if case["expect"]["status"] != "success"]
 
 
-@pytest.mark.parametrize("case", json.loads(CASES_PATH.read_text(encoding="utf-8")))
-def test_grounding_eval_cases(case: dict[str, object]):
+def _case_id(case: dict[str, object]) -> str:
+    return str(case.get("id"))
+
+
+@pytest.mark.parametrize("case", SUCCESS_CASES, ids=_case_id)
+def test_grounding_eval_success_cases(case: dict[str, object]):
     prompt = str(case["prompt"])
     expect = case["expect"]
     assert isinstance(expect, dict)
 
-    expected_status = str(expect["status"])
+    parsed = parse_natural_query_prompt(prompt)
+    request = QueryRequest.model_validate({"prompt": prompt, **parsed})
+    verification_status, _ = _build_grounding_evidence(request)
+
+    assert parsed["operation"] == expect["operation"]
+    assert verification_status == expect["verification_status"]
 
-    if expected_status == "success":
-        parsed = parse_natural_query_prompt(prompt)
-        request = QueryRequest.model_validate({"prompt": prompt, **parsed})
-        verification_status, _ = _build_grounding_evidence(request)
 
-        assert parsed["operation"] == expect["operation"]
-        assert verification_status == expect["verification_status"]
-        return
+@pytest.mark.parametrize("case", ERROR_CASES, ids=_case_id)
+def test_grounding_eval_error_cases(case: dict[str, object]):
+    expect = case["expect"]
+    assert isinstance(expect, dict)
 
     with pytest.raises(NaturalQueryParseError) as exc_info:
-        parse_natural_query_prompt(prompt)
+        parse_natural_query_prompt(str(case["prompt"]))
 
-    expected_substring = str(expect["error_contains"])
-    assert expected_substring in str(exc_info.value)
+    assert str(expect["error_contains"]) in str(exc_info.value)
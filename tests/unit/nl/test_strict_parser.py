@@ -20,6 +20,19 @@ def test_parse_natural_query_prompt_buffer_success():
     assert parsed["geometry"]["type"] == "Point"
 
 
+def test_parse_natural_query_prompt_skips_braces_in_surrounding_prose():
+    prompt = (
+        "Using template {name} and set { 1, 2 }, run "
+        '{ "operation": "buffer", "geometry": {"type": "Point", "coordinates": [0, 0]}, '
+        '"distance": 5 } then format as {}.'
+    )
+
+    parsed = parse_natural_query_prompt(prompt)
+
+    assert parsed["operation"] == "buffer"
+    assert parsed["distance"] == 5
+
+
 def test_parse_natural_query_prompt_rejects_missing_json():
     with pytest.raises(NaturalQueryParseError) as exc_info:
         parse_natural_query_prompt("buffer this point by 100 meters")
@@ -46,3 +59,12 @@ def test_parse_natural_query_prompt_rejects_multiple_operation_objects():
         parse_natural_query_prompt(prompt)
 
     assert "Multiple operation JSON objects" in str(exc_info.value)
+
+
+def test_parse_natural_query_prompt_rejects_malformed_geometry():
+    prompt = '{"operation":"buffer","geometry":{"type":"Circle","radius":5},"distance":10}'
+
+    with pytest.raises(NaturalQueryParseError) as exc_info:
+        parse_natural_query_prompt(prompt)
+
+    assert "geometry" in str(exc_info.value)
@@ -1,22 +1,44 @@
 from __future__ import annotations
 
 import hashlib
+import http.server
 import json
-import subprocess
-import sys
+import threading
 from pathlib import Path
 
-ROOT = Path(__file__).resolve().parents[3]
-SCRIPT = ROOT / "scripts" / "fetch_authoritative_dataset.py"
+import pytest
+
+from scripts.fetch_authoritative_dataset import main
 
 
 def _sha256(path: Path) -> str:
     return hashlib.sha256(path.read_bytes()).hexdigest()
 
 
-def test_fetch_authoritative_dataset_from_file_url(tmp_path: Path):
+_SOURCE_BYTES = b"authoritative-source"
+
+
+@pytest.mark.parametrize(
+    ("expected_sha256", "expected_returncode", "expected_output"),
+    [
+        pytest.param(
+            hashlib.sha256(_SOURCE_BYTES).hexdigest(),
+            0,
+            "SHA-256 matches manifest.",
+            id="from_file_url",
+        ),
+        pytest.param("0" * 64, 1, "SHA-256 mismatch", id="detects_sha_mismatch"),
+    ],
+)
+def test_fetch_authoritative_dataset_checks_file_url_sha(
+    tmp_path: Path,
+    capsys: pytest.CaptureFixture[str],
+    expected_sha256: str,
+    expected_returncode: int,
+    expected_output: str,
+):
     source = tmp_path / "source.bin"
-    source.write_bytes(b"authoritative-source")
+    source.write_bytes(_SOURCE_BYTES)
 
     destination = tmp_path / "download.bin"
     manifest = {
@@ -26,65 +48,136 @@ def test_fetch_authoritative_dataset_from_file_url(tmp_path: Path):
                 "id": "fixture",
                 "source_url": source.resolve().as_uri(),
                 "local_relative_path": str(destination),
-                "expected_sha256": _sha256(source),
+                "expected_sha256": expected_sha256,
             }
         ],
     }
     manifest_path = tmp_path / "manifest.json"
     manifest_path.write_text(json.dumps(manifest), encoding="utf-8")
 
-    result = subprocess.run(
-        [
-            sys.executable,
-            str(SCRIPT),
-            "--dataset-id",
-            "fixture",
-            "--manifest",
-            str(manifest_path),
-        ],
-        check=False,
-        capture_output=True,
-        text=True,
-    )
+    returncode = main(["--dataset-id", "fixture", "--manifest", str(manifest_path)])
 
-    assert result.returncode == 0
-    assert destination.exists()
-    assert _sha256(destination) == _sha256(source)
-    assert "SHA-256 matches manifest." in result.stdout
+    assert returncode == expected_returncode
+    assert expected_output in capsys.readouterr().out
+    if expected_returncode == 0:
+        assert _sha256(destination) == _sha256(source)
 
 
-def test_fetch_authoritative_dataset_detects_sha_mismatch(tmp_path: Path):
-    source = tmp_path / "source.bin"
-    source.write_bytes(b"authoritative-source")
+class _RangeHandler(http.server.BaseHTTPRequestHandler):
+    payload = b""
+    etag = '"v1"'
+    requests: list[tuple[str | None, str | None]] = []
+
+    def do_GET(self) -> None:  # noqa: N802
+        range_header = self.headers.get("Range")
+        if_range = self.headers.get("If-Range")
+        type(self).requests.append((range_header, if_range))
+        body = self.payload
+        if range_header and if_range == self.etag:
+            start = int(range_header.removeprefix("bytes=").rstrip("-"))
+            body = body[start:]
+            self.send_response(206)
+            self.send_header(
+                "Content-Range", f"bytes {start}-{len(self.payload) - 1}/{len(self.payload)}"
+            )
+        else:
+            # No Range, or If-Range no longer matches: send the whole current object.
+            self.send_response(200)
+        self.send_header("ETag", self.etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+
+_RESUME_PAYLOAD = b"authoritative-source" * 64
+
+
+@pytest.mark.parametrize(
+    ("partial_bytes", "stored_validator", "expected_requests"),
+    [
+        pytest.param(
+            _RESUME_PAYLOAD[:100], '"v1"', [("bytes=100-", '"v1"')], id="resumes_unchanged"
+        ),
+        pytest.param(
+            b"stale-bytes-from-an-older-object",
+            '"v0"',
+            [("bytes=32-", '"v0"')],
+            id="restarts_when_upstream_changed",
+        ),
+        pytest.param(_RESUME_PAYLOAD[:100], None, [(None, None)], id="restarts_without_validator"),
+    ],
+)
+def test_fetch_authoritative_dataset_resumes_only_unchanged_partial_download(
+    tmp_path: Path,
+    capsys: pytest.CaptureFixture[str],
+    partial_bytes: bytes,
+    stored_validator: str | None,
+    expected_requests: list[tuple[str | None, str | None]],
+):
+    _RangeHandler.payload = _RESUME_PAYLOAD
+    _RangeHandler.requests = []
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _RangeHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
 
     destination = tmp_path / "download.bin"
+    (tmp_path / "download.bin.part").write_bytes(partial_bytes)
+    if stored_validator is not None:
+        (tmp_path / "download.bin.part.validator").write_text(stored_validator)
     manifest = {
         "version": 1,
         "datasets": [
             {
                 "id": "fixture",
-                "source_url": source.resolve().as_uri(),
+                "source_url": f"http://127.0.0.1:{server.server_address[1]}/fixture.bin",
                 "local_relative_path": str(destination),
-                "expected_sha256": "0000000000000000000000000000000000000000000000000000000000000000",
+                "expected_sha256": hashlib.sha256(_RESUME_PAYLOAD).hexdigest(),
             }
         ],
     }
     manifest_path = tmp_path / "manifest.json"
     manifest_path.write_text(json.dumps(manifest), encoding="utf-8")
 
-    result = subprocess.run(
-        [
-            sys.executable,
-            str(SCRIPT),
-            "--dataset-id",
-            "fixture",
-            "--manifest",
-            str(manifest_path),
+    try:
+        returncode = main(
+            ["--dataset-id", "fixture", "--manifest", str(manifest_path), "--allow-http"]
+        )
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    stdout = capsys.readouterr().out
+    assert returncode == 0, stdout
+    assert _RangeHandler.requests == expected_requests
+    assert destination.read_bytes() == _RESUME_PAYLOAD
+    assert not (tmp_path / "download.bin.part").exists()
+    assert not (tmp_path / "download.bin.part.validator").exists()
+    assert "SHA-256 matches manifest." in stdout
+
+
+def test_fetch_authoritative_dataset_skips_hash_for_unpinned_existing_file(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+):
+    destination = tmp_path / "existing.bin"
+    destination.write_bytes(b"already-staged")
+    manifest = {
+        "version": 1,
+        "datasets": [
+            {
+                "id": "fixture",
+                "source_url": "https://example.invalid/fixture.bin",
+                "local_relative_path": str(destination),
+            }
         ],
-        check=False,
-        capture_output=True,
-        text=True,
-    )
+    }
+    manifest_path = tmp_path / "manifest.json"
+    manifest_path.write_text(json.dumps(manifest), encoding="utf-8")
+    argv = ["--dataset-id", "fixture", "--manifest", str(manifest_path)]
 
-    assert result.returncode == 1
-    assert "SHA-256 mismatch" in result.stdout
+    assert main(argv) == 0
+    assert "not computed" in capsys.readouterr().out
+    assert main([*argv, "--force-verify"]) == 0
+    assert f"sha256: {_sha256(destination)}" in capsys.readouterr().out
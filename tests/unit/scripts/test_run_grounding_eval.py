@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import pytest
+
+from scripts.run_grounding_eval import DEFAULT_CASES_PATH, _load_cases, run_cases
+
+_OUT_OF_RANGE_LIMIT_PROMPT = (
+    '{"operation":"nearest_neighbors","geometry":{"type":"Point","coordinates":[0,0]},'
+    '"limit":1000}'
+)
+
+
+def test_run_grounding_eval_default_cases_pass(capsys: pytest.CaptureFixture[str]):
+    passed, failed = run_cases(_load_cases(DEFAULT_CASES_PATH))
+
+    assert failed == 0, capsys.readouterr().out
+    assert passed > 0
+
+
+def test_run_grounding_eval_applies_production_request_validation(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    monkeypatch.delenv("GROUNDING_EVAL_FAST", raising=False)
+    # The parser accepts this prompt; QueryRequest (limit <= 100) rejects it, as /query does.
+    cases: list[dict[str, object]] = [
+        {
+            "id": "limit_out_of_range",
+            "prompt": _OUT_OF_RANGE_LIMIT_PROMPT,
+            "expect": {"status": "error", "error_contains": "less than or equal to 100"},
+        }
+    ]
+
+    assert run_cases(cases) == (1, 0)
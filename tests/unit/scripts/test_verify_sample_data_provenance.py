@@ -1,15 +1,17 @@
 from __future__ import annotations
 
+import hashlib
 import json
-import subprocess
-import sys
 from pathlib import Path
 
-ROOT = Path(__file__).resolve().parents[3]
-SCRIPT = ROOT / "scripts" / "verify_sample_data_provenance.py"
+import pytest
 
+from scripts.verify_sample_data_provenance import main
 
-def test_verify_sample_data_provenance_accepts_valid_manifest(tmp_path: Path):
+
+def test_verify_sample_data_provenance_accepts_valid_manifest(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+):
     manifest = {
         "version": 1,
         "datasets": [
@@ -26,18 +28,16 @@ def test_verify_sample_data_provenance_accepts_valid_manifest(tmp_path: Path):
     manifest_path = tmp_path / "manifest.json"
     manifest_path.write_text(json.dumps(manifest), encoding="utf-8")
 
-    result = subprocess.run(
-        [sys.executable, str(SCRIPT), "--manifest", str(manifest_path)],
-        check=False,
-        capture_output=True,
-        text=True,
-    )
+    returncode = main(["--manifest", str(manifest_path)])
+    stdout = capsys.readouterr().out
 
-    assert result.returncode == 0
-    assert "Verified 1 dataset definition" in result.stdout
+    assert returncode == 0
+    assert "Verified 1 dataset definition" in stdout
 
 
-def test_verify_sample_data_provenance_rejects_missing_required_fields(tmp_path: Path):
+def test_verify_sample_data_provenance_rejects_missing_required_fields(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+):
     manifest = {
         "version": 1,
         "datasets": [
@@ -53,12 +53,47 @@ def test_verify_sample_data_provenance_rejects_missing_required_fields(tmp_path:
     manifest_path = tmp_path / "manifest.json"
     manifest_path.write_text(json.dumps(manifest), encoding="utf-8")
 
-    result = subprocess.run(
-        [sys.executable, str(SCRIPT), "--manifest", str(manifest_path)],
-        check=False,
-        capture_output=True,
-        text=True,
-    )
+    returncode = main(["--manifest", str(manifest_path)])
+    stdout = capsys.readouterr().out
+
+    assert returncode == 1
+    assert "missing required fields" in stdout
+
+
+def test_verify_sample_data_provenance_checks_local_sha256(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+):
+    local_file = tmp_path / "example.bin"
+    local_file.write_bytes(b"provenance-fixture" * 1024)
+    empty_file = tmp_path / "empty.bin"
+    empty_file.write_bytes(b"")
+
+    def _dataset(dataset_id: str, path: Path, expected_sha256: str) -> dict[str, str]:
+        return {
+            "id": dataset_id,
+            "title": "Example dataset",
+            "source_url": "https://example.com/data.bin",
+            "license": "CC-BY-4.0",
+            "attribution": "Example attribution",
+            "local_relative_path": str(path),
+            "expected_sha256": expected_sha256,
+        }
+
+    manifest = {
+        "version": 1,
+        "datasets": [
+            _dataset("match", local_file, hashlib.sha256(local_file.read_bytes()).hexdigest()),
+            _dataset("empty", empty_file, hashlib.sha256(b"").hexdigest()),
+            _dataset("mismatch", local_file, "0" * 64),
+        ],
+    }
+    manifest_path = tmp_path / "manifest.json"
+    manifest_path.write_text(json.dumps(manifest), encoding="utf-8")
+
+    returncode = main(["--manifest", str(manifest_path), "--require-local"])
+    stdout = capsys.readouterr().out
 
-    assert result.returncode == 1
-    assert "missing required fields" in result.stdout
+    assert returncode == 1
+    assert "[mismatch] sha256 mismatch" in stdout
+    assert "[match]" not in stdout
+    assert "[empty]" not in stdout
@@ -10,6 +10,7 @@ from src.security.authorization import (
     Role,
     api_key_fingerprint,
     check_permission,
+    clear_role_cache,
     enforce_permission,
     resolve_role,
     resolve_role_from_api_key,
@@ -32,9 +33,19 @@ def test_resolve_role_from_api_key_unknown_nonempty_defaults_to_member():
     assert resolve_role_from_api_key("opaque_key_value") == Role.MEMBER
 
 
+def test_resolve_role_from_api_key_requires_exact_prefix():
+    assert resolve_role_from_api_key("  ADMIN  ") == Role.ADMIN
+    assert resolve_role_from_api_key("elder") == Role.ELDER
+    assert resolve_role_from_api_key("administrator:abc123") == Role.MEMBER
+    assert resolve_role_from_api_key("admin-abc123") == Role.MEMBER
+    assert resolve_role_from_api_key("public_key:abc123") == Role.MEMBER
+
+
 def test_api_key_fingerprint_is_stable():
     assert api_key_fingerprint("abc123") == api_key_fingerprint("abc123")
     assert api_key_fingerprint("abc123") != api_key_fingerprint("xyz789")
+    # Plaintext keys must not be kept alive as memoization keys.
+    assert not hasattr(api_key_fingerprint, "cache_info")
 
 
 def test_resolve_role_from_database_returns_matching_role():
@@ -59,6 +70,42 @@ def test_resolve_role_from_database_returns_none_for_missing_key():
     assert role is None
 
 
+def test_resolve_role_from_database_caches_lookups_until_ttl(monkeypatch):
+    now = 100.0
+    monkeypatch.setattr("src.security.authorization.time.monotonic", lambda: now)
+    clear_role_cache()
+    conn = MagicMock()
+    cursor = MagicMock()
+    cursor.fetchone.return_value = ("elder",)
+    conn.cursor.return_value.__enter__.return_value = cursor
+
+    assert resolve_role_from_database(conn, "cached-key", cache_ttl_seconds=30) == Role.ELDER
+    cursor.fetchone.return_value = None
+    now = 129.0
+    assert resolve_role_from_database(conn, "cached-key", cache_ttl_seconds=30) == Role.ELDER
+    assert cursor.execute.call_count == 1
+
+    # Expired entries are looked up again, so revocations take effect.
+    now = 130.0
+    assert resolve_role_from_database(conn, "cached-key", cache_ttl_seconds=30) is None
+    assert cursor.execute.call_count == 2
+
+
+def test_clear_role_cache_forces_database_lookup():
+    clear_role_cache()
+    conn = MagicMock()
+    cursor = MagicMock()
+    cursor.fetchone.return_value = ("admin",)
+    conn.cursor.return_value.__enter__.return_value = cursor
+
+    assert resolve_role_from_database(conn, "revoked-key", cache_ttl_seconds=60) == Role.ADMIN
+    cursor.fetchone.return_value = None
+    clear_role_cache()
+
+    assert resolve_role_from_database(conn, "revoked-key", cache_ttl_seconds=60) is None
+    assert cursor.execute.call_count == 2
+
+
 def test_resolve_role_prefers_database_backend_when_available():
     conn = MagicMock()
     cursor = MagicMock()
@@ -90,6 +137,24 @@ def test_check_permission_enforces_matrix():
     assert check_permission(Role.ADMIN, Permission.EXPORT_DATA) is True
 
 
+def test_check_permission_matches_explicit_matrix_for_every_pair():
+    from src.security import authorization
+
+    for role in Role:
+        for permission in Permission:
+            expected = permission in authorization._ROLE_PERMISSIONS[role]
+            assert check_permission(role, permission) is expected
+
+
+def test_check_permission_denies_unmapped_role_and_matrix_is_read_only():
+    from src.security import authorization
+
+    assert check_permission("auditor", Permission.QUERY_PUBLIC) is False  # type: ignore[arg-type]
+    assert check_permission(Role.ADMIN, "query:everything") is False  # type: ignore[arg-type]
+    with pytest.raises(TypeError):
+        authorization._ROLE_PERMISSIONS[Role.PUBLIC] = frozenset(Permission)  # type: ignore[index]
+
+
 def test_enforce_permission_raises_for_denied_role():
     checker = enforce_permission(Permission.QUERY_SENSITIVE)
     with pytest.raises(HTTPException) as exc_info:
@@ -102,3 +167,30 @@ def test_enforce_permission_raises_for_denied_role():
 def test_enforce_permission_allows_authorized_role():
     checker = enforce_permission(Permission.QUERY_SENSITIVE)
     checker(x_api_key="member:abc123")
+
+
+def test_enforce_permission_matches_check_permission_for_every_pair():
+    keys = {role: f"{role.value}:abc123" for role in Role}
+    for permission in Permission:
+        checker = enforce_permission(permission)
+        for role, api_key in keys.items():
+            if check_permission(role, permission):
+                checker(x_api_key=api_key)
+            else:
+                with pytest.raises(HTTPException):
+                    checker(x_api_key=api_key)
+
+
+def test_resolve_role_from_database_does_not_cache_missing_keys():
+    clear_role_cache()
+    conn = MagicMock()
+    cursor = MagicMock()
+    cursor.fetchone.return_value = None
+    conn.cursor.return_value.__enter__.return_value = cursor
+
+    assert resolve_role_from_database(conn, "new-key", cache_ttl_seconds=60) is None
+    # The key is issued after the first miss; it must work without waiting out a TTL.
+    cursor.fetchone.return_value = ("member",)
+
+    assert resolve_role_from_database(conn, "new-key", cache_ttl_seconds=60) == Role.MEMBER
+    assert cursor.execute.call_count == 2
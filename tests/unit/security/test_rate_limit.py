@@ -38,9 +38,9 @@ def test_rate_limiter_evicts_lru_when_identifier_cap_reached(monkeypatch):
     now += 1
     limiter.check("c")
 
-    assert "a" not in limiter._buckets
-    assert "b" in limiter._buckets
-    assert "c" in limiter._buckets
+    assert "a" not in limiter._shards[0].buckets
+    assert "b" in limiter._shards[0].buckets
+    assert "c" in limiter._shards[0].buckets
 
 
 def test_rate_limiter_evicts_stale_buckets(monkeypatch):
@@ -61,8 +61,38 @@ def test_rate_limiter_evicts_stale_buckets(monkeypatch):
     now += 10
     limiter.check("fresh-user")
 
-    assert "stale-user" not in limiter._buckets
-    assert "fresh-user" in limiter._buckets
+    assert "stale-user" not in limiter._shards[0].buckets
+    assert "fresh-user" in limiter._shards[0].buckets
+
+
+def test_rate_limiter_defers_stale_sweeps_to_interval(monkeypatch):
+    now = 0.0
+
+    def fake_monotonic() -> float:
+        return now
+
+    monkeypatch.setattr("src.security.rate_limit.time.monotonic", fake_monotonic)
+    limiter = RateLimiter(
+        max_requests=10,
+        window_seconds=60,
+        bucket_ttl_seconds=32,
+    )
+
+    limiter.check("a")
+    now = 1.0
+    limiter.check("b")
+    now = 32.5
+    limiter.check("c")
+    assert list(limiter._shards[0].buckets) == ["b", "c"]
+
+    # "b" is now stale, but the next sweep is not due until 34.5.
+    now = 33.5
+    limiter.check("c")
+    assert "b" in limiter._shards[0].buckets
+
+    now = 35.0
+    limiter.check("c")
+    assert list(limiter._shards[0].buckets) == ["c"]
 
 
 def test_build_rate_limiter_returns_noop_for_test_env():
@@ -76,3 +106,45 @@ def test_build_rate_limiter_returns_noop_for_test_env():
     )
 
     assert isinstance(limiter, NoOpRateLimiter)
+
+
+def test_build_rate_limiter_shards_buckets_within_identifier_cap():
+    limiter = build_rate_limiter(
+        enabled=True,
+        environment="production",
+        max_requests=60,
+        window_seconds=60,
+        max_identifiers=10_000,
+        bucket_ttl_seconds=3_600,
+    )
+    small = build_rate_limiter(
+        enabled=True,
+        environment="production",
+        max_requests=60,
+        window_seconds=60,
+        max_identifiers=6,
+        bucket_ttl_seconds=3_600,
+    )
+
+    assert isinstance(limiter, RateLimiter)
+    assert len(limiter._shards) == 16
+    assert isinstance(small, RateLimiter)
+    assert len(small._shards) == 4
+
+
+def test_rate_limiter_rejects_non_power_of_two_shards():
+    with pytest.raises(ValueError):
+        RateLimiter(max_requests=1, window_seconds=60, shard_count=3)
+
+
+def test_rate_limiter_limits_each_identifier_across_shards():
+    limiter = RateLimiter(max_requests=1, window_seconds=60, shard_count=8)
+    identifiers = [f"user-{index}" for index in range(32)]
+
+    for identifier in identifiers:
+        limiter.check(identifier)
+    for identifier in identifiers:
+        with pytest.raises(RateLimitExceeded):
+            limiter.check(identifier)
+
+    assert sum(len(shard.buckets) for shard in limiter._shards) == 32
@@ -1,62 +1,113 @@
 from __future__ import annotations
 
 import json
-from unittest.mock import MagicMock
+from typing import Any
 
 import pytest
+from psycopg2 import sql
 
 from src.spatial import (
     buffer_geometry,
+    buffer_geometry_many,
     calculate_area,
+    calculate_area_many,
     find_intersections,
+    find_intersections_many,
     nearest_neighbors,
     transform_crs,
+    transform_crs_many,
+    validate_geojson_geometry,
 )
 
 
-def _mock_connection(fetchone=None, fetchall=None):
-    conn = MagicMock(name="connection")
-    cursor = MagicMock(name="cursor")
-    conn.cursor.return_value.__enter__.return_value = cursor
-    if fetchone is not None:
-        cursor.fetchone.return_value = fetchone
-    if fetchall is not None:
-        cursor.fetchall.return_value = fetchall
-    return conn, cursor
+class _StubCursor:
+    """Records executed statements and returns canned rows."""
+
+    def __init__(self, fetchone: Any = None, fetchall: Any = None) -> None:
+        self.calls: list[tuple[Any, Any]] = []
+        self._fetchone = fetchone
+        self._fetchall = fetchall
+
+    def execute(self, query: Any, params: Any = None) -> None:
+        self.calls.append((query, params))
+
+    def fetchone(self) -> Any:
+        return self._fetchone
+
+    def fetchall(self) -> Any:
+        return self._fetchall
+
+    def __enter__(self) -> _StubCursor:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        return None
+
+
+class _StubConnection:
+    def __init__(self, cursor: _StubCursor) -> None:
+        self._cursor = cursor
+
+    def cursor(self) -> _StubCursor:
+        return self._cursor
+
+
+def _stub_connection(fetchone=None, fetchall=None):
+    cursor = _StubCursor(fetchone=fetchone, fetchall=fetchall)
+    return _StubConnection(cursor), cursor
+
+
+def _statement_kinds(cursor) -> list[str]:
+    return [query.split()[0] for query, _ in cursor.calls]
 
 
 def test_buffer_geometry_returns_geojson():
     geom = {"type": "Point", "coordinates": [-75.0, 40.0]}
     fake_polygon = {"type": "Polygon", "coordinates": [[[0, 0], [1, 0], [1, 1], [0, 0]]]}
-    conn, cursor = _mock_connection(fetchone=(json.dumps(fake_polygon),))
+    conn, cursor = _stub_connection(fetchone=(fake_polygon,))
 
     result = buffer_geometry(conn, geom, distance=100, units="meters")
 
-    cursor.execute.assert_called_once()
+    assert _statement_kinds(cursor) == ["SELECT"]
     assert result["type"] == "Polygon"
     assert result["coordinates"] == fake_polygon["coordinates"]
 
 
+def test_single_geometry_helpers_run_one_parameterized_select():
+    geom = {"type": "Point", "coordinates": [0, 0]}
+    conn, cursor = _stub_connection(fetchone=(geom,))
+
+    transform_crs(conn, geom, from_epsg=4326, to_epsg=3857)
+    transform_crs(conn, geom, from_epsg=4326, to_epsg=3857)
+
+    # No session-level PREPARE, so helpers work behind transaction-pooling proxies.
+    assert _statement_kinds(cursor) == ["SELECT", "SELECT"]
+    query, (geom_json, from_epsg, to_epsg) = cursor.calls[0]
+    # Results come back as json so psycopg2 parses them; helpers never decode strings.
+    assert query.rstrip().endswith(")::json")
+    assert (json.loads(geom_json), from_epsg, to_epsg) == (geom, 4326, 3857)
+
+
 def test_buffer_geometry_invalid_unit_raises():
     geom = {"type": "Point", "coordinates": [0, 0]}
-    conn, _ = _mock_connection()
+    conn, _ = _stub_connection()
     with pytest.raises(ValueError):
         buffer_geometry(conn, geom, distance=100, units="parsecs")
 
 
 def test_calculate_area_converts_units():
     geom = {"type": "Polygon", "coordinates": [[[0, 0], [0, 1], [1, 1], [0, 0]]]}
-    conn, cursor = _mock_connection(fetchone=(10_000.0,))
+    conn, cursor = _stub_connection(fetchone=(10_000.0,))
 
     hectares = calculate_area(conn, geom, units="hectares")
 
-    cursor.execute.assert_called_once()
+    assert _statement_kinds(cursor) == ["SELECT"]
     assert pytest.approx(hectares, rel=1e-3) == 1.0
 
 
 def test_calculate_area_invalid_units():
     geom = {"type": "Polygon", "coordinates": [[[0, 0], [0, 1], [1, 1], [0, 0]]]}
-    conn, _ = _mock_connection(fetchone=(10_000.0,))
+    conn, _ = _stub_connection(fetchone=(10_000.0,))
 
     with pytest.raises(ValueError):
         calculate_area(conn, geom, units="square-furlongs")
@@ -65,34 +116,102 @@ def test_calculate_area_invalid_units():
 def test_find_intersections_returns_none_on_empty():
     geom_a = {"type": "Point", "coordinates": [0, 0]}
     geom_b = {"type": "Point", "coordinates": [10, 10]}
-    conn, cursor = _mock_connection(fetchone=(None,))
+    conn, cursor = _stub_connection(fetchone=(None,))
 
     result = find_intersections(conn, geom_a, geom_b)
 
-    cursor.execute.assert_called_once()
+    assert _statement_kinds(cursor) == ["SELECT"]
     assert result is None
 
 
 def test_nearest_neighbors_returns_list():
     geom = {"type": "Point", "coordinates": [0, 0]}
     rows = [
-        ("feature-1", json.dumps({"type": "Point", "coordinates": [0.1, 0.1]}), 25.0),
-        ("feature-2", json.dumps({"type": "Point", "coordinates": [0.2, 0.2]}), 55.0),
+        ("feature-1", {"type": "Point", "coordinates": [0.1, 0.1]}, 25.0),
+        ("feature-2", {"type": "Point", "coordinates": [0.2, 0.2]}, 55.0),
     ]
-    conn, cursor = _mock_connection(fetchall=rows)
+    conn, cursor = _stub_connection(fetchone=(4326,), fetchall=rows)
 
     results = nearest_neighbors(conn, geom, table="data.features", limit=2)
 
-    cursor.execute.assert_called_once()
+    (lookup_sql, lookup_params), _ = cursor.calls
+    assert "geometry_columns" in lookup_sql
+    assert lookup_params == ("data", "features", "geom")
     assert len(results) == 2
     assert results[0]["id"] == "feature-1"
     assert results[0]["geometry"]["type"] == "Point"
     assert pytest.approx(results[1]["distance_meters"], rel=1e-3) == 55.0
 
 
+def _sql_text(query) -> str:
+    # Literal SQL of a composed query, without identifiers (which need a live connection).
+    if isinstance(query, sql.SQL):
+        return query.string
+    if isinstance(query, sql.Composed):
+        return "".join(_sql_text(part) for part in query.seq)
+    return ""
+
+
+def _nearest_sql(column_srid, **kwargs) -> tuple[str, tuple]:
+    geom = {"type": "Point", "coordinates": [0, 0]}
+    fetchone = (column_srid,) if column_srid is not None else None
+    conn, cursor = _stub_connection(fetchone=fetchone, fetchall=[])
+    nearest_neighbors(conn, geom, table="data.features", **kwargs)
+    query, params = cursor.calls[-1]
+    return " ".join(_sql_text(query).split()), params
+
+
+@pytest.mark.parametrize(
+    ("column_srid", "indexable"),
+    [(4326, True), (3857, False), (None, False)],
+    ids=["wgs84_column", "projected_column", "unregistered_column"],
+)
+def test_nearest_neighbors_casts_column_directly_only_when_stored_in_wgs84(
+    column_srid, indexable
+):
+    text, params = _nearest_sql(column_srid, limit=3)
+
+    # A bare ::geography cast matches a GIST ((geom::geography)) index; ST_Transform cannot.
+    assert ("ST_Transform" not in text) is indexable
+    assert text.endswith(
+        "::geography <-> ST_SetSRID(ST_GeomFromGeoJSON(%s), 4326)::geography LIMIT %s"
+    )
+    assert json.loads(params[0]) == {"type": "Point", "coordinates": [0, 0]}
+    assert params[1:] == (params[0], 3)
+
+
+def test_nearest_neighbors_transforms_non_wgs84_input():
+    text, params = _nearest_sql(4326, limit=3, srid=3857)
+
+    assert "ST_Transform(ST_SetSRID(ST_GeomFromGeoJSON(%s), %s), 4326)::geography" in text
+    assert params[1] == 3857 and params[3:] == (3857, 3)
+
+
+def test_nearest_neighbors_filters_by_max_distance():
+    text, params = _nearest_sql(4326, limit=2, max_distance_meters=500)
+
+    assert text.index("WHERE ST_DWithin(") < text.index("ORDER BY")
+    assert params[1:] == (params[0], 500.0, params[0], 2)
+    conn, _ = _stub_connection(fetchall=[])
+    point = {"type": "Point", "coordinates": [0, 0]}
+    with pytest.raises(ValueError):
+        nearest_neighbors(conn, point, table="data.features", max_distance_meters=-1)
+
+
+def test_nearest_neighbors_radius_is_not_capped_by_a_candidate_subquery():
+    text, params = _nearest_sql(4326, limit=5, max_distance_meters=10_000)
+
+    # Under-filled case: the radius must filter the whole table before LIMIT, not just
+    # a pre-limited candidate set, or qualifying features beyond it would be dropped.
+    assert "candidates" not in text
+    assert text.count("LIMIT") == 1
+    assert text.index("WHERE ST_DWithin(") < text.index("ORDER BY") < text.index("LIMIT")
+    assert params[-1] == 5
+
+
 def test_nearest_neighbors_invalid_limit():
     geom = {"type": "Point", "coordinates": [0, 0]}
-    conn, _ = _mock_connection(fetchall=[])
+    conn, _ = _stub_connection(fetchall=[])
 
     with pytest.raises(ValueError):
         nearest_neighbors(conn, geom, table="data.features", limit=0)
@@ -101,9 +220,70 @@ def test_nearest_neighbors_invalid_limit():
 def test_transform_crs_returns_geojson():
     geom = {"type": "Point", "coordinates": [0, 0]}
     transformed = {"type": "Point", "coordinates": [1000, 1000]}
-    conn, cursor = _mock_connection(fetchone=(json.dumps(transformed),))
+    conn, cursor = _stub_connection(fetchone=(transformed,))
 
     result = transform_crs(conn, geom, from_epsg=4326, to_epsg=3857)
 
-    cursor.execute.assert_called_once()
+    assert _statement_kinds(cursor) == ["SELECT"]
     assert result["coordinates"] == transformed["coordinates"]
+
+
+def test_buffer_geometry_many_uses_one_round_trip():
+    geoms = [{"type": "Point", "coordinates": [0, 0]}, '{"type":"Point","coordinates":[1,1]}']
+    buffered = {"type": "Polygon", "coordinates": []}
+    conn, cursor = _stub_connection(fetchall=[(buffered,)] * 2)
+
+    result = buffer_geometry_many(conn, geoms, [1, 2], units="kilometers")
+
+    assert len(cursor.calls) == 1
+    query, params = cursor.calls[-1]
+    assert "unnest" in query
+    assert [json.loads(item) for item in params[2]] == [geoms[0], json.loads(geoms[1])]
+    assert params[2][1] is geoms[1]
+    assert params[3] == [1_000.0, 2_000.0]
+    assert result == [buffered, buffered]
+
+
+def test_batched_helpers_validate_before_querying():
+    conn, cursor = _stub_connection(fetchall=[])
+    point = {"type": "Point", "coordinates": [0, 0]}
+
+    assert buffer_geometry_many(conn, [], []) == []
+    assert calculate_area_many(conn, []) == []
+    assert find_intersections_many(conn, []) == []
+    assert transform_crs_many(conn, [], from_epsg=4326, to_epsg=3857) == []
+    with pytest.raises(ValueError):
+        buffer_geometry_many(conn, [point], [1, 2])
+    with pytest.raises(ValueError):
+        buffer_geometry_many(conn, [point], [1], units="parsecs")
+    with pytest.raises(ValueError):
+        calculate_area_many(conn, [point], units="parsecs")
+    assert cursor.calls == []
+
+
+def test_batched_helpers_preserve_order_and_empty_intersections():
+    point = {"type": "Point", "coordinates": [0, 0]}
+    conn, _ = _stub_connection(fetchall=[(10_000.0,), (20_000.0,)])
+    assert calculate_area_many(conn, [point, point], units="hectares") == [1.0, 2.0]
+
+    conn, _ = _stub_connection(fetchall=[(point,), (None,)])
+    assert find_intersections_many(conn, [(point, point), (point, point)]) == [point, None]
+
+    conn, _ = _stub_connection(fetchall=[(None,)])
+    with pytest.raises(ValueError):
+        transform_crs_many(conn, [point], from_epsg=4326, to_epsg=3857)
+
+
+def test_validate_geojson_geometry_checks_structure():
+    point = {"type": "Point", "coordinates": [0, 0]}
+    collection = {"type": "GeometryCollection", "geometries": [point]}
+    assert validate_geojson_geometry(point) is point
+    assert validate_geojson_geometry(collection) is collection
+
+    for bad in (
+        {"type": "Circle", "coordinates": [0, 0]},
+        {"type": "Point"},
+        {"type": "GeometryCollection", "geometries": [{"type": "Point"}]},
+    ):
+        with pytest.raises(ValueError):
+            validate_geojson_geometry(bad)
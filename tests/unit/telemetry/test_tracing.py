@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from unittest.mock import MagicMock
+
+from src.telemetry import tracing
+
+
+def test_current_trace_id_skips_opentelemetry_until_configured(monkeypatch):
+    fake_trace = MagicMock(name="trace")
+    monkeypatch.setattr(tracing, "_otel_trace", fake_trace)
+    monkeypatch.setattr(tracing, "_TRACING_CONFIGURED", False)
+
+    assert tracing.current_trace_id() is None
+    fake_trace.get_current_span.assert_not_called()
+
+
+def test_current_trace_id_formats_active_span(monkeypatch):
+    fake_trace = MagicMock(name="trace")
+    fake_trace.get_current_span.return_value.get_span_context.return_value = MagicMock(
+        is_valid=True, trace_id=0xABC
+    )
+    monkeypatch.setattr(tracing, "_otel_trace", fake_trace)
+    monkeypatch.setattr(tracing, "_TRACING_CONFIGURED", True)
+
+    assert tracing.current_trace_id() == f"{0xABC:032x}"